@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from benchmarks import stub_streamlit
+
+# Headless page-render benchmarks.
+#
+#   python -m benchmarks.bench_pages --scales 1 10 100 --repeats 3
+#
+# For each scale the synthetic datasets are generated once (data/data_generator.py),
+# then every page in main.PAGES is rendered against a stubbed Streamlit. Time is split
+# into data load, transforms, figure construction and serialisation, and the results
+# are written as JSON. Pass --compare with an earlier results file to see the ratios.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIGURE_BUILDERS = ["bar", "line", "pie", "timeline", "scatter", "area", "histogram", "imshow"]
+
+
+# Route plotly figure construction through the stub's timer
+def _instrument_plotly():
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    for name in FIGURE_BUILDERS:
+        if hasattr(px, name):
+            setattr(px, name, stub_streamlit.timer.wrap("figure", getattr(px, name)))
+    for name in ["__init__", "add_trace", "add_vline", "update_layout", "update_traces"]:
+        setattr(go.Figure, name, stub_streamlit.timer.wrap("figure", getattr(go.Figure, name)))
+
+
+def _dataset_dir(scale, seed, data_root):
+    from data.data_generator import generate_scaled_data
+
+    path = os.path.join(data_root, f"scale_{scale:g}_seed_{seed}")
+    if not os.path.exists(os.path.join(path, "orders.csv")):
+        generate_scaled_data(scale, seed=seed, output_dir=path)
+    return path
+
+
+def _render_once(page, render_page):
+    from data.data_loader import load_datasets
+
+    timer = stub_streamlit.timer
+    timer.reset()
+
+    start = time.perf_counter()
+    data = load_datasets(page.REQUIRED_DATA)
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    render_page(data)
+    render_s = time.perf_counter() - start
+
+    figure_s = timer.totals.get("figure", 0.0)
+    serialise_s = timer.totals.get("serialise", 0.0)
+    return {
+        "load_s": load_s,
+        "transform_s": max(render_s - figure_s - serialise_s, 0.0),
+        "figure_s": figure_s,
+        "serialise_s": serialise_s,
+        "total_s": load_s + render_s,
+    }
+
+
+def run(scales, seed, repeats, pages=None, data_root=None):
+    stub_streamlit.install()
+    sys.path.insert(0, ROOT)
+    _instrument_plotly()
+
+    import main
+    from data.data_loader import load_data
+
+    data_root = os.path.abspath(data_root or os.path.join(ROOT, ".bench_data"))
+    selected = {name: entry for name, entry in main.PAGES.items() if not pages or name in pages}
+
+    results = []
+    cwd = os.getcwd()
+    try:
+        for scale in scales:
+            os.chdir(_dataset_dir(scale, seed, data_root))
+
+            # First load parses the CSVs and builds the snapshots
+            start = time.perf_counter()
+            rows = {key: len(df) for key, df in load_data().items()}
+            cold_load_s = time.perf_counter() - start
+
+            for name, (page, render_page) in selected.items():
+                entry = {"page": name, "scale": scale, "rows": rows, "cold_load_s": cold_load_s}
+                try:
+                    runs = [_render_once(page, render_page) for _ in range(repeats)]
+                    for metric in runs[0]:
+                        entry[metric] = statistics.median(r[metric] for r in runs)
+                except Exception as e:  # keep benchmarking the other pages
+                    entry["error"] = f"{type(e).__name__}: {e}"
+                results.append(entry)
+                print(_format_row(entry))
+    finally:
+        os.chdir(cwd)
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "seed": seed,
+            "repeats": repeats,
+        },
+        "results": results,
+    }
+
+
+def _format_row(entry):
+    if "error" in entry:
+        return f"{entry['page']:<28} scale={entry['scale']:<8g} ERROR {entry['error']}"
+    return (f"{entry['page']:<28} scale={entry['scale']:<8g} total={entry['total_s']:.3f}s "
+            f"load={entry['load_s']:.3f}s transform={entry['transform_s']:.3f}s "
+            f"figure={entry['figure_s']:.3f}s serialise={entry['serialise_s']:.3f}s")
+
+
+# Print new/old total time per (page, scale) against an earlier results file
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r["page"], r["scale"]): r for r in json.load(f)["results"]}
+
+    for entry in results["results"]:
+        old = baseline.get((entry["page"], entry["scale"]))
+        if not old or "total_s" not in old or "total_s" not in entry:
+            continue
+        ratio = entry["total_s"] / old["total_s"] if old["total_s"] else float("inf")
+        print(f"{entry['page']:<28} scale={entry['scale']:<8g} {old['total_s']:.3f}s -> {entry['total_s']:.3f}s ({ratio:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark page renders against a stubbed Streamlit")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--pages", nargs="*", help="page names as shown in the navigation (default: all)")
+    parser.add_argument("--data-dir", help="where generated datasets are kept (default: .bench_data)")
+    parser.add_argument("--output", default=os.path.join("bench_results", f"pages-{datetime.now():%Y%m%d-%H%M%S}.json"))
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.seed, args.repeats, args.pages, args.data_dir)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,167 @@
+import sys
+import time
+import types
+
+# Minimal headless stand-in for the streamlit module used by the page benchmarks.
+# Widgets return their defaults, layout calls return more stubs, and charts/tables
+# are serialised the way Streamlit would so that cost is measured too.
+
+
+class Timer:
+    def __init__(self):
+        self.totals = {}
+        self._depth = {}
+
+    def reset(self):
+        self.totals = {}
+
+    # Time only the outermost call per bucket (px.* builds go.Figure internally)
+    def wrap(self, bucket, func):
+        def timed(*args, **kwargs):
+            depth = self._depth.get(bucket, 0)
+            self._depth[bucket] = depth + 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._depth[bucket] = depth
+                if depth == 0:
+                    self.totals[bucket] = self.totals.get(bucket, 0.0) + time.perf_counter() - start
+        timed.__wrapped__ = func
+        return timed
+
+
+timer = Timer()
+
+
+class SessionState(dict):
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+def _cache_decorator(func=None, **_kwargs):
+    def decorate(f):
+        f.clear = lambda *args, **kwargs: None
+        return f
+    return decorate(func) if callable(func) else decorate
+
+
+def _serialise_dataframe(data):
+    df = getattr(data, "data", data)  # pandas Styler -> underlying frame
+    try:
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().size
+    except ImportError:
+        return len(df.to_json())
+
+
+class StubContainer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def columns(self, spec, **kwargs):
+        return [StubContainer() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    def tabs(self, labels):
+        return [StubContainer() for _ in labels]
+
+    def expander(self, *args, **kwargs):
+        return StubContainer()
+
+    def form(self, *args, **kwargs):
+        return StubContainer()
+
+    def container(self, *args, **kwargs):
+        return StubContainer()
+
+    def spinner(self, *args, **kwargs):
+        return StubContainer()
+
+    def empty(self):
+        return StubContainer()
+
+    # Widgets return their default values
+    def button(self, *args, **kwargs):
+        return False
+
+    def form_submit_button(self, *args, **kwargs):
+        return False
+
+    def download_button(self, *args, **kwargs):
+        return False
+
+    def checkbox(self, label, value=False, **kwargs):
+        return value
+
+    def text_input(self, label, value="", **kwargs):
+        return value
+
+    def text_area(self, label, value="", **kwargs):
+        return value
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        if value is not None:
+            return value
+        return min_value if min_value is not None else 0
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value if value is not None else min_value
+
+    def select_slider(self, label, options=(), value=None, **kwargs):
+        return value if value is not None else list(options)[0]
+
+    def selectbox(self, label, options=(), index=0, **kwargs):
+        options = list(options)
+        return options[index] if options and index is not None else None
+
+    def radio(self, label, options=(), index=0, **kwargs):
+        return self.selectbox(label, options, index)
+
+    def multiselect(self, label, options=(), default=None, **kwargs):
+        return list(default) if default is not None else []
+
+    def date_input(self, label, value=None, **kwargs):
+        return value
+
+    # Output elements pay the serialisation cost Streamlit would
+    def plotly_chart(self, fig, *args, **kwargs):
+        timer.wrap("serialise", fig.to_json)()
+
+    def dataframe(self, data, *args, **kwargs):
+        timer.wrap("serialise", _serialise_dataframe)(data)
+
+    table = dataframe
+
+
+# Build and register the stub as `streamlit` (must run before pages are imported)
+def install():
+    module = types.ModuleType("streamlit")
+    root = StubContainer()
+    for name in dir(StubContainer):
+        if not name.startswith("_"):
+            setattr(module, name, getattr(root, name))
+    module.__getattr__ = lambda name: (lambda *args, **kwargs: None)
+    module.sidebar = StubContainer()
+    module.session_state = SessionState()
+    module.cache_data = _cache_decorator
+    module.cache_resource = _cache_decorator
+    module.fragment = _cache_decorator
+    module.rerun = lambda *args, **kwargs: None
+    sys.modules["streamlit"] = module
+    return module
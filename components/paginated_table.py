@@ -0,0 +1,31 @@
+import math
+import streamlit as st
+from config.settings import TABLE_PAGE_SIZE
+
+# Paginated table.
+# Only the rows of the page being viewed are fetched and serialised to the browser;
+# the full result is represented by its row count. fetch_page(offset, limit) returns
+# the rows of one page, e.g. a query pushed down with LIMIT/OFFSET.
+
+
+def paginated_table(key, fetch_page, total_rows, page_size=TABLE_PAGE_SIZE):
+    pages = max(1, math.ceil(total_rows / page_size))
+    page_key = f"{key}_page"
+    # a narrower filter can leave the remembered page past the end
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=page_key)
+    offset = (int(page) - 1) * page_size
+    with col2:
+        if total_rows:
+            st.caption(f"Rows {offset + 1:,}–{min(offset + page_size, total_rows):,} of {total_rows:,}")
+        else:
+            st.caption("No matching rows")
+
+    rows = fetch_page(offset, page_size) if total_rows else None
+    if rows is not None:
+        st.dataframe(rows, hide_index=True)
+    return rows
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from config.settings import CHART_MAX_POINTS
+
+# Downsampled time-series charts.
+# Long series are reduced server-side to at most CHART_MAX_POINTS points per line with
+# Largest-Triangle-Three-Buckets (LTTB), which keeps peaks and troughs where a plain stride
+# would drop them. Streamlit can't send plotly's zoom back to the server, so zooming is a
+# date-range slider: the visible window is downsampled again at full resolution.
+
+
+# Positions of the points LTTB keeps out of a series sorted by x (first and last always kept)
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    # n_out - 2 buckets between the fixed end points
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(int), n)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi, next_hi = edges[i], edges[i + 1], edges[i + 2]
+        # the point forming the largest triangle with the last kept point and the next bucket's mean
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+# Rows of a long-format frame downsampled to n_out points per line (one line per `color` value)
+def downsample(df, x, y, n_out=CHART_MAX_POINTS, color=None):
+    groups = [df] if color is None else [group for _, group in df.groupby(color, sort=False, observed=True)]
+    parts = []
+    for group in groups:
+        group = group.sort_values(x)
+        positions = lttb_indices(pd.to_datetime(group[x]).to_numpy(dtype="datetime64[ns]").astype(np.int64),
+                                 group[y].to_numpy(), n_out)
+        parts.append(group.iloc[positions])
+    return pd.concat(parts) if parts else df
+
+
+# Line chart of a long-format frame. Series longer than max_points per line get a date-range
+# slider and are downsampled to max_points within the selected range.
+def time_series_chart(key, df, x, y, color=None, max_points=CHART_MAX_POINTS, **line_kwargs):
+    df = df.assign(**{x: pd.to_datetime(df[x])})
+    longest = df.groupby(color, observed=True).size().max() if color is not None and len(df) else len(df)
+    if longest > max_points:
+        first, last = df[x].min().to_pydatetime(), df[x].max().to_pydatetime()
+        start, end = st.slider("Zoom", min_value=first, max_value=last, value=(first, last),
+                               format="YYYY-MM-DD", key=f"{key}_zoom")
+        window = df[(df[x] >= start) & (df[x] <= end)]
+        df = downsample(window, x, y, max_points, color)
+        if len(df) < len(window):
+            st.caption(f"Showing {len(df):,} of {len(window):,} points - narrow the range for more detail")
+    fig = px.line(df, x=x, y=y, color=color, **line_kwargs)
+    st.plotly_chart(fig, key=key)
+    return fig
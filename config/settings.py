@@ -13,8 +13,157 @@ DATA_FILES = {
     "orders": "orders.csv", 
     "shipments": "shipments.csv",
     "costs": "costs.csv",
-    "suppliers": "suppliers.csv"
+    "suppliers": "suppliers.csv",
+    "unit_costs": "unit_costs.csv"
+}
+
+# Categorical domains
+ORDER_STATUSES = ["New", "Processing", "Shipped", "Delivered", "Cancelled"]
+SHIPMENT_STATUSES = ["In Transit", "Delivered", "Delayed", "Scheduled"]
+CARRIERS = ["FedEx", "UPS", "DHL", "USPS"]
+COST_CATEGORIES = ["Raw Materials", "Manufacturing", "Warehousing", "Transportation",
+                   "Inventory Holding", "Order Processing", "Returns", "Administrative"]
+
+# Column schemas applied by the data loader.
+# dtype is a numpy/pandas dtype, "string", "category" or "datetime";
+# categoricals may list their known domain under "categories" (values outside it are kept),
+# datetimes give an explicit "format".
+DATE_FORMAT = "ISO8601"
+
+DATA_SCHEMAS = {
+    "inventory": {
+        "item_id": {"dtype": "int32"},
+        "item_name": {"dtype": "string"},
+        "stock_level": {"dtype": "int32"},
+        "reorder_threshold": {"dtype": "int32"},
+        "supplier": {"dtype": "category"},
+        "lead_time_days": {"dtype": "int16"},
+        "last_updated": {"dtype": "datetime", "format": DATE_FORMAT},
+    },
+    "orders": {
+        "order_id": {"dtype": "string"},
+        "item_id": {"dtype": "int32"},
+        "quantity": {"dtype": "int32"},
+        "customer": {"dtype": "category"},
+        "order_date": {"dtype": "datetime", "format": DATE_FORMAT},
+        "requested_delivery": {"dtype": "datetime", "format": DATE_FORMAT},
+        "status": {"dtype": "category", "categories": ORDER_STATUSES},
+        "total_value": {"dtype": "float64"},
+    },
+    "shipments": {
+        "shipment_id": {"dtype": "string"},
+        "order_id": {"dtype": "string"},
+        "ship_date": {"dtype": "datetime", "format": DATE_FORMAT},
+        "carrier": {"dtype": "category", "categories": CARRIERS},
+        "status": {"dtype": "category", "categories": SHIPMENT_STATUSES},
+        "tracking_number": {"dtype": "string"},
+        "estimated_arrival": {"dtype": "datetime", "format": DATE_FORMAT},
+    },
+    "costs": {
+        "category": {"dtype": "category", "categories": COST_CATEGORIES},
+        "amount": {"dtype": "float64"},
+        "budget": {"dtype": "float64"},
+        "period": {"dtype": "category"},
+        "supplier": {"dtype": "category"},
+        "site": {"dtype": "category"},
+    },
+    "suppliers": {
+        "supplier_name": {"dtype": "string"},
+        "reliability_score": {"dtype": "float64"},
+        "avg_lead_time": {"dtype": "int16"},
+        "on_time_delivery": {"dtype": "float64"},
+        "quality_score": {"dtype": "float64"},
+        "location": {"dtype": "category"},
+    },
+    "unit_costs": {
+        "item_id": {"dtype": "int32"},
+        "unit_cost": {"dtype": "float64"},
+        "effective_date": {"dtype": "datetime", "format": DATE_FORMAT},
+    },
+}
+
+# Datasets kept sorted by a date column in their snapshots, so date ranges resolve by binary search
+DATA_SORT_KEYS = {
+    "orders": "order_date",
+    "shipments": "ship_date",
+    "unit_costs": "effective_date",
 }
 
 # Cache settings
-CACHE_TTL = 300  # 5 minutes
\ No newline at end of file
+CACHE_TTL = 300  # 5 minutes
+
+# Columnar snapshots of the CSV files (Arrow IPC, read back memory-mapped)
+SNAPSHOT_DIR = ".snapshots"
+
+# Transactional inventory store (SQLite, WAL mode)
+INVENTORY_DB = "inventory.db"
+
+# On-disk cache for computed results (forecasts, ...), size limit per namespace
+DISK_CACHE_DIR = ".cache"
+DISK_CACHE_MAX_MB = 256
+
+# Rows per page in paginated tables (only the visible page is sent to the browser)
+TABLE_PAGE_SIZE = 50
+
+# Shipment timeline: above this many shipments it shows shipments in flight per day instead of one bar each
+TIMELINE_MAX_BARS = 500
+
+# Time-series charts: points per line sent to the browser (longer series are downsampled)
+CHART_MAX_POINTS = 1000
+
+# Supplier scorecard charts: suppliers shown on the radar and in the ranking (best overall score first)
+SUPPLIER_RADAR_MAX = 10
+SUPPLIER_RANKING_MAX = 25
+
+# Cost analysis: rows shown in the breakdown charts (largest first)
+COST_BREAKDOWN_MAX = 25
+
+# Supplier performance time series (weekly/monthly/quarterly rollups). Orders and shipments
+# dated within this many days of the latest one already stored are re-read on every update
+# (shipments change status after they ship); older ones are taken as final.
+SUPPLIER_METRICS_DB = "supplier_metrics.db"
+SUPPLIER_METRICS_REOPEN_DAYS = 30
+
+# Inventory valuation: costing method used by default ("fifo" or "average"), the
+# items/suppliers shown in the value charts (highest value first) and the number of
+# incremental updates saved on disk before they are folded into a new full copy
+VALUATION_METHOD = "fifo"
+VALUATION_CHART_MAX = 25
+VALUATION_JOURNAL_MAX = 50
+
+# Replenishment planning: days of order history behind the demand statistics, service level
+# (chance of not running out within a lead time), cost per purchase order and yearly holding
+# cost as a share of unit cost (economic order quantity), and the days of demand ordered for
+# items without a unit cost
+REPLENISHMENT_LOOKBACK_DAYS = 90
+REPLENISHMENT_SERVICE_LEVEL = 0.95
+REPLENISHMENT_ORDER_COST = 50.0
+REPLENISHMENT_HOLDING_RATE = 0.25
+REPLENISHMENT_COVER_DAYS = 30
+
+# Forecast model evaluation: process pool size (None -> CPU count) and the
+# (series x days x models) size below which models are evaluated in-process
+FORECAST_MAX_WORKERS = None
+FORECAST_PARALLEL_MIN_CELLS = 2_000_000
+
+# Rolling-origin backtest: number of forecast origins, days between them and
+# the days of history each backtest forecast sees
+BACKTEST_CUTOFFS = 8
+BACKTEST_STEP_DAYS = 7
+BACKTEST_LOOKBACK_DAYS = 56
+
+# Alerts: severities from most to least urgent and the default rule thresholds
+ALERT_SEVERITIES = ["Critical", "High", "Medium", "Low"]
+ALERT_THRESHOLDS = {
+    "low_stock_pct": 20,         # stock below this % of the reorder threshold
+    "delay_days": 1,             # open shipments this many days past their estimated arrival
+    "overspend_pct": 0,          # period spend above budget by more than this %
+    "supplier_on_time_pct": 85,  # supplier on-time delivery below this %
+    "supplier_drop_pct": 5,      # on-time delivery drop (percentage points) between data versions
+}
+# Background alert evaluation: alert log database and seconds between runs
+ALERT_DB = "alerts.db"
+ALERT_EVAL_INTERVAL = 60
+# Shipments due more than this many days before the latest one seen are only re-checked
+# while they alert (or when rows are added or removed before them)
+ALERT_REOPEN_DAYS = 30
\ No newline at end of file
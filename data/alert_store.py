@@ -0,0 +1,197 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+import pandas as pd
+from config.settings import ALERT_DB, ALERT_SEVERITIES, ALERT_THRESHOLDS
+
+# Persistent alert log (SQLite in WAL mode).
+# The background scheduler records every evaluation run here and the alerts page only
+# reads from it. There is one row per alerting entity (item, shipment, ...) that is kept
+# after the alert resolves, so the log doubles as alert history. Alert thresholds saved
+# from the page are kept here too, so the scheduler picks them up on its next run.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    alert_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity TEXT NOT NULL UNIQUE,
+    rule TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    severity_rank INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    raised_at TEXT NOT NULL,
+    last_changed TEXT NOT NULL,
+    resolved_at TEXT,
+    occurrences INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_active ON alerts(severity_rank, raised_at) WHERE resolved_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_alerts_history ON alerts(severity_rank, raised_at);
+
+CREATE TABLE IF NOT EXISTS alert_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    evaluated_at TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    alert_count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS alert_settings (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+# Bumped when the alerts table changes shape; alerts are derived data, so an outdated
+# table is dropped and rebuilt by the next evaluation run (saved settings are kept)
+SCHEMA_VERSION = 2
+
+ALERT_COLUMNS = ["entity", "rule", "severity", "message", "first_seen", "raised_at", "resolved_at", "occurrences"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Absolute paths of the databases whose schema has been created by this process
+_initialised = set()
+
+
+@contextmanager
+def _connection():
+    path = os.path.abspath(ALERT_DB)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        if path not in _initialised:
+            conn.execute("PRAGMA journal_mode=WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS alerts")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(SCHEMA)
+            _initialised.add(path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _transaction(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _timestamp(value):
+    return pd.Timestamp(value).strftime(TIMESTAMP_FORMAT)
+
+
+def _alert_frame(df):
+    df["severity"] = pd.Categorical(df["severity"], categories=ALERT_SEVERITIES)
+    for column in ["first_seen", "raised_at", "resolved_at"]:
+        df[column] = pd.to_datetime(df[column], format="ISO8601")
+    return df
+
+
+# Record an evaluation run. Alerts are deduplicated by entity: only new, changed and
+# resolved alerts are written. An entity that alerts again after being resolved reopens
+# its row (raised_at moves, occurrences goes up) instead of adding a duplicate.
+def save_run(alerts, evaluated_at, seconds):
+    now = _timestamp(evaluated_at)
+    current = alerts.assign(severity_rank=alerts["severity"].cat.codes.astype(int),
+                            severity=alerts["severity"].astype(str))
+
+    with _connection() as conn, _transaction(conn):
+        active = pd.read_sql_query("SELECT entity, severity_rank, message FROM alerts WHERE resolved_at IS NULL", conn)
+        merged = current.merge(active, on="entity", how="outer", suffixes=("", "_stored"), indicator=True)
+        raised = merged[(merged["_merge"] == "left_only")
+                        | ((merged["_merge"] == "both") & ((merged["severity_rank"] != merged["severity_rank_stored"])
+                                                           | (merged["message"] != merged["message_stored"])))]
+        resolved = merged.loc[merged["_merge"] == "right_only", "entity"]
+
+        rows = raised.assign(raised_at=raised["detected_at"].dt.strftime(TIMESTAMP_FORMAT))
+        conn.executemany(
+            "INSERT INTO alerts (entity, rule, severity, severity_rank, message, first_seen, raised_at, last_changed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(entity) DO UPDATE SET rule = excluded.rule, severity = excluded.severity, "
+            "severity_rank = excluded.severity_rank, message = excluded.message, last_changed = excluded.last_changed, "
+            "raised_at = CASE WHEN resolved_at IS NULL THEN raised_at ELSE excluded.raised_at END, "
+            "occurrences = occurrences + (resolved_at IS NOT NULL), resolved_at = NULL",
+            ((entity, rule, severity, int(rank), message, raised_at, raised_at, now)
+             for entity, rule, severity, rank, message, raised_at
+             in rows[["entity", "rule", "severity", "severity_rank", "message", "raised_at"]].itertuples(index=False)))
+        conn.executemany("UPDATE alerts SET resolved_at = ?, last_changed = ? WHERE entity = ?",
+                         ((now, now, entity) for entity in resolved))
+        conn.execute("INSERT INTO alert_runs (evaluated_at, seconds, alert_count) VALUES (?, ?, ?)",
+                     (now, float(seconds), len(alerts)))
+    return {"raised": len(rows), "resolved": len(resolved)}
+
+
+# Latest evaluation run as a dict (evaluated_at, seconds, alert_count), or None before the first run
+def latest_run():
+    with _connection() as conn:
+        row = conn.execute("SELECT evaluated_at, seconds, alert_count FROM alert_runs "
+                           "ORDER BY run_id DESC LIMIT 1").fetchone()
+    if row is None:
+        return None
+    return {"evaluated_at": pd.Timestamp(row[0]), "seconds": row[1], "alert_count": row[2]}
+
+
+# FROM/WHERE clause for one severity. Active-alert queries are pinned to the partial index -
+# the planner would otherwise pick the full index and step over every resolved alert.
+def _alert_filter(severity, since, include_resolved):
+    where, params = ["severity_rank = ?"], [ALERT_SEVERITIES.index(severity)]
+    if not include_resolved:
+        where.append("resolved_at IS NULL")
+    if since is not None:
+        where.append("raised_at >= ?")
+        params.append(_timestamp(since))
+    table = "alerts" if include_resolved else "alerts INDEXED BY idx_alerts_active"
+    return f" FROM {table} WHERE " + " AND ".join(where), params
+
+
+# Alerts with the given severities raised since a time, most severe and newest first.
+# Each severity is one backward range scan over the (severity, raised_at) index of active
+# alerts - or of all alerts with include_resolved - that stops after `limit` rows.
+def read_alerts(severities=None, since=None, limit=None, include_resolved=False):
+    frames = []
+    remaining = limit
+    with _connection() as conn:
+        for severity in ALERT_SEVERITIES:
+            if severities is not None and severity not in severities:
+                continue
+            clause, params = _alert_filter(severity, since, include_resolved)
+            query = f"SELECT {', '.join(ALERT_COLUMNS)}{clause} ORDER BY raised_at DESC"
+            if remaining is not None:
+                query += " LIMIT ?"
+                params.append(remaining)
+            frames.append(pd.read_sql_query(query, conn, params=params))
+            if remaining is not None:
+                remaining -= len(frames[-1])
+                if remaining <= 0:
+                    break
+    frames = [frame for frame in frames if len(frame)]
+    alerts = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=ALERT_COLUMNS)
+    return _alert_frame(alerts)
+
+
+# Number of alerts per severity, optionally only those raised since a time
+def alert_counts(since=None, include_resolved=False):
+    counts = {}
+    with _connection() as conn:
+        for severity in ALERT_SEVERITIES:
+            clause, params = _alert_filter(severity, since, include_resolved)
+            counts[severity] = conn.execute(f"SELECT count(*){clause}", params).fetchone()[0]
+    return counts
+
+
+# Alert thresholds: the defaults from settings overridden by any saved values
+def load_thresholds():
+    with _connection() as conn:
+        saved = dict(conn.execute("SELECT key, value FROM alert_settings").fetchall())
+    return {key: type(default)(saved.get(key, default)) for key, default in ALERT_THRESHOLDS.items()}
+
+
+def save_thresholds(thresholds):
+    with _connection() as conn, _transaction(conn):
+        conn.executemany("INSERT INTO alert_settings (key, value) VALUES (?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                         [(key, float(value)) for key, value in thresholds.items() if key in ALERT_THRESHOLDS])
@@ -0,0 +1,119 @@
+import threading
+import numpy as np
+import pandas as pd
+from data import disk_cache
+from data.data_loader import dataset_fingerprint, read_dataset
+from data.frame_diff import group_hashes, reaggregate_changed
+from data.periods import period_bounds
+
+# Cost cube.
+# Cost lines summed per period x category (x supplier x site, where costs.csv has them)
+# into amount, budget and line count. Periods are ordered by their date range
+# (data/periods.py), so any run of periods can be sliced and compared with the run just
+# before it. The cube is updated per period: every period's lines are fingerprinted and a
+# new version of costs.csv only re-aggregates the periods that are new or whose lines
+# changed (and drops those that are gone), so appending a month touches one period.
+# Totals and variances per period and category, with the change from the category's
+# previous period, are precomputed with each update.
+
+DIMENSIONS = ["category", "supplier", "site"]
+MEASURES = ["amount", "budget", "lines"]
+
+_state = None
+_lock = threading.Lock()
+
+
+def _dimensions(costs):
+    return [dimension for dimension in DIMENSIONS if dimension in costs.columns]
+
+
+def _aggregate(costs, dimensions):
+    frame = pd.DataFrame({
+        "period": costs["period"].astype(str),
+        **{dimension: costs[dimension].astype(str) for dimension in dimensions},
+        "amount": costs["amount"].astype(float),
+        "budget": costs["budget"].astype(float),
+        "lines": 1,
+    })
+    return frame.groupby(["period"] + dimensions, sort=False)[MEASURES].sum().reset_index()
+
+
+def _with_variance(frame):
+    frame["variance"] = frame["budget"] - frame["amount"]
+    frame["variance_pct"] = frame["variance"] / frame["budget"].where(frame["budget"] != 0) * 100
+    return frame
+
+
+# Period labels ordered by date range (unparseable labels last) with their first and last day
+def _periods(labels):
+    start, end = period_bounds(pd.Series(labels, dtype=object))
+    periods = pd.DataFrame({"period": labels, "start": start.to_numpy(), "end": end.to_numpy()})
+    return periods.sort_values(["start", "end", "period"], na_position="last", ignore_index=True)
+
+
+# Totals per period and category in period order, with the change from the category's previous period
+def _trend(cells, periods):
+    trend = cells.groupby(["period", "category"], sort=False)[MEASURES].sum().reset_index()
+    order = pd.Series(np.arange(len(periods)), index=periods["period"])
+    trend = trend.assign(order=trend["period"].map(order)).sort_values(["order", "category"], ignore_index=True)
+    trend["period_start"] = trend["period"].map(periods.set_index("period")["start"])
+    by_category = trend.groupby("category", sort=False)["amount"]
+    trend["change"] = by_category.diff()
+    trend["change_pct"] = by_category.pct_change() * 100
+    return _with_variance(trend.drop(columns="order"))
+
+
+def _build(costs, fingerprint, state):
+    dimensions = _dimensions(costs)
+    period = costs["period"].astype(str)
+    hashes = group_hashes(costs, period)
+    if state is None or state["dimensions"] != dimensions:
+        cells = _aggregate(costs, dimensions)
+    else:
+        kept, fresh = reaggregate_changed(costs, period, hashes, state["hashes"], state["cells"],
+                                          state["cells"]["period"], lambda rows: _aggregate(rows, dimensions))
+        cells = pd.concat([kept, fresh], ignore_index=True)
+
+    periods = _periods(cells["period"].unique())
+    trend = _trend(cells, periods) if "category" in dimensions else None
+    return {"fingerprint": fingerprint, "dimensions": dimensions, "hashes": hashes,
+            "cells": cells, "periods": periods, "trend": trend}
+
+
+# The cost cube for the current costs.csv, or None without cost data
+def load_cost_cube():
+    global _state
+    with _lock:
+        fingerprint = dataset_fingerprint("costs")
+        if fingerprint is None:
+            return None
+        if _state is None:
+            _state = disk_cache.get("cost_cube", "costs")
+        if _state is None or _state["fingerprint"] != fingerprint:
+            costs = read_dataset("costs")
+            if costs.empty or not {"period", "amount", "budget"} <= set(costs.columns):
+                return None
+            _state = _build(costs, fingerprint, _state)
+            disk_cache.put("cost_cube", "costs", _state)
+        return _state
+
+
+# Period labels in date order
+def period_labels(cube):
+    return cube["periods"]["period"].tolist()
+
+
+# The same number of periods just before the given ones (fewer at the start of the data)
+def previous_periods(cube, periods):
+    labels = period_labels(cube)
+    first = min(labels.index(period) for period in periods)
+    return labels[max(0, first - len(periods)):first]
+
+
+# Totals with variance over the given periods, per `by` (a dimension) or overall when by is None
+def slice_costs(cube, periods, by="category"):
+    cells = cube["cells"]
+    cells = cells[cells["period"].isin(periods)]
+    if by is None:
+        return _with_variance(cells[MEASURES].sum().to_frame().T)
+    return _with_variance(cells.groupby(by, sort=True)[MEASURES].sum().reset_index())
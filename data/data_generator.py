@@ -1,7 +1,9 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import argparse
 import os
+from config.settings import DATA_FILES, ORDER_STATUSES, SHIPMENT_STATUSES, CARRIERS, COST_CATEGORIES
 
 
 # sample data generation
@@ -29,6 +31,8 @@ def create_sample_data_if_not_exists():
     if not os.path.exists("orders.csv"):
         orders_data = {
             "order_id": [f"ORD-{i:04d}" for i in range(1, 31)],
+            "item_id": [i % 10 + 1 for i in range(30)],
+            "quantity": np.random.randint(1, 50, 30),
             "customer": [f"Customer {chr(65 + i % 8)}" for i in range(30)],
             "order_date": [(datetime.now() - pd.Timedelta(days=i)) for i in range(30)],
             "requested_delivery": [(datetime.now() + pd.Timedelta(days=i % 10 + 5)) for i in range(30)],
@@ -77,4 +81,216 @@ def create_sample_data_if_not_exists():
             "quality_score": [4.5, 3.9, 4.8, 3.7, 4.1],
             "location": ["Mumbai, Maharashtra", "Bangalore, Karnataka", "Ludhiana, Punjab", "Hyderabad, Telangana", "Ahmedabad, Gujarat"]
         }
-        pd.DataFrame(supplier_data).to_csv("suppliers.csv", index=False)
\ No newline at end of file
+        pd.DataFrame(supplier_data).to_csv("suppliers.csv", index=False)
+    
+    
+    # Unit costs per item - a new row whenever an item's purchase cost changes
+    if not os.path.exists("unit_costs.csv"):
+        unit_costs_data = {
+            "item_id": list(range(1, 11)) * 2,
+            "unit_cost": [42.5, 18.0, 0.35, 310.0, 1.2, 12.75, 0.05, 3.4, 27.0, 185.0,
+                          44.0, 17.2, 0.38, 325.0, 1.25, 13.5, 0.05, 3.6, 28.5, 179.0],
+            "effective_date": [datetime.now() - pd.Timedelta(days=180)] * 10 + [datetime.now() - pd.Timedelta(days=30)] * 10
+        }
+        pd.DataFrame(unit_costs_data).to_csv("unit_costs.csv", index=False)
+
+
+#########################################################################################################################################
+# Scaled synthetic data for load testing
+#
+# generate_scaled_data(scale, seed) writes referentially consistent datasets:
+# ~1000 * scale orders (+ ~85% as many shipments), inventory items that the orders
+# reference, the suppliers those items come from, the items' unit cost history and
+# monthly costs per category/site.
+# Rows are produced in vectorized chunks and appended to the CSVs, so memory stays
+# bounded by chunk_size whatever the scale. The same (scale, seed, end_date) always
+# produces the same files.
+
+ITEM_MATERIALS = ["Aluminum", "Steel", "Copper", "Plastic", "Rubber", "Carbon", "Glass", "Ceramic"]
+ITEM_TYPES = ["Sheets", "Bolts", "Circuit Boards", "Pumps", "Boxes", "Lubricant", "Resistors",
+              "Casings", "Gear Assemblies", "Valves", "Bearings", "Cables"]
+SUPPLIER_CITIES = ["Mumbai, Maharashtra", "Bangalore, Karnataka", "Ludhiana, Punjab", "Hyderabad, Telangana",
+                   "Ahmedabad, Gujarat", "Chennai, Tamil Nadu", "Pune, Maharashtra", "Kolkata, West Bengal"]
+COST_SITES = ["Plant North", "Plant South", "Central Warehouse", "Distribution Hub"]
+
+
+# Row counts for a scale factor (scale=1 -> 1,000 orders)
+def scaled_sizes(scale):
+    n_orders = max(1, int(1000 * scale))
+    n_items = max(10, min(n_orders // 10, int(1000 * np.sqrt(scale))))
+    return {
+        "orders": n_orders,
+        "items": n_items,
+        "suppliers": max(5, n_items // 50),
+        "customers": max(8, n_orders // 200),
+    }
+
+
+# Independent, reproducible random stream per (table, chunk)
+def _rng(seed, table, chunk_index=0):
+    return np.random.default_rng([seed, table, chunk_index])
+
+
+# Zero-padded labels such as "ORD-0001", built column-wise
+def _labels(prefix, numbers, width):
+    return prefix + pd.Series(numbers).astype(str).str.zfill(width)
+
+
+def _ids(prefix, start, stop, width):
+    return _labels(prefix, np.arange(start, stop), width)
+
+
+def _write_chunks(path, chunks):
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        rows += len(chunk)
+    return rows
+
+
+def _supplier_chunks(sizes, seed, chunk_size):
+    n = sizes["suppliers"]
+    for i, start in enumerate(range(0, n, chunk_size)):
+        stop = min(start + chunk_size, n)
+        rng = _rng(seed, 0, i)
+        size = stop - start
+        yield pd.DataFrame({
+            "supplier_name": _ids("Supplier ", start + 1, stop + 1, 5),
+            "reliability_score": rng.uniform(3.0, 5.0, size).round(1),
+            "avg_lead_time": rng.integers(3, 21, size),
+            "on_time_delivery": rng.uniform(0.7, 0.99, size).round(2),
+            "quality_score": rng.uniform(3.0, 5.0, size).round(1),
+            "location": rng.choice(SUPPLIER_CITIES, size),
+        })
+
+
+def _inventory_chunks(sizes, seed, chunk_size, end_date):
+    n = sizes["items"]
+    for i, start in enumerate(range(0, n, chunk_size)):
+        stop = min(start + chunk_size, n)
+        rng = _rng(seed, 1, i)
+        size = stop - start
+        item_ids = np.arange(start + 1, stop + 1)
+        names = pd.Series(rng.choice(ITEM_MATERIALS, size)) + " " + rng.choice(ITEM_TYPES, size) + _labels(" #", item_ids, 6)
+        reorder_threshold = rng.integers(20, 200, size)
+        yield pd.DataFrame({
+            "item_id": item_ids,
+            "item_name": names,
+            "stock_level": (reorder_threshold * rng.uniform(0.2, 3.0, size)).astype(int),
+            "reorder_threshold": reorder_threshold,
+            "supplier": _labels("Supplier ", rng.integers(1, sizes["suppliers"] + 1, size), 5),
+            "lead_time_days": rng.integers(3, 22, size),
+            "last_updated": end_date - pd.to_timedelta(rng.integers(0, 30 * 86400, size), unit="s"),
+        })
+
+
+# One to four unit costs per item, drifting from a base cost over the history
+def _unit_cost_chunks(sizes, seed, chunk_size, end_date, history_days):
+    n = sizes["items"]
+    for i, start in enumerate(range(0, n, chunk_size)):
+        stop = min(start + chunk_size, n)
+        rng = _rng(seed, 4, i)
+        changes = rng.integers(1, 5, stop - start)
+        item_ids = np.repeat(np.arange(start + 1, stop + 1), changes)
+        base = np.repeat(rng.lognormal(3, 1, stop - start), changes)
+        size = len(item_ids)
+        yield pd.DataFrame({
+            "item_id": item_ids,
+            "unit_cost": (base * rng.uniform(0.9, 1.15, size)).round(2),
+            "effective_date": end_date - pd.to_timedelta(rng.integers(0, history_days, size), unit="D"),
+        })
+
+
+# Orders and their shipments are generated together so shipments only reference written orders
+def _order_shipment_chunks(sizes, seed, chunk_size, end_date, history_days):
+    n = sizes["orders"]
+    width = max(4, len(str(n)))
+    shipment_count = 0
+    for i, start in enumerate(range(0, n, chunk_size)):
+        stop = min(start + chunk_size, n)
+        rng = _rng(seed, 2, i)
+        size = stop - start
+
+        order_ids = _ids("ORD-", start + 1, stop + 1, width)
+        order_date = end_date - pd.to_timedelta(rng.integers(0, history_days * 86400, size), unit="s")
+        orders = pd.DataFrame({
+            "order_id": order_ids,
+            "item_id": rng.integers(1, sizes["items"] + 1, size),
+            "quantity": rng.integers(1, 50, size),
+            "customer": _labels("Customer ", rng.integers(1, sizes["customers"] + 1, size), 5),
+            "order_date": order_date,
+            "requested_delivery": order_date + pd.to_timedelta(rng.integers(5, 15, size), unit="D"),
+            "status": rng.choice(ORDER_STATUSES, size, p=[0.1, 0.3, 0.3, 0.2, 0.1]),
+            "total_value": rng.uniform(500, 10000, size).round(2),
+        })
+
+        shipped = rng.random(size) < 0.85
+        m = int(shipped.sum())
+        ship_date = orders["order_date"].values[shipped] + pd.to_timedelta(rng.integers(0, 3 * 86400, m), unit="s")
+        shipments = pd.DataFrame({
+            "shipment_id": _ids("SHP-", shipment_count + 1, shipment_count + m + 1, width),
+            "order_id": order_ids.values[shipped],
+            "ship_date": ship_date,
+            "carrier": rng.choice(CARRIERS, m),
+            "status": rng.choice(SHIPMENT_STATUSES, m, p=[0.4, 0.3, 0.2, 0.1]),
+            "tracking_number": _ids("TRK", 100000 + shipment_count, 100000 + shipment_count + m, 6),
+            "estimated_arrival": ship_date + pd.to_timedelta(rng.integers(1, 11, m), unit="D"),
+        })
+        shipment_count += m
+        yield orders, shipments
+
+
+def _cost_chunks(sizes, seed, end_date, history_days):
+    periods = pd.period_range(end=end_date.to_period("M"), periods=max(1, history_days // 30), freq="M")
+    for i, period in enumerate(periods):
+        rng = _rng(seed, 3, i)
+        grid = pd.MultiIndex.from_product([COST_CATEGORIES, COST_SITES], names=["category", "site"]).to_frame(index=False)
+        size = len(grid)
+        budget = rng.uniform(5000, 150000, size).round(-2)
+        yield pd.DataFrame({
+            "category": grid["category"],
+            "amount": (budget * rng.uniform(0.8, 1.15, size)).round(2),
+            "budget": budget,
+            "period": str(period),
+            "supplier": _labels("Supplier ", rng.integers(1, sizes["suppliers"] + 1, size), 5),
+            "site": grid["site"],
+        })
+
+
+def generate_scaled_data(scale, seed=42, output_dir=".", chunk_size=500_000, history_days=730, end_date=None):
+    sizes = scaled_sizes(scale)
+    end_date = pd.Timestamp(end_date) if end_date is not None else pd.Timestamp.now().normalize()
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {key: os.path.join(output_dir, filename) for key, filename in DATA_FILES.items()}
+
+    rows = {
+        "suppliers": _write_chunks(paths["suppliers"], _supplier_chunks(sizes, seed, chunk_size)),
+        "inventory": _write_chunks(paths["inventory"], _inventory_chunks(sizes, seed, chunk_size, end_date)),
+        "unit_costs": _write_chunks(paths["unit_costs"], _unit_cost_chunks(sizes, seed, chunk_size, end_date, history_days)),
+        "costs": _write_chunks(paths["costs"], _cost_chunks(sizes, seed, end_date, history_days)),
+        "orders": 0,
+        "shipments": 0,
+    }
+    for i, (orders, shipments) in enumerate(_order_shipment_chunks(sizes, seed, chunk_size, end_date, history_days)):
+        orders.to_csv(paths["orders"], mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        shipments.to_csv(paths["shipments"], mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        rows["orders"] += len(orders)
+        rows["shipments"] += len(shipments)
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate scaled synthetic supply chain data")
+    parser.add_argument("--scale", type=float, default=1.0, help="scale factor (1 -> 1,000 orders)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--chunk-size", type=int, default=500_000)
+    parser.add_argument("--history-days", type=int, default=730)
+    parser.add_argument("--end-date", default=None, help="last day of generated history (default: today)")
+    args = parser.parse_args()
+
+    written = generate_scaled_data(args.scale, args.seed, args.output_dir, args.chunk_size,
+                                   args.history_days, args.end_date)
+    for key, count in written.items():
+        print(f"{key}: {count:,} rows")
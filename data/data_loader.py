@@ -1,37 +1,133 @@
 import streamlit as st
 import pandas as pd
-from config.settings import DATA_FILES, CACHE_TTL
+import time
+import hashlib
+from config.settings import DATA_FILES, DATA_SCHEMAS, DATA_SORT_KEYS, CACHE_TTL
+from data.snapshot_store import read_snapshot, read_snapshot_table, source_fingerprint, snapshots_available
+from data import inventory_store
 
 
-# Load data with caching
-@st.cache_data(ttl=300)
+# Fingerprint of each dataset as last served by this server process
+_served_fingerprints = {}
 
+
+# Storage dtype for "string" schema columns - Arrow-backed when pyarrow is available
+STRING_DTYPE = pd.StringDtype("pyarrow") if snapshots_available() else pd.StringDtype()
+
+
+# Short hash of a dataset's schema and sort key, so snapshots are rebuilt when either changes
+def schema_tag(key):
+    schema = DATA_SCHEMAS.get(key, {})
+    return hashlib.md5(repr((sorted(schema.items()), DATA_SORT_KEYS.get(key))).encode()).hexdigest()[:12]
+
+
+# Column dtypes for pd.read_csv (datetimes are converted afterwards with their explicit format)
+def _csv_dtypes(schema):
+    dtypes = {}
+    for col, spec in schema.items():
+        if spec["dtype"] == "datetime":
+            continue
+        dtypes[col] = STRING_DTYPE if spec["dtype"] == "string" else spec["dtype"]
+    return dtypes
+
+
+# Apply a dataset's schema to a DataFrame whose columns were read untyped or partly typed
+def apply_schema(df, key):
+    schema = DATA_SCHEMAS.get(key, {})
+    for col, spec in schema.items():
+        if col not in df.columns:
+            continue
+
+        dtype = spec["dtype"]
+        if dtype == "datetime":
+            df[col] = pd.to_datetime(df[col], format=spec.get("format"))
+        elif dtype == "category":
+            values = df[col].astype("category")
+            domain = spec.get("categories")
+            if domain:
+                # known values first, anything unexpected is kept rather than turned into NaN
+                extra = sorted(set(values.cat.categories) - set(domain))
+                values = values.cat.set_categories(list(domain) + extra)
+            df[col] = values
+        else:
+            df[col] = df[col].astype(STRING_DTYPE if dtype == "string" else dtype)
+    return df
+
+
+# Parse a source CSV into a typed DataFrame (only runs when its snapshot is stale).
+# Datasets with a sort key are stored sorted by it (stable, missing dates last).
+def parse_csv(filename, key):
+    df = apply_schema(pd.read_csv(filename, dtype=_csv_dtypes(DATA_SCHEMAS.get(key, {}))), key)
+    sort_key = DATA_SORT_KEYS.get(key)
+    if sort_key in df.columns:
+        df = df.sort_values(sort_key, kind="stable", na_position="last", ignore_index=True)
+    return df
+
+
+# Identity of a dataset: the store version for inventory, otherwise the file's mtime/size.
+# None if the data is missing.
+def dataset_fingerprint(key):
+    if key == "inventory":
+        version = inventory_store.inventory_version()
+        return f"store:{version}" if version is not None else None
+    try:
+        return source_fingerprint(DATA_FILES[key])
+    except FileNotFoundError:
+        return None
+
+
+# Read a dataset without the Streamlit cache (inventory from its store, the rest from snapshots)
+def read_dataset(key):
+    if key == "inventory":
+        return apply_schema(inventory_store.read_inventory(), key)
+    return read_snapshot(DATA_FILES[key], lambda filename: parse_csv(filename, key), schema_tag(key))
+
+
+# Memory-mapped Arrow table of a CSV dataset (for query engines that scan Arrow directly)
+def read_dataset_table(key):
+    return read_snapshot_table(DATA_FILES[key], lambda filename: parse_csv(filename, key), schema_tag(key))
+
+
+# Each dataset is cached on its own, keyed by its fingerprint, so a changed
+# file is a cache miss for that dataset only
+@st.cache_data(ttl=CACHE_TTL, max_entries=2 * len(DATA_FILES), show_spinner=False)
+def _load_dataset_cached(key, fingerprint):
+    return read_dataset(key)
+
+
+# Load a single dataset with error handling
+def load_dataset(key):
+    fingerprint = dataset_fingerprint(key)
+    if fingerprint is None:
+        st.warning(f"Data file {DATA_FILES[key]} not found! Some features may be limited.")
+        return pd.DataFrame()
+
+    df = _load_dataset_cached(key, fingerprint)
+    _served_fingerprints[key] = fingerprint
+    return df
+
+
+# Load only the requested datasets (e.g. those a page declares in REQUIRED_DATA)
+def load_datasets(keys):
+    return {key: load_dataset(key) for key in keys}
+
+
+# Load all necessary data files
 def load_data():
+    return load_datasets(DATA_FILES)
+
+
+# Reload only the datasets whose file changed since they were last served.
+# Returns {dataset: seconds taken} for the datasets that were reloaded.
+def refresh_data(keys=None):
+    reloaded = {}
+    for key in keys if keys is not None else DATA_FILES:
+        fingerprint = dataset_fingerprint(key)
+        if fingerprint is None or fingerprint == _served_fingerprints.get(key):
+            continue
+
+        start = time.perf_counter()
+        load_dataset(key)
+        reloaded[key] = time.perf_counter() - start
 
-    # Load all necessary data files with error handling
-    data_files = {
-        "inventory": "inventory.csv",
-        "orders": "orders.csv",
-        "shipments": "shipments.csv",
-        "costs": "costs.csv",
-        "suppliers": "suppliers.csv"
-    }
-    
-    data = {}
-    for key, filename in data_files.items():
-        try:
-            df = pd.read_csv(filename)
-            # Convert date columns if they exist
-            date_columns = [col for col in df.columns if 'date' in col.lower()]
-            for col in date_columns:
-                try:
-                    df[col] = pd.to_datetime(df[col])
-                except:
-                    pass
-            data[key] = df
-        
-        except FileNotFoundError:
-            st.warning(f"Data file {filename} not found! Some features may be limited.")
-            data[key] = pd.DataFrame()
-    
-    return data
\ No newline at end of file
+    return reloaded
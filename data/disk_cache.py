@@ -0,0 +1,82 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from config.settings import DISK_CACHE_DIR, DISK_CACHE_MAX_MB
+
+# Persistent on-disk cache for computed results (forecasts, scorecards, ...).
+# Entries are pickles grouped by namespace; reading an entry marks it as recently
+# used and each namespace is kept under DISK_CACHE_MAX_MB by evicting the least
+# recently used entries.
+
+_MISSING = object()
+
+
+# Stable key from any repr-able parts (data fingerprints, model parameters, ...)
+def cache_key(*parts):
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+
+def _namespace_dir(namespace):
+    return os.path.join(DISK_CACHE_DIR, namespace)
+
+
+def _entry_path(namespace, key):
+    return os.path.join(_namespace_dir(namespace), f"{key}.pkl")
+
+
+def get(namespace, key, default=None):
+    path = _entry_path(namespace, key)
+    try:
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return default
+    try:
+        os.utime(path)
+    except OSError:  # evicted by another process in the meantime
+        pass
+    return value
+
+
+def put(namespace, key, value, max_mb=DISK_CACHE_MAX_MB):
+    os.makedirs(_namespace_dir(namespace), exist_ok=True)
+    path = _entry_path(namespace, key)
+    fd, tmp_path = tempfile.mkstemp(dir=_namespace_dir(namespace), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    evict(namespace, max_mb)
+
+
+# Drop least recently used entries until the namespace fits in max_mb
+def evict(namespace, max_mb=DISK_CACHE_MAX_MB):
+    entries = []
+    with os.scandir(_namespace_dir(namespace)) as it:
+        for entry in it:
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_mb * 1024 * 1024:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+# Return the cached value for key, computing and storing it on a miss
+def cached(namespace, key, compute, max_mb=DISK_CACHE_MAX_MB):
+    value = get(namespace, key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        put(namespace, key, value, max_mb)
+    return value
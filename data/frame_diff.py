@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# Row-level diff between two versions of a keyed frame, for structures that are updated
+# incrementally (the inventory valuation, the supplier metrics store): only rows that are
+# new, gone or changed need to be re-aggregated or revalued. Aggregates kept per group of
+# rows (the KPI cube's days, the cost cube's periods) are diffed by group fingerprints instead.
+
+
+# Rows of new (positions into it) whose value differs from old at the matched positions
+def _differs(new, old, new_rows, old_rows):
+    if isinstance(new.dtype, pd.CategoricalDtype) and new.dtype == old.dtype:
+        return new.cat.codes.to_numpy()[new_rows] != old.cat.codes.to_numpy()[old_rows]
+    a, b = new.to_numpy()[new_rows], old.to_numpy()[old_rows]
+    return ~((a == b) | (pd.isna(a) & pd.isna(b)))
+
+
+# Match rows to the previous version by key: unchanged key prefix (rows appended) or a key lookup.
+# Returns the previous position of every row (-1 for new rows), or None when keys aren't unique.
+def _match_rows(keys, old_keys):
+    n_old = len(old_keys)
+    if len(keys) >= n_old and keys[:n_old].equals(old_keys):
+        return np.concatenate([np.arange(n_old), np.full(len(keys) - n_old, -1)])
+    if keys.is_unique and old_keys.is_unique:
+        return old_keys.get_indexer(keys)
+    return None
+
+
+# (added, removed) boolean masks: rows of frame that are new or changed since old_frame, and rows
+# of old_frame that are gone or changed. None when the key column isn't unique.
+def diff_rows(frame, old_frame, key):
+    positions = _match_rows(pd.Index(frame[key]), pd.Index(old_frame[key]))
+    if positions is None:
+        return None
+    added = positions < 0
+    matched = np.flatnonzero(~added)
+    for column in frame.columns:
+        if column != key:
+            added[matched] |= _differs(frame[column], old_frame[column], matched, positions[matched])
+    removed = np.ones(len(old_frame), dtype=bool)
+    removed[positions[~added]] = False
+    return added, removed
+
+
+# Fingerprint of each group's rows: (row-hash sum, row count) per group label
+def group_hashes(frame, groups):
+    hashes = pd.util.hash_pandas_object(frame, index=False)
+    return hashes.groupby(groups.to_numpy()).agg(["sum", "count"])
+
+
+# Re-aggregate only the groups whose rows are new or changed since old_hashes (both from
+# group_hashes). old_result holds the previous aggregate with the group of each of its rows in
+# old_groups. Returns (kept, fresh): the old_result rows of unchanged groups and the aggregate
+# of the rows of the other ones; groups that are gone are in neither.
+def reaggregate_changed(frame, groups, hashes, old_hashes, old_result, old_groups, aggregate):
+    unchanged = hashes.index.isin(old_hashes.index)
+    unchanged[unchanged] = (hashes[unchanged] == old_hashes.loc[hashes.index[unchanged]].to_numpy()).all(axis=1).to_numpy()
+    kept = old_result[pd.Index(old_groups).isin(hashes.index[unchanged])]
+    fresh = aggregate(frame[groups.isin(hashes.index[~unchanged]).to_numpy()])
+    return kept, fresh
@@ -0,0 +1,265 @@
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+from config.settings import DATA_FILES, INVENTORY_DB
+from data.snapshot_store import source_fingerprint
+
+# Transactional inventory store (SQLite in WAL mode).
+# Items hold the current stock level; every change to it is also appended to
+# stock_movements in the same transaction. Readers get a consistent snapshot from a
+# single SELECT while writers update one row at a time, so concurrent operators
+# don't overwrite each other. inventory.csv stays the interchange format: it is
+# imported whenever it changes (stock differences are recorded as "import" movements and
+# items no longer in the file are removed) and can be exported back with export_inventory_csv().
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    item_id INTEGER PRIMARY KEY,
+    item_name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    stock_level INTEGER NOT NULL,
+    reorder_threshold INTEGER NOT NULL,
+    supplier TEXT,
+    lead_time_days INTEGER,
+    last_updated TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_items_name_key ON items(name_key);
+
+CREATE TABLE IF NOT EXISTS stock_movements (
+    movement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER NOT NULL REFERENCES items(item_id),
+    quantity INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_movements_item ON stock_movements(item_id, movement_id);
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+ITEM_COLUMNS = ["item_id", "item_name", "stock_level", "reorder_threshold", "supplier", "lead_time_days", "last_updated"]
+
+# Absolute paths of the databases whose schema has been created by this process
+_initialised = set()
+
+
+# Normalised item name used for lookups (trimmed, lower-case)
+def normalise_name(item_name):
+    return str(item_name).strip().lower()
+
+
+def _now():
+    return datetime.now().isoformat(sep=" ")
+
+
+@contextmanager
+def _connection():
+    path = os.path.abspath(INVENTORY_DB)
+    created = not os.path.exists(path)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        if path not in _initialised or created:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # identity of this database file, so versions of a recreated store never match the old ones
+            conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('store_id', ?)", (uuid.uuid4().hex,))
+            _initialised.add(path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+    finally:
+        conn.close()
+
+
+# Write transaction - BEGIN IMMEDIATE takes the write lock up front so read-modify-write is atomic
+@contextmanager
+def _transaction(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _get_meta(conn, key):
+    row = conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_meta(conn, key, value):
+    conn.execute("INSERT INTO store_meta (key, value) VALUES (?, ?) "
+                 "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, str(value)))
+
+
+# Every write bumps the version, which the loader uses as the dataset fingerprint
+def _bump_version(conn):
+    version = int(_get_meta(conn, "version") or 0) + 1
+    _set_meta(conn, "version", version)
+    return version
+
+
+# The catalogue version only moves when items are added or renamed (not on stock changes)
+def _bump_catalogue_version(conn):
+    _set_meta(conn, "catalogue_version", int(_get_meta(conn, "catalogue_version") or 0) + 1)
+
+
+def _csv_fingerprint():
+    try:
+        return source_fingerprint(DATA_FILES["inventory"])
+    except FileNotFoundError:
+        return None
+
+
+# Import inventory.csv when it differs from the file last imported (or exported)
+def _sync_from_csv(conn):
+    fingerprint = _csv_fingerprint()
+    if fingerprint is None or fingerprint == _get_meta(conn, "csv_fingerprint"):
+        return
+
+    with _transaction(conn):
+        if fingerprint == _get_meta(conn, "csv_fingerprint"):  # another session got here first
+            return
+        df = pd.read_csv(DATA_FILES["inventory"])
+        df["name_key"] = df["item_name"].astype(str).str.strip().str.lower()
+        df["last_updated"] = df["last_updated"].astype(str)
+        columns = ITEM_COLUMNS + ["name_key"]
+
+        old_levels = pd.read_sql_query("SELECT item_id, stock_level FROM items", conn).set_index("item_id")["stock_level"]
+        levels = df.drop_duplicates("item_id", keep="last").set_index("item_id")["stock_level"]
+        change = levels.sub(old_levels, fill_value=0).astype("int64")
+        now = _now()
+        conn.executemany("INSERT INTO stock_movements (item_id, quantity, reason, created_at) VALUES (?, ?, ?, ?)",
+                         [(int(item_id), int(quantity), "import", now) for item_id, quantity in change[change != 0].items()])
+        conn.executemany("DELETE FROM items WHERE item_id = ?",
+                         [(int(item_id),) for item_id in old_levels.index.difference(levels.index)])
+        conn.executemany(
+            f"INSERT INTO items ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            "ON CONFLICT(item_id) DO UPDATE SET "
+            + ", ".join(f"{col} = excluded.{col}" for col in columns if col != "item_id"),
+            df[columns].astype(object).where(df[columns].notna(), None).itertuples(index=False, name=None),
+        )
+        _set_meta(conn, "csv_fingerprint", fingerprint)
+        _bump_version(conn)
+        _bump_catalogue_version(conn)
+
+
+# Current store version ("<store id>:<write count>"), or None when there is neither a store
+# nor a CSV to import
+def inventory_version():
+    if not os.path.exists(INVENTORY_DB) and _csv_fingerprint() is None:
+        return None
+    with _connection() as conn:
+        _sync_from_csv(conn)
+        return f"{_get_meta(conn, 'store_id')}:{_get_meta(conn, 'version') or '0'}"
+
+
+# Consistent snapshot of all items
+def read_inventory():
+    with _connection() as conn:
+        _sync_from_csv(conn)
+        return pd.read_sql_query(f"SELECT {', '.join(ITEM_COLUMNS)} FROM items ORDER BY item_id", conn)
+
+
+# Current catalogue version (see _bump_catalogue_version)
+def catalogue_version():
+    with _connection() as conn:
+        _sync_from_csv(conn)
+        return _get_meta(conn, "catalogue_version") or "0"
+
+
+# Item ids and normalised names with the catalogue version they belong to
+def read_catalogue():
+    with _connection() as conn:
+        _sync_from_csv(conn)
+        conn.execute("BEGIN")
+        try:
+            version = _get_meta(conn, "catalogue_version") or "0"
+            items = pd.read_sql_query("SELECT item_id, name_key FROM items ORDER BY item_id", conn)
+        finally:
+            conn.execute("COMMIT")
+    return version, items
+
+
+# Stock movements, optionally of one item and/or only those after a movement id
+def read_stock_movements(item_id=None, after_id=None):
+    query = "SELECT movement_id, item_id, quantity, reason, created_at FROM stock_movements"
+    conditions, params = [], []
+    if item_id is not None:
+        conditions.append("item_id = ?")
+        params.append(int(item_id))
+    if after_id is not None:
+        conditions.append("movement_id > ?")
+        params.append(int(after_id))
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    with _connection() as conn:
+        return pd.read_sql_query(query + " ORDER BY movement_id", conn, params=params)
+
+
+# Id of the latest stock movement (0 when there are none)
+def last_movement_id():
+    with _connection() as conn:
+        return conn.execute("SELECT COALESCE(MAX(movement_id), 0) FROM stock_movements").fetchone()[0]
+
+
+# Set stock level and reorder threshold for an item (matched by name), adding it if new.
+# Returns "updated" or "added".
+def upsert_item(item_name, stock_level, reorder_threshold, supplier="New Supplier", lead_time_days=7):
+    name_key = normalise_name(item_name)
+    now = _now()
+    with _connection() as conn, _transaction(conn):
+        rows = conn.execute("SELECT item_id, stock_level FROM items WHERE name_key = ?", (name_key,)).fetchall()
+        if rows:
+            for item_id, old_level in rows:
+                conn.execute("UPDATE items SET stock_level = ?, reorder_threshold = ?, last_updated = ? WHERE item_id = ?",
+                             (int(stock_level), int(reorder_threshold), now, item_id))
+                if int(stock_level) != old_level:
+                    conn.execute("INSERT INTO stock_movements (item_id, quantity, reason, created_at) VALUES (?, ?, ?, ?)",
+                                 (item_id, int(stock_level) - old_level, "adjustment", now))
+            result = "updated"
+        else:
+            cursor = conn.execute(
+                "INSERT INTO items (item_name, name_key, stock_level, reorder_threshold, supplier, lead_time_days, last_updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(item_name).strip(), name_key, int(stock_level), int(reorder_threshold), supplier, int(lead_time_days), now))
+            conn.execute("INSERT INTO stock_movements (item_id, quantity, reason, created_at) VALUES (?, ?, ?, ?)",
+                         (cursor.lastrowid, int(stock_level), "initial", now))
+            _bump_catalogue_version(conn)
+            result = "added"
+        _bump_version(conn)
+    return result
+
+
+# Take stock out of an item (never below zero). Returns the quantity actually removed.
+def reduce_stock(item_id, quantity, reason="issue"):
+    now = _now()
+    with _connection() as conn, _transaction(conn):
+        row = conn.execute("SELECT stock_level FROM items WHERE item_id = ?", (int(item_id),)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown item_id {item_id}")
+        removed = min(int(quantity), row[0])
+        if removed > 0:
+            conn.execute("UPDATE items SET stock_level = stock_level - ?, last_updated = ? WHERE item_id = ?",
+                         (removed, now, int(item_id)))
+            conn.execute("INSERT INTO stock_movements (item_id, quantity, reason, created_at) VALUES (?, ?, ?, ?)",
+                         (int(item_id), -removed, reason, now))
+            _bump_version(conn)
+    return removed
+
+
+# Write the current items back to inventory.csv (the interchange format)
+def export_inventory_csv(path=None):
+    path = path or DATA_FILES["inventory"]
+    with _connection() as conn, _transaction(conn):
+        df = pd.read_sql_query(f"SELECT {', '.join(ITEM_COLUMNS)} FROM items ORDER BY item_id", conn)
+        df.to_csv(path, index=False)
+        if path == DATA_FILES["inventory"]:
+            _set_meta(conn, "csv_fingerprint", _csv_fingerprint())
+    return path
@@ -0,0 +1,168 @@
+import threading
+import numpy as np
+import pandas as pd
+from data import disk_cache
+from data.data_loader import dataset_fingerprint, read_dataset
+from data.frame_diff import group_hashes, reaggregate_changed
+from data.periods import period_bounds
+from models.replenishment import plan_replenishment
+
+# Daily KPI cube.
+# One row per day with the orders placed and shipments sent that day by status, order
+# value, cost and budget prorated over their period (in total and per category) and the
+# number of low-stock items observed that day. Each dataset contributes its own block of
+# columns, rebuilt only when the dataset's fingerprint changes - and then incrementally:
+# every day's rows are fingerprinted (row-hash sum and count, kept with the block), and
+# only the days that are new or whose rows changed are re-aggregated. Any date window is
+# answered by summing the cube rows of its days.
+
+LEVEL_COLUMNS = ["low_stock"]  # point-in-time observations, not summed over windows
+
+_states = {}
+_lock = threading.Lock()
+
+
+def _orders_block(orders):
+    day = orders["order_date"].dt.normalize().rename("day")
+    frame = pd.get_dummies(orders["status"], prefix="orders", prefix_sep=":", dtype=float)
+    frame["orders"] = 1.0
+    frame["order_value"] = orders["total_value"].astype(float)
+    return frame.groupby(day).sum()
+
+
+def _shipments_block(shipments):
+    day = shipments["ship_date"].dt.normalize().rename("day")
+    frame = pd.get_dummies(shipments["status"], prefix="shipments", prefix_sep=":", dtype=float)
+    frame["shipments"] = 1.0
+    return frame.groupby(day).sum()
+
+
+# Costs are booked per period ("Q1 2025", "2025-03"); spread each row evenly over its days
+def _costs_block(costs):
+    start, end = period_bounds(costs["period"])
+    valid = start.notna().to_numpy()
+    days = ((end - start).dt.days + 1).to_numpy()[valid].astype(int)
+    rows = np.repeat(np.flatnonzero(valid), days)
+    offsets = np.arange(len(rows)) - np.repeat(np.cumsum(days) - days, days)
+    day = pd.DatetimeIndex(start.to_numpy()[rows] + offsets.astype("timedelta64[D]"), name="day")
+
+    per_day = np.repeat(days, days).astype(float)
+    amount = costs["amount"].to_numpy(dtype=float)[rows] / per_day
+    frame = pd.get_dummies(costs["category"].iloc[rows], prefix="cost", prefix_sep=":", dtype=float).mul(amount, axis=0)
+    frame["cost"] = amount
+    frame["budget"] = costs["budget"].to_numpy(dtype=float)[rows] / per_day
+    return frame.set_axis(day).groupby(level="day").sum()
+
+
+# Cube sources: dataset -> date column its rows are booked on (None: small, always re-aggregated),
+# the columns used and the aggregation
+CUBE_SOURCES = {
+    "orders": {"day": "order_date", "columns": ["order_id", "order_date", "status", "total_value"],
+               "aggregate": _orders_block},
+    "shipments": {"day": "ship_date", "columns": ["shipment_id", "ship_date", "status"],
+                  "aggregate": _shipments_block},
+    "costs": {"day": None, "columns": ["category", "amount", "budget", "period"],
+              "aggregate": _costs_block},
+}
+
+
+def _build_source(key, source, fingerprint, state):
+    df = read_dataset(key)
+    if df.empty or not set(source["columns"]) <= set(df.columns):
+        return None
+    frame = df[source["columns"]]
+    aggregate = source["aggregate"]
+    if source["day"] is None:
+        return {"fingerprint": fingerprint, "block": aggregate(frame)}
+
+    day = frame[source["day"]].dt.normalize()
+    hashes = group_hashes(frame, day)
+    if state is None or "hashes" not in state:
+        block = aggregate(frame)
+    else:
+        kept, fresh = reaggregate_changed(frame, day, hashes, state["hashes"], state["block"],
+                                          state["block"].index, aggregate)
+        block = pd.concat([kept, fresh]).fillna(0).sort_index()
+    return {"fingerprint": fingerprint, "hashes": hashes, "block": block}
+
+
+# Low-stock items (below their planned reorder point) counted whenever the inventory changes,
+# kept as one observation per day
+def _observe_low_stock(state):
+    fingerprint = dataset_fingerprint("inventory")
+    today = pd.Timestamp.now().normalize()
+    observations = state["observations"] if state is not None else pd.Series(dtype=float, name="low_stock")
+    if fingerprint is None or (state is not None and state["fingerprint"] == fingerprint and today in observations.index):
+        return state
+    inventory = read_dataset("inventory")
+    count = float(plan_replenishment(inventory)["low_stock"].sum()) if not inventory.empty else 0.0
+    observations = observations.copy()
+    observations.loc[today] = count
+    return {"fingerprint": fingerprint, "observations": observations.sort_index().rename_axis("day")}
+
+
+def _cached_state(key):
+    if key not in _states:
+        _states[key] = disk_cache.get("kpi_cube", key)
+    return _states[key]
+
+
+# The daily KPI cube (DatetimeIndex of days), bringing every block up to date with its dataset
+def load_kpi_cube():
+    with _lock:
+        blocks = []
+        for key, source in CUBE_SOURCES.items():
+            fingerprint = dataset_fingerprint(key)
+            if fingerprint is None:
+                continue
+            state = _cached_state(key)
+            if state is None or state["fingerprint"] != fingerprint:
+                state = _build_source(key, source, fingerprint, state)
+                _states[key] = state
+                disk_cache.put("kpi_cube", key, state)
+            if state is not None:
+                blocks.append(state["block"])
+
+        low_stock = _cached_state("low_stock")
+        updated = _observe_low_stock(low_stock)
+        if updated is not low_stock:
+            _states["low_stock"] = updated
+            disk_cache.put("kpi_cube", "low_stock", updated)
+        if updated is not None:
+            blocks.append(updated["observations"].to_frame())
+
+    if not blocks:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="day"))
+    cube = pd.concat(blocks, axis=1).sort_index()
+    flows = cube.columns.difference(LEVEL_COLUMNS)
+    cube[flows] = cube[flows].fillna(0)
+    return cube
+
+
+# Column totals over the days from start to end (inclusive)
+def window_totals(cube, start, end):
+    return cube.loc[pd.Timestamp(start):pd.Timestamp(end)].drop(columns=LEVEL_COLUMNS, errors="ignore").sum()
+
+
+# The window of the same length just before start..end
+def previous_window(start, end):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    length = end - start + pd.Timedelta(days=1)
+    return start - length, start - pd.Timedelta(days=1)
+
+
+# Last observation of a level column (e.g. low_stock) on or before day, or None
+def level_at(cube, column, day):
+    if column not in cube.columns:
+        return None
+    observed = cube[column].loc[:pd.Timestamp(day)].dropna()
+    return observed.iloc[-1] if len(observed) else None
+
+
+# First and last day with any orders or shipments, or None for an empty cube
+def activity_range(cube):
+    activity = sum(cube[column] for column in ["orders", "shipments"] if column in cube.columns)
+    if isinstance(activity, int) or not (activity > 0).any():
+        return None
+    active_days = cube.index[activity > 0]
+    return active_days[0], active_days[-1]
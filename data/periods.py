@@ -0,0 +1,25 @@
+import re
+import pandas as pd
+
+# Cost periods are labelled either by quarter ("Q1 2025") or by month ("2025-03").
+
+_QUARTER_LABEL = re.compile(r"^Q([1-4])\s+(\d{4})$")
+
+
+def _parse_period(label):
+    quarter = _QUARTER_LABEL.match(label)
+    try:
+        if quarter:
+            return pd.Period(f"{quarter.group(2)}Q{quarter.group(1)}", freq="Q")
+        return pd.Period(label, freq="M")
+    except ValueError:
+        return None
+
+
+# First and last day of each period label -> (start, end) Series aligned with labels, NaT if unparseable
+def period_bounds(labels):
+    labels = pd.Series(labels).astype(str)
+    parsed = {label: _parse_period(label) for label in labels.unique()}
+    starts = {label: period.start_time if period is not None else pd.NaT for label, period in parsed.items()}
+    ends = {label: period.end_time.normalize() if period is not None else pd.NaT for label, period in parsed.items()}
+    return labels.map(starts).astype("datetime64[ns]"), labels.map(ends).astype("datetime64[ns]")
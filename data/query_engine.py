@@ -0,0 +1,320 @@
+import threading
+import numpy as np
+import pandas as pd
+from config.settings import DATA_SORT_KEYS
+from data.data_loader import dataset_fingerprint, load_dataset, read_dataset_table
+from data.snapshot_store import snapshots_available
+
+try:
+    import duckdb
+except ImportError:  # optional - filters fall back to pandas masks over the cached frames
+    duckdb = None
+
+# Query pushdown for the orders and shipments tables.
+# With DuckDB installed, filters and aggregations run as SQL directly over the
+# memory-mapped Arrow snapshots and only the result rows are converted to pandas.
+# Without it, the same functions evaluate over the DataFrames from the loader.
+
+# Unique row key per table (tie-breaker for paging)
+ROW_KEYS = {"orders": "order_id", "shipments": "shipment_id"}
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def pushdown_available():
+    return duckdb is not None and snapshots_available()
+
+
+# Push down only when the dataset exists - a missing file goes through the loader's warning path
+def _pushdown(key):
+    return pushdown_available() and dataset_fingerprint(key) is not None
+
+
+# DuckDB connections aren't shared across threads; each query gets its own cursor
+def _cursor():
+    global _connection
+    with _connection_lock:
+        if _connection is None:
+            _connection = duckdb.connect()
+        return _connection.cursor()
+
+
+def _query(sql, params=(), tables=("orders",)):
+    cursor = _cursor()
+    try:
+        for key in tables:
+            cursor.register(key, read_dataset_table(key))
+        return cursor.execute(sql, list(params)).df()
+    finally:
+        cursor.close()
+
+
+def _in_clause(column, values, params):
+    params.extend(values)
+    return f"{column} IN ({', '.join('?' * len(values))})"
+
+
+def _day_bounds(start_date, end_date):
+    return pd.Timestamp(start_date), pd.Timestamp(end_date) + pd.Timedelta(days=1)
+
+
+# SELECT over one table with optional filters and LIMIT/OFFSET. DuckDB doesn't promise to keep
+# row order once it scans in parallel, so pages are taken in date order (DATA_SORT_KEYS) with
+# the row key breaking ties, so they neither overlap nor skip rows.
+def _select_sql(columns, table, where, params, offset=0, limit=None):
+    sql = f"SELECT {columns} FROM {table}" + (f" WHERE {' AND '.join(where)}" if where else "")
+    if limit is not None or offset:
+        sql += f" ORDER BY {DATA_SORT_KEYS[table]}, {ROW_KEYS[table]}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    if offset:
+        sql += " OFFSET ?"
+        params.append(offset)
+    return sql
+
+
+# Rows of a frame between two dates. Snapshots keep orders and shipments sorted by date,
+# so this is a binary search and a slice; unsorted frames fall back to a mask.
+def _between_dates(df, column, start_date, end_date):
+    start, end = _day_bounds(start_date, end_date)
+    dates = df[column]
+    if dates.is_monotonic_increasing:
+        first, last = dates.searchsorted([start, end])
+        return df.iloc[first:last]
+    return df[(dates >= start) & (dates < end)]
+
+
+# Date slice of a frame plus the positions in it matching every column filter (None: all rows)
+def _filter_frame(df, date_column, start_date, end_date, filters):
+    if start_date is not None and end_date is not None:
+        df = _between_dates(df, date_column, start_date, end_date)
+    mask = None
+    for column, values in filters.items():
+        if values:
+            matches = df[column].isin(values).to_numpy()
+            mask = matches if mask is None else mask & matches
+    return df, (np.flatnonzero(mask) if mask is not None else None)
+
+
+def _take(df, rows, offset=0, limit=None):
+    stop = None if limit is None else offset + limit
+    return df.iloc[offset:stop] if rows is None else df.iloc[rows[offset:stop]]
+
+
+# Orders
+
+def order_statuses():
+    if _pushdown("orders"):
+        return _query("SELECT DISTINCT status FROM orders WHERE status IS NOT NULL ORDER BY status")["status"].tolist()
+    orders = load_dataset("orders")
+    return orders["status"].dropna().unique().tolist() if not orders.empty else []
+
+
+# (first, last) order date, or None when there are no orders
+def order_date_bounds():
+    if _pushdown("orders"):
+        bounds = _query("SELECT min(order_date) AS first, max(order_date) AS last FROM orders")
+        first, last = bounds.iloc[0]
+    else:
+        orders = load_dataset("orders")
+        if orders.empty:
+            return None
+        first, last = orders["order_date"].min(), orders["order_date"].max()
+    return None if pd.isna(first) else (first, last)
+
+
+def _order_filters(statuses, start_date, end_date):
+    params, where = [], []
+    if statuses:
+        where.append(_in_clause("status", list(statuses), params))
+    if start_date is not None and end_date is not None:
+        where.append("order_date >= ? AND order_date < ?")
+        params.extend(_day_bounds(start_date, end_date))
+    return where, params
+
+
+# Orders with the given statuses placed between two dates (inclusive), in date order.
+# offset/limit select one page of the result.
+def query_orders(statuses=None, start_date=None, end_date=None, offset=0, limit=None):
+    if _pushdown("orders"):
+        where, params = _order_filters(statuses, start_date, end_date)
+        return _query(_select_sql("*", "orders", where, params, offset, limit), params)
+
+    orders = load_dataset("orders")
+    if orders.empty:
+        return orders
+    orders, rows = _filter_frame(orders, "order_date", start_date, end_date, {"status": statuses})
+    return _take(orders, rows, offset, limit)
+
+
+# Number of orders query_orders would return without a limit
+def count_orders(statuses=None, start_date=None, end_date=None):
+    if _pushdown("orders"):
+        where, params = _order_filters(statuses, start_date, end_date)
+        return int(_query(_select_sql("count(*) AS n", "orders", where, params), params)["n"].iloc[0])
+
+    orders = load_dataset("orders")
+    if orders.empty:
+        return 0
+    orders, rows = _filter_frame(orders, "order_date", start_date, end_date, {"status": statuses})
+    return len(orders) if rows is None else len(rows)
+
+
+def orders_by_status():
+    if _pushdown("orders"):
+        return _query("SELECT status AS \"Status\", count(*) AS \"Count\" FROM orders "
+                      "GROUP BY status ORDER BY \"Count\" DESC")
+    counts = load_dataset("orders")["status"].value_counts().reset_index()
+    counts.columns = ["Status", "Count"]
+    return counts[counts["Count"] > 0]
+
+
+def orders_per_day():
+    if _pushdown("orders"):
+        return _query("SELECT CAST(order_date AS DATE) AS \"Date\", count(*) AS \"Count\" FROM orders "
+                      "GROUP BY 1 ORDER BY 1")
+    orders = load_dataset("orders")
+    per_day = orders.groupby(orders["order_date"].dt.date).size().reset_index()
+    per_day.columns = ["Date", "Count"]
+    return per_day
+
+
+def top_customers(n=5):
+    if _pushdown("orders"):
+        return _query("SELECT customer, count(order_id) AS order_count, sum(total_value) AS total_value "
+                      "FROM orders GROUP BY customer ORDER BY total_value DESC LIMIT ?", [n])
+    return load_dataset("orders").groupby("customer", observed=True).agg(
+        order_count=("order_id", "count"),
+        total_value=("total_value", "sum")
+    ).reset_index().sort_values("total_value", ascending=False).head(n)
+
+
+# Shipments
+
+def shipment_filter_options():
+    if _pushdown("shipments"):
+        statuses = _query("SELECT DISTINCT status FROM shipments WHERE status IS NOT NULL ORDER BY status",
+                          tables=("shipments",))["status"].tolist()
+        carriers = _query("SELECT DISTINCT carrier FROM shipments WHERE carrier IS NOT NULL ORDER BY carrier",
+                          tables=("shipments",))["carrier"].tolist()
+        return statuses, carriers
+    shipments = load_dataset("shipments")
+    if shipments.empty:
+        return [], []
+    return shipments["status"].dropna().unique().tolist(), shipments["carrier"].dropna().unique().tolist()
+
+
+# (first, last) ship date, or None when there are no shipments
+def shipment_date_bounds():
+    if _pushdown("shipments"):
+        bounds = _query("SELECT min(ship_date) AS first, max(ship_date) AS last FROM shipments", tables=("shipments",))
+        first, last = bounds.iloc[0]
+    else:
+        shipments = load_dataset("shipments")
+        if shipments.empty:
+            return None
+        first, last = shipments["ship_date"].min(), shipments["ship_date"].max()
+    return None if pd.isna(first) else (first, last)
+
+
+def _shipment_filters(statuses, carriers, start_date, end_date):
+    params, where = [], []
+    if statuses:
+        where.append(_in_clause("status", list(statuses), params))
+    if carriers:
+        where.append(_in_clause("carrier", list(carriers), params))
+    if start_date is not None and end_date is not None:
+        where.append("ship_date >= ? AND ship_date < ?")
+        params.extend(_day_bounds(start_date, end_date))
+    return where, params
+
+
+# Shipments with the given statuses and carriers shipped between two dates (inclusive), in
+# date order. offset/limit select one page of the result.
+def query_shipments(statuses=None, carriers=None, start_date=None, end_date=None, offset=0, limit=None):
+    if _pushdown("shipments"):
+        where, params = _shipment_filters(statuses, carriers, start_date, end_date)
+        return _query(_select_sql("*", "shipments", where, params, offset, limit), params, tables=("shipments",))
+
+    shipments = load_dataset("shipments")
+    if shipments.empty:
+        return shipments
+    shipments, rows = _filter_frame(shipments, "ship_date", start_date, end_date,
+                                    {"status": statuses, "carrier": carriers})
+    return _take(shipments, rows, offset, limit)
+
+
+# Number of shipments query_shipments would return without a limit
+def count_shipments(statuses=None, carriers=None, start_date=None, end_date=None):
+    if _pushdown("shipments"):
+        where, params = _shipment_filters(statuses, carriers, start_date, end_date)
+        return int(_query(_select_sql("count(*) AS n", "shipments", where, params), params,
+                          tables=("shipments",))["n"].iloc[0])
+
+    shipments = load_dataset("shipments")
+    if shipments.empty:
+        return 0
+    shipments, rows = _filter_frame(shipments, "ship_date", start_date, end_date,
+                                    {"status": statuses, "carrier": carriers})
+    return len(shipments) if rows is None else len(rows)
+
+
+def shipments_by_status():
+    if _pushdown("shipments"):
+        return _query("SELECT status AS \"Status\", count(*) AS \"Count\" FROM shipments "
+                      "GROUP BY status ORDER BY \"Count\" DESC", tables=("shipments",))
+    counts = load_dataset("shipments")["status"].value_counts().reset_index()
+    counts.columns = ["Status", "Count"]
+    return counts[counts["Count"] > 0]
+
+
+def carrier_performance():
+    if _pushdown("shipments"):
+        return _query("SELECT carrier, count(shipment_id) AS total_shipments, "
+                      "count(*) FILTER (WHERE status = 'Delayed') AS delayed, "
+                      "(1 - count(*) FILTER (WHERE status = 'Delayed') / count(shipment_id)) * 100 AS on_time_pct "
+                      "FROM shipments GROUP BY carrier ORDER BY carrier", tables=("shipments",))
+    shipments = load_dataset("shipments")
+    carrier_perf = shipments.assign(is_delayed=shipments["status"] == "Delayed").groupby("carrier", observed=True).agg(
+        total_shipments=("shipment_id", "count"),
+        delayed=("is_delayed", "sum"),
+    ).reset_index()
+    carrier_perf["on_time_pct"] = (1 - carrier_perf["delayed"] / carrier_perf["total_shipments"]) * 100
+    return carrier_perf
+
+
+# Shipments in flight (shipped, not yet past their estimated arrival) per day and status,
+# as long-format Date/Status/Shipments rows. Shipments are first counted per
+# (status, ship day, arrival day), so the day sweep is over distinct spans, not shipments.
+def shipments_in_flight(statuses=None, carriers=None, start_date=None, end_date=None):
+    if _pushdown("shipments"):
+        where, params = _shipment_filters(statuses, carriers, start_date, end_date)
+        where += ["ship_date IS NOT NULL", "estimated_arrival IS NOT NULL"]
+        spans = _query(_select_sql("status, CAST(ship_date AS DATE) AS start, CAST(estimated_arrival AS DATE) AS finish, "
+                                   "count(*) AS n", "shipments", where, params) + " GROUP BY ALL",
+                       params, tables=("shipments",))
+    else:
+        shipments = load_dataset("shipments")
+        if shipments.empty:
+            return pd.DataFrame(columns=["Date", "Status", "Shipments"])
+        shipments, rows = _filter_frame(shipments, "ship_date", start_date, end_date,
+                                        {"status": statuses, "carrier": carriers})
+        shipments = _take(shipments, rows)
+        spans = shipments.groupby([shipments["status"], shipments["ship_date"].dt.normalize().rename("start"),
+                                   shipments["estimated_arrival"].dt.normalize().rename("finish")],
+                                  observed=True).size().rename("n").reset_index()
+    if spans.empty:
+        return pd.DataFrame(columns=["Date", "Status", "Shipments"])
+
+    # +n on the ship day, -n the day after arrival, then a running sum over the days
+    start, finish = pd.to_datetime(spans["start"]), pd.to_datetime(spans["finish"])
+    changes = pd.DataFrame({
+        "Date": pd.concat([start, finish + pd.Timedelta(days=1)], ignore_index=True),
+        "Status": pd.concat([spans["status"], spans["status"]], ignore_index=True).astype(str),
+        "n": np.concatenate([spans["n"].to_numpy(), -spans["n"].to_numpy()]),
+    })
+    per_day = changes.pivot_table(index="Date", columns="Status", values="n", aggfunc="sum", fill_value=0)
+    per_day = per_day.reindex(pd.date_range(per_day.index.min(), per_day.index.max(), name="Date"), fill_value=0).cumsum()
+    return per_day.iloc[:-1].melt(ignore_index=False, value_name="Shipments").reset_index()
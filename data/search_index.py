@@ -0,0 +1,121 @@
+import math
+import threading
+import numpy as np
+import pandas as pd
+from data import inventory_store
+
+# Inventory item search index.
+# Built from the item catalogue and rebuilt only when items are added or renamed, not on
+# stock changes. Normalised names (trimmed, lower-case) map to item ids for exact
+# lookups. A trigram index (trigram -> sorted catalogue positions) answers substring
+# searches by intersecting the posting lists of the query's trigrams and checking only
+# those candidates; when nothing contains the query, names sharing most of its trigrams
+# are returned as fuzzy matches.
+
+FUZZY_MIN_SHARED = 0.5  # share of the query's trigrams a fuzzy match must contain
+FUZZY_LIMIT = 20
+
+_index = None
+_index_lock = threading.Lock()
+
+
+# Trigrams as int64 codes (three 21-bit code points) with the position of the name they come from
+def _trigrams(keys):
+    lengths = np.fromiter(map(len, keys), dtype=np.int64, count=len(keys))
+    chars = np.frombuffer("".join(keys).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    if len(chars) < 3:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    codes = (chars[:-2] << 42) | (chars[1:-1] << 21) | chars[2:]
+    rows = np.repeat(np.arange(len(keys)), lengths)[:-2]
+    ends = np.cumsum(lengths)[rows]
+    inside = np.arange(len(codes)) + 3 <= ends  # trigram doesn't run into the next name
+    return codes[inside], rows[inside]
+
+
+def _query_trigrams(key):
+    return np.unique(_trigrams([key])[0])
+
+
+def build_index(version, items):
+    keys = items["name_key"].astype(str).tolist()
+    codes, rows = _trigrams(keys)
+    order = np.lexsort((rows, codes))
+    codes, rows = codes[order], rows[order]
+    distinct = np.ones(len(codes), dtype=bool)
+    distinct[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    codes, rows = codes[distinct], rows[distinct]
+    grams, starts = np.unique(codes, return_index=True)
+    return {
+        "version": version,
+        "item_ids": items["item_id"].to_numpy(),
+        "keys": np.array(keys, dtype=object),
+        "exact": pd.Series(np.arange(len(keys))).groupby(keys, sort=False).indices,
+        "grams": grams,
+        "offsets": np.append(starts, len(codes)),
+        "postings": rows,
+        "gram_counts": np.bincount(rows, minlength=len(keys)),
+    }
+
+
+# The index for the current catalogue, rebuilt when items were added or renamed
+def item_index():
+    global _index
+    with _index_lock:
+        if _index is None or _index["version"] != inventory_store.catalogue_version():
+            _index = build_index(*inventory_store.read_catalogue())
+        return _index
+
+
+def _postings(index, code):
+    i = np.searchsorted(index["grams"], code)
+    if i == len(index["grams"]) or index["grams"][i] != code:
+        return index["postings"][:0]
+    return index["postings"][index["offsets"][i]:index["offsets"][i + 1]]
+
+
+# Item ids whose normalised name is exactly `name`
+def find_exact(name):
+    index = item_index()
+    positions = index["exact"].get(inventory_store.normalise_name(name))
+    return index["item_ids"][positions] if positions is not None else index["item_ids"][:0]
+
+
+# Item ids whose name contains the query (case-insensitive, in catalogue order). When none does,
+# the closest names by shared trigrams are returned instead. Returns (item_ids, fuzzy).
+def search_items(query, fuzzy_limit=FUZZY_LIMIT):
+    index = item_index()
+    key = inventory_store.normalise_name(query)
+    if not key:
+        return index["item_ids"][:0], False
+    grams = _query_trigrams(key)
+    if len(grams) == 0:
+        # one or two characters: too short for trigrams, check every name
+        matches = np.flatnonzero(pd.Series(index["keys"], dtype=object).str.contains(key, regex=False).to_numpy())
+        return index["item_ids"][matches], False
+
+    postings = sorted((_postings(index, code) for code in grams), key=len)
+    candidates = postings[0]
+    for posting in postings[1:]:
+        if len(candidates) == 0:
+            break
+        candidates = np.intersect1d(candidates, posting, assume_unique=True)
+    keys = index["keys"]
+    matches = np.array([position for position in candidates if key in keys[position]], dtype=np.int64)
+    if len(matches) or fuzzy_limit == 0:
+        return index["item_ids"][matches], False
+
+    # fuzzy: rank by trigram similarity (shared / union) among names sharing enough trigrams
+    shared = np.bincount(np.concatenate(postings), minlength=len(keys))
+    close = np.flatnonzero(shared >= math.ceil(FUZZY_MIN_SHARED * len(grams)))
+    similarity = shared[close] / (len(grams) + index["gram_counts"][close] - shared[close])
+    best = close[np.argsort(-similarity, kind="stable")[:fuzzy_limit]]
+    return index["item_ids"][best], True
+
+
+# Rows of an inventory frame (ordered by item_id, as the loader returns it) for the given item ids
+def rows_for(inventory, item_ids):
+    item_column = inventory["item_id"].to_numpy()
+    positions = np.searchsorted(item_column, item_ids)
+    found = positions < len(item_column)
+    found[found] = item_column[positions[found]] == item_ids[found]
+    return inventory.iloc[positions[found]]
@@ -0,0 +1,85 @@
+import os
+import tempfile
+from config.settings import SNAPSHOT_DIR
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # snapshots are an optimisation, the loader falls back to the CSV
+    pa = None
+    feather = None
+
+
+# Typed columnar snapshots of the CSV datasets.
+# The CSV stays the interchange format; each one is parsed once into an
+# uncompressed Arrow IPC file that is read back memory-mapped until the CSV changes.
+
+
+def snapshots_available():
+    return pa is not None
+
+
+# Identity of a source file - a snapshot is only valid for the exact file it was built from
+def source_fingerprint(filename):
+    stat = os.stat(filename)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+# What a snapshot was built from: the source file plus a tag for how it was parsed (e.g. schema)
+def _build_key(filename, tag):
+    return f"{source_fingerprint(filename)}|{tag}"
+
+
+def snapshot_path(filename):
+    name = os.path.splitext(os.path.basename(filename))[0]
+    return os.path.join(SNAPSHOT_DIR, f"{name}.arrow")
+
+
+def _snapshot_build_key(path):
+    try:
+        with pa.memory_map(path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    value = metadata.get(b"build_key")
+    return value.decode() if value else None
+
+
+# Parse the CSV with `parse_csv` and persist it as a snapshot (written atomically)
+def build_snapshot(filename, parse_csv, tag=""):
+    build_key = _build_key(filename, tag)
+    df = parse_csv(filename)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"build_key"] = build_key.encode()
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(filename)
+    # a unique temp file per writer: sessions and the alert scheduler build snapshots concurrently
+    fd, tmp_path = tempfile.mkstemp(dir=SNAPSHOT_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+# Arrow table for a dataset, rebuilding the snapshot only if the CSV (or tag) changed
+def read_snapshot_table(filename, parse_csv, tag=""):
+    path = snapshot_path(filename)
+    if _snapshot_build_key(path) != _build_key(filename, tag):
+        build_snapshot(filename, parse_csv, tag)
+    return feather.read_table(path, memory_map=True)
+
+
+# DataFrame for a dataset; numeric columns stay zero-copy views on the mapped file
+def read_snapshot(filename, parse_csv, tag=""):
+    if not snapshots_available():
+        return parse_csv(filename)
+    table = read_snapshot_table(filename, parse_csv, tag)
+    return table.to_pandas(split_blocks=True)
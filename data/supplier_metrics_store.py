@@ -0,0 +1,256 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+import pandas as pd
+from config.settings import SUPPLIER_METRICS_DB
+
+# Supplier performance time series (SQLite in WAL mode).
+# Per supplier and week, month and quarter, the store keeps additive totals - shipments,
+# on-time and late shipments, delay and lead-time days, orders and units ordered - so
+# updates only add the totals of new or changed rows (and subtract those of removed ones)
+# and any supplier's history is one index range read of precomputed rows. Rates and
+# averages are derived on read. Quality scores are kept as dated observations.
+# The per-order and per-shipment rows behind the totals are stored too, with each source's
+# watermark (latest row day), so an update reads back only the rows it may change.
+
+# Rollup grain -> pandas period frequency (weeks start on Monday)
+ROLLUP_GRAINS = {"week": "W-SUN", "month": "M", "quarter": "Q"}
+
+# Rollup tables: source -> additive columns (the first one counts rows; rows at zero are dropped)
+ROLLUP_TABLES = {
+    "shipments": ["shipments", "on_time", "late", "delay_days", "lead_time_days", "lead_time_n"],
+    "orders": ["orders", "quantity"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS supplier_shipments (
+    grain TEXT NOT NULL,
+    supplier TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    shipments INTEGER NOT NULL,
+    on_time INTEGER NOT NULL,
+    late INTEGER NOT NULL,
+    delay_days REAL NOT NULL,
+    lead_time_days REAL NOT NULL,
+    lead_time_n INTEGER NOT NULL,
+    PRIMARY KEY (grain, supplier, period_start)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS supplier_orders (
+    grain TEXT NOT NULL,
+    supplier TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    orders INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (grain, supplier, period_start)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS supplier_quality (
+    supplier TEXT NOT NULL,
+    day TEXT NOT NULL,
+    quality_score REAL NOT NULL,
+    PRIMARY KEY (supplier, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS order_rows (
+    order_id TEXT PRIMARY KEY,
+    supplier TEXT,
+    day TEXT,
+    orders INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    ordered_at REAL,
+    requested_delivery REAL
+);
+CREATE INDEX IF NOT EXISTS idx_order_rows_day ON order_rows(day);
+
+CREATE TABLE IF NOT EXISTS shipment_rows (
+    shipment_id TEXT PRIMARY KEY,
+    supplier TEXT,
+    day TEXT,
+    shipments INTEGER NOT NULL,
+    on_time INTEGER NOT NULL,
+    late INTEGER NOT NULL,
+    delay_days REAL NOT NULL,
+    lead_time_days REAL NOT NULL,
+    lead_time_n INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_shipment_rows_day ON shipment_rows(day);
+
+CREATE TABLE IF NOT EXISTS rollup_sources (
+    source TEXT PRIMARY KEY,
+    watermark TEXT,
+    mapping TEXT
+);
+"""
+
+# Bumped when the rollup tables change shape; rollups are derived data, so outdated tables
+# are dropped and rebuilt by the next update (quality observations are kept)
+SCHEMA_VERSION = 2
+DERIVED_TABLES = ["supplier_shipments", "supplier_orders", "order_rows", "shipment_rows", "rollup_sources"]
+
+# Row tables: source -> table, row key and the columns kept besides supplier, day and the
+# additive ones (orders keep their timestamps, as seconds since the epoch, for the shipment join)
+ROW_TABLES = {
+    "shipments": {"table": "shipment_rows", "key": "shipment_id", "extra": []},
+    "orders": {"table": "order_rows", "key": "order_id", "extra": ["ordered_at", "requested_delivery"]},
+}
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# Absolute paths of the databases whose schema has been created by this process
+_initialised = set()
+
+
+@contextmanager
+def _connection():
+    path = os.path.abspath(SUPPLIER_METRICS_DB)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        if path not in _initialised:
+            conn.execute("PRAGMA journal_mode=WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                for table in DERIVED_TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.executescript(SCHEMA)
+            _initialised.add(path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _transaction(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# Rollup rows (grain, supplier, period_start + the source's columns) for every grain from
+# per-row values with a supplier and a day column
+def rollup(frame, source):
+    columns = ROLLUP_TABLES[source]
+    parts = []
+    for grain, freq in ROLLUP_GRAINS.items():
+        period_start = frame["day"].dt.to_period(freq).dt.start_time.rename("period_start")
+        part = frame.groupby([frame["supplier"], period_start], observed=True)[columns].sum().reset_index()
+        part.insert(0, "grain", grain)
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+# Columns of a source's row table, key first
+def row_columns(source):
+    spec = ROW_TABLES[source]
+    return [spec["key"], "supplier", "day"] + ROLLUP_TABLES[source] + spec["extra"]
+
+
+# Watermark (latest stored row day, or None) and mapping version of a source's rows; None if never built
+def source_state(source):
+    with _connection() as conn:
+        row = conn.execute("SELECT watermark, mapping FROM rollup_sources WHERE source = ?", (source,)).fetchone()
+    if row is None:
+        return None
+    return {"watermark": pd.Timestamp(row[0]) if row[0] else None, "mapping": row[1]}
+
+
+# Number of stored rows of a source dated before a day
+def count_rows_before(source, day):
+    with _connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {ROW_TABLES[source]['table']} WHERE day < ?",
+                            (day.strftime(DATE_FORMAT),)).fetchone()[0]
+
+
+# Stored rows of a source: those dated on or after `since` (plus undated ones), those with the
+# given keys, or all of them
+def read_rows(source, since=None, keys=None):
+    spec = ROW_TABLES[source]
+    query = f"SELECT {', '.join(row_columns(source))} FROM {spec['table']}"
+    params = ()
+    if since is not None:
+        query += " WHERE day >= ? OR day IS NULL"
+        params = (since.strftime(DATE_FORMAT),)
+    elif keys is not None:
+        query += f" WHERE {spec['key']} IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(list(keys)),)
+    with _connection() as conn:
+        rows = pd.read_sql_query(query, conn, params=params)
+    rows["day"] = pd.to_datetime(rows["day"], format=DATE_FORMAT)
+    rows["supplier"] = rows["supplier"].astype(object)
+    measures = ROLLUP_TABLES[source] + spec["extra"]
+    rows[measures] = rows[measures].astype(float)
+    return rows
+
+
+def _sql_values(frame):
+    return frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+
+
+# Apply one update of a source in a single transaction: delete the rows with removed_keys,
+# upsert `rows`, add the rollup deltas and record the new watermark and mapping version.
+# reset=True replaces the stored rows and totals.
+def apply_update(source, rows, removed_keys, deltas, watermark, mapping, reset=False):
+    spec = ROW_TABLES[source]
+    columns = ROLLUP_TABLES[source]
+    table = f"supplier_{source}"
+    row_values = rows[row_columns(source)].assign(day=rows["day"].dt.strftime(DATE_FORMAT))
+    deltas = deltas.assign(period_start=deltas["period_start"].dt.strftime(DATE_FORMAT))
+    with _connection() as conn, _transaction(conn):
+        if reset:
+            conn.execute(f"DELETE FROM {spec['table']}")
+            conn.execute(f"DELETE FROM {table}")
+        conn.executemany(f"DELETE FROM {spec['table']} WHERE {spec['key']} = ?", ((key,) for key in removed_keys))
+        conn.executemany(f"INSERT OR REPLACE INTO {spec['table']} ({', '.join(row_columns(source))}) "
+                         f"VALUES ({', '.join('?' * len(row_columns(source)))})", _sql_values(row_values))
+        conn.executemany(
+            f"INSERT INTO {table} (grain, supplier, period_start, {', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * (len(columns) + 3))}) "
+            f"ON CONFLICT(grain, supplier, period_start) DO UPDATE SET "
+            + ", ".join(f"{column} = {column} + excluded.{column}" for column in columns),
+            deltas[["grain", "supplier", "period_start"] + columns].itertuples(index=False, name=None))
+        conn.execute(f"DELETE FROM {table} WHERE {columns[0]} <= 0")
+        conn.execute("INSERT INTO rollup_sources (source, watermark, mapping) VALUES (?, ?, ?) "
+                     "ON CONFLICT(source) DO UPDATE SET watermark = excluded.watermark, mapping = excluded.mapping",
+                     (source, watermark.strftime(DATE_FORMAT) if watermark is not None else None, str(mapping)))
+
+
+# Record quality scores observed on a day (supplier -> score)
+def observe_quality(scores, day):
+    day = pd.Timestamp(day).strftime(DATE_FORMAT)
+    with _connection() as conn, _transaction(conn):
+        conn.executemany("INSERT INTO supplier_quality (supplier, day, quality_score) VALUES (?, ?, ?) "
+                         "ON CONFLICT(supplier, day) DO UPDATE SET quality_score = excluded.quality_score",
+                         ((str(supplier), day, float(score)) for supplier, score in scores.items() if pd.notna(score)))
+
+
+# One supplier's history at a grain: the stored totals per period plus the derived rates
+# (on_time_pct, late_pct, avg_delay_days, lead_time_mean) and the mean observed quality score
+def read_history(supplier, grain):
+    with _connection() as conn:
+        frames = [pd.read_sql_query(f"SELECT period_start, {', '.join(columns)} FROM supplier_{source} "
+                                    "WHERE grain = ? AND supplier = ? ORDER BY period_start", conn,
+                                    params=(grain, supplier))
+                  for source, columns in ROLLUP_TABLES.items()]
+        quality = pd.read_sql_query("SELECT day, quality_score FROM supplier_quality WHERE supplier = ?",
+                                    conn, params=(supplier,))
+    history = frames[0].merge(frames[1], on="period_start", how="outer")
+    history["period_start"] = pd.to_datetime(history["period_start"], format=DATE_FORMAT)
+    shipments = history["shipments"].where(history["shipments"] > 0)
+    history["on_time_pct"] = history["on_time"] / shipments * 100
+    history["late_pct"] = history["late"] / shipments * 100
+    history["avg_delay_days"] = history["delay_days"] / history["late"].where(history["late"] > 0)
+    history["lead_time_mean"] = history["lead_time_days"] / history["lead_time_n"].where(history["lead_time_n"] > 0)
+    if not quality.empty:
+        quality["period_start"] = (pd.to_datetime(quality["day"], format=DATE_FORMAT)
+                                   .dt.to_period(ROLLUP_GRAINS[grain]).dt.start_time)
+        history = history.merge(quality.groupby("period_start", as_index=False)["quality_score"].mean(),
+                                on="period_start", how="outer")
+    else:
+        history["quality_score"] = float("nan")
+    return history.sort_values("period_start", ignore_index=True)
@@ -1,59 +1,60 @@
 import streamlit as st
-import time
 from config.settings import PAGE_CONFIG
 from data.data_generator import create_sample_data_if_not_exists
-from data.data_loader import load_data
+from data.data_loader import load_datasets, refresh_data
+from models.alert_scheduler import start_alert_scheduler
 from pages import dashboard, inventory, orders, costs, suppliers, forecasting, alerts
 
 
+# Navigation entries -> (page module, render function)
+PAGES = {
+    "Dashboard Overview": (dashboard, dashboard.render_dashboard_overview),
+    "Inventory Management": (inventory, inventory.render_inventory_management),
+    "Order & Shipment Tracking": (orders, orders.render_order_shipment_tracking),
+    "Cost Analysis": (costs, costs.render_cost_analysis),
+    "Supplier Performance": (suppliers, suppliers.render_supplier_performance),
+    "Demand Forecasting": (forecasting, forecasting.render_demand_forecasting),
+    "Alerts & Notifications": (alerts, alerts.render_alerts_notifications),
+}
+
+
+# Background jobs - started once per server process, not on every rerun
+@st.cache_resource
+def start_background_jobs():
+    return start_alert_scheduler()
+
+
 # Main application function
 def main():
     # Create sample data if not exists
     create_sample_data_if_not_exists()
+    start_background_jobs()
     
     # Sidebar navigation
     st.sidebar.title("📦 Supply Chain Dashboard")
     
-    navigation = st.sidebar.radio("Navigation", [
-        "Dashboard Overview", 
-        "Inventory Management", 
-        "Order & Shipment Tracking",
-        "Cost Analysis",
-        "Supplier Performance",
-        "Demand Forecasting",
-        "Alerts & Notifications",
-    ])
-    
-    # Load data
-    data = load_data()
-    
-    # Render selected page
-    if navigation == "Dashboard Overview":
-        dashboard.render_dashboard_overview(data)
-    elif navigation == "Inventory Management":
-        inventory.render_inventory_management(data)
-    elif navigation == "Order & Shipment Tracking":
-        orders.render_order_shipment_tracking(data)
-    elif navigation == "Cost Analysis":
-        costs.render_cost_analysis(data)
-    elif navigation == "Supplier Performance":
-        suppliers.render_supplier_performance(data)
-    elif navigation == "Demand Forecasting":
-        forecasting.render_demand_forecasting()
-    elif navigation == "Alerts & Notifications":
-        alerts.render_alerts_notifications()
+    navigation = st.sidebar.radio("Navigation", list(PAGES))
+    page, render_page = PAGES[navigation]
     
     # Footer
     st.sidebar.markdown("---")
     # st.sidebar.info("Supply Chain Dashboard v1.0.0")
     
-    # Show loading state for data refresh
+    # Refresh data - reload only the datasets whose files changed
     with st.sidebar:
         if st.button("Refresh Data"):
             with st.spinner("Refreshing data..."):
-                time.sleep(1)  # Simulate loading
+                reloaded = refresh_data(page.REQUIRED_DATA)
+            if reloaded:
                 st.success("✅ Data refreshed!")
-                st.rerun()
+                for key, seconds in reloaded.items():
+                    st.write(f"🔄 {key}: {seconds:.2f}s")
+            else:
+                st.info("No data changes detected.")
+    
+    # Load only the datasets the selected page declares, then render it
+    data = load_datasets(page.REQUIRED_DATA)
+    render_page(data)
 
 
 #########################################################################################################################################
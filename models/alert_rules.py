@@ -0,0 +1,288 @@
+import threading
+import numpy as np
+import pandas as pd
+from config.settings import ALERT_REOPEN_DAYS, ALERT_SEVERITIES, ALERT_THRESHOLDS
+from data.periods import period_bounds
+
+# Alert rule engine.
+# Each rule is one vectorized pass over a dataset whose rows are keyed by an entity
+# (item, shipment, cost category, supplier). Between evaluations the engine keeps a hash
+# of every entity's input row: only new or changed rows - plus rows whose deadline has
+# passed since the last run - are re-evaluated, and alerts of unchanged rows carry over.
+# A rule whose dataset version is unchanged only re-checks its deadlines. History datasets
+# (rules with a "watermark" column) hash only the rows dated from ALERT_REOPEN_DAYS before
+# the latest one seen and the entities currently alerting; older rows are taken as final
+# while their number stays the same.
+
+_state = {}
+_state_lock = threading.Lock()
+
+
+def _alerts(index, severity, message):
+    return pd.DataFrame({"severity": severity, "message": message}, index=index)
+
+
+# Low stock: out of stock -> Critical, below low_stock_pct% of the reorder threshold -> High
+def _low_stock(items, previous, thresholds, now):
+    stock = items["stock_level"]
+    limit = items["reorder_threshold"] * thresholds["low_stock_pct"] / 100
+    alerting = items[(stock <= 0) | (stock < limit)]
+    out_of_stock = alerting["stock_level"] <= 0
+    name = "Item '" + alerting["item_name"].astype(str) + "'"
+    message = np.where(
+        out_of_stock,
+        name + " is out of stock - production impact likely",
+        name + " has reached critical stock level (" + alerting["stock_level"].astype(str)
+        + " units, reorder level " + alerting["reorder_threshold"].astype(str) + ")")
+    return _alerts(alerting.index, np.where(out_of_stock, "Critical", "High"), message)
+
+
+CRITICAL_DELAY_DAYS = 7
+
+
+# Times at which an open shipment's alert changes: overdue, then critical
+def _shipment_deadlines(shipments, thresholds):
+    return [shipments["estimated_arrival"] + pd.Timedelta(days=thresholds["delay_days"]),
+            shipments["estimated_arrival"] + pd.Timedelta(days=CRITICAL_DELAY_DAYS)]
+
+
+# Delayed shipments: flagged Delayed by the carrier, or still open delay_days after the
+# estimated arrival -> High; open more than CRITICAL_DELAY_DAYS past the estimated arrival -> Critical
+def _shipment_delays(shipments, previous, thresholds, now):
+    overdue_at, critical_at = _shipment_deadlines(shipments, thresholds)
+    open_shipment = (shipments["status"] != "Delivered").to_numpy()
+    overdue = open_shipment & (overdue_at <= now).to_numpy()
+    critical = open_shipment & (critical_at <= now).to_numpy()
+    alerting = (shipments["status"] == "Delayed").to_numpy() | overdue
+
+    rows = shipments[alerting]
+    shipment = "Shipment " + rows["shipment_id"].astype(str) + " (" + rows["carrier"].astype("string").fillna("unknown carrier") + ")"
+    message = np.where(
+        overdue[alerting],
+        shipment + " is past its estimated arrival of " + rows["estimated_arrival"].dt.strftime("%Y-%m-%d"),
+        shipment + " is delayed by the carrier")
+    return _alerts(rows.index, np.where(critical[alerting], "Critical", "High"), message)
+
+
+# Spend per category in the latest cost period
+def _latest_cost_period(costs):
+    totals = costs.groupby(["category", "period"], observed=True)[["amount", "budget"]].sum().reset_index()
+    starts, _ = period_bounds(totals["period"])
+    totals = totals[starts == starts.max()]
+    return totals.assign(cost_key=totals["category"].astype(str) + " " + totals["period"].astype(str))
+
+
+# Overspent categories: above budget by more than overspend_pct -> Medium, 10 points more -> High
+def _cost_overspend(totals, previous, thresholds, now):
+    over_pct = (totals["amount"] / totals["budget"] - 1) * 100
+    alerting = totals[(totals["budget"] > 0) & (over_pct > thresholds["overspend_pct"])]
+    over_pct = over_pct[alerting.index]
+    message = (alerting["category"].astype(str) + " spend for " + alerting["period"].astype(str)
+               + " is " + over_pct.round(1).astype(str) + "% over budget ($"
+               + alerting["amount"].map("{:,.0f}".format).astype(str) + " of $"
+               + alerting["budget"].map("{:,.0f}".format).astype(str) + ")")
+    severity = np.where(over_pct > thresholds["overspend_pct"] + 10, "High", "Medium")
+    return _alerts(alerting.index, severity, message.to_numpy())
+
+
+# Supplier on-time delivery: a drop of supplier_drop_pct points since the previous data -> Medium,
+# below supplier_on_time_pct -> Low, both -> High
+def _supplier_on_time(suppliers, previous, thresholds, now):
+    on_time = suppliers["on_time_delivery"] * 100
+    before = previous["on_time_delivery"] * 100 if previous is not None else pd.Series(np.nan, index=suppliers.index)
+    dropped = (before - on_time >= thresholds["supplier_drop_pct"]).to_numpy()
+    below = (on_time < thresholds["supplier_on_time_pct"]).to_numpy()
+    alerting = dropped | below
+    supplier = "Supplier " + suppliers["supplier_name"].astype(str)[alerting]
+    now_pct = on_time[alerting].round(1).astype(str) + "%"
+    message = np.where(
+        dropped[alerting],
+        supplier + " on-time delivery dropped from " + before[alerting].round(1).astype(str) + "% to " + now_pct,
+        supplier + " on-time delivery (" + now_pct + ") is below the "
+        + str(thresholds["supplier_on_time_pct"]) + "% threshold")
+    severity = np.select([dropped[alerting] & below[alerting], dropped[alerting]], ["High", "Medium"], "Low")
+    return _alerts(suppliers.index[alerting], severity, message)
+
+
+# Rules: source dataset, entity prefix and key column, input columns (hashed to detect
+# changed rows), thresholds used, the evaluation and optionally a per-row deadline after
+# which an unchanged row has to be re-evaluated (time-based rules give "deadlines"). Rules that aggregate the dataset first
+# give a "prepare" step and the dataset columns it "requires"; rules over a date-sorted history
+# give the date column that bounds where rows still change ("watermark").
+# evaluate(rows, previous, thresholds, now) -> DataFrame indexed by entity with severity and message;
+# previous holds the same entities' rows from the last evaluation (NaN for new ones).
+ALERT_RULES = {
+    "Low stock": {
+        "dataset": "inventory",
+        "prefix": "item",
+        "key": "item_id",
+        "columns": ["item_id", "item_name", "stock_level", "reorder_threshold"],
+        "thresholds": ["low_stock_pct"],
+        "evaluate": _low_stock,
+    },
+    "Shipment delay": {
+        "dataset": "shipments",
+        "prefix": "shipment",
+        "key": "shipment_id",
+        "columns": ["shipment_id", "carrier", "status", "estimated_arrival"],
+        "thresholds": ["delay_days"],
+        "evaluate": _shipment_delays,
+        "deadlines": _shipment_deadlines,
+        "watermark": "estimated_arrival",
+    },
+    "Cost overspend": {
+        "dataset": "costs",
+        "prefix": "cost",
+        "key": "cost_key",
+        "prepare": _latest_cost_period,
+        "requires": ["category", "period", "amount", "budget"],
+        "columns": ["cost_key", "category", "period", "amount", "budget"],
+        "thresholds": ["overspend_pct"],
+        "evaluate": _cost_overspend,
+    },
+    "Supplier on-time": {
+        "dataset": "suppliers",
+        "prefix": "supplier",
+        "key": "supplier_name",
+        "columns": ["supplier_name", "on_time_delivery"],
+        "thresholds": ["supplier_on_time_pct", "supplier_drop_pct"],
+        "evaluate": _supplier_on_time,
+    },
+}
+
+
+# Rule input rows indexed by entity, or None when the dataset lacks the columns
+def _rule_input(rule, df):
+    if df is None or df.empty or not set(rule.get("requires", rule["columns"])) <= set(df.columns):
+        return None
+    frame = rule["prepare"](df) if "prepare" in rule else df
+    frame = frame[rule["columns"]].drop_duplicates(rule["key"], keep="last")
+    frame.index = pd.Index((rule["prefix"] + ":" + frame[rule["key"]].astype(str)).to_numpy(), name="entity")
+    return frame
+
+
+# Rows of frame (and of the previous frame) whose hashes have to be recomputed, or None for all:
+# for watermark rules, the rows dated from ALERT_REOPEN_DAYS before the watermark on and the
+# entities currently alerting, as long as the number of rows before that is unchanged
+def _rows_to_hash(rule, frame, state):
+    column = rule.get("watermark")
+    if column is None or pd.isna(state["watermark"]):
+        return None
+    since = state["watermark"] - pd.Timedelta(days=ALERT_REOPEN_DAYS)
+    masks = []
+    for rows in (frame, state["frame"]):
+        masks.append(~(rows[column] < since).to_numpy() | (state["alerts"].index.get_indexer(rows.index) >= 0))
+    if (~masks[0]).sum() != (~masks[1]).sum():
+        return None
+    return masks
+
+
+def _evaluate_rule(name, rule, df, version, thresholds, now):
+    rule_thresholds = {key: thresholds[key] for key in rule["thresholds"]}
+    state = _state.get(name)
+    if state is not None and state["thresholds"] != rule_thresholds:
+        state = None
+
+    if state is not None and version is not None and state["version"] == version:
+        # unchanged input: only rows whose deadline passed since the last run
+        frame, hashes, watermark = state["frame"], state["hashes"], state["watermark"]
+        changed = np.zeros(len(frame), dtype=bool)
+        gone = pd.Index([])
+        old_frame = state["frame"]
+    else:
+        frame = _rule_input(rule, df)
+        if frame is None:
+            _state.pop(name, None)
+            return None
+        masks = _rows_to_hash(rule, frame, state) if state is not None else None
+        hashed, old_hashed = masks if masks is not None else (np.ones(len(frame), dtype=bool), None)
+        hashes = np.empty(len(frame), dtype=np.uint64)
+        hashes[hashed] = pd.util.hash_pandas_object(frame[hashed], index=False).to_numpy()
+        if state is None:
+            changed = np.ones(len(frame), dtype=bool)
+            gone = pd.Index([])
+            old_frame = None
+        else:
+            # rows outside the hashed ones are the same rows in the same order as before
+            if old_hashed is not None:
+                hashes[~hashed] = state["hashes"][~old_hashed]
+                old_frame, old_hashes = state["frame"][old_hashed], state["hashes"][old_hashed]
+            else:
+                old_frame, old_hashes = state["frame"], state["hashes"]
+            positions = old_frame.index.get_indexer(frame.index[hashed])
+            changed = np.zeros(len(frame), dtype=bool)
+            changed[hashed] = (positions < 0) | (old_hashes[positions] != hashes[hashed])
+            gone = old_frame.index.difference(frame.index[hashed])
+        watermark = frame[rule["watermark"]][hashed].max() if "watermark" in rule else None
+        if state is not None and "watermark" in rule and not pd.isna(state["watermark"]):
+            watermark = state["watermark"] if pd.isna(watermark) else max(watermark, state["watermark"])
+
+    if state is not None:
+        for deadline in rule["deadlines"](frame, rule_thresholds) if "deadlines" in rule else []:
+            changed |= ((deadline > state["evaluated_at"]) & (deadline <= now)).to_numpy()
+
+    rows = frame[changed]
+    previous = old_frame.reindex(rows.index) if old_frame is not None else None
+    raised = rule["evaluate"](rows, previous, rule_thresholds, now)
+
+    # Alerts raised again keep the time they were first detected
+    if state is not None:
+        alerts = state["alerts"]
+        kept = alerts[(rows.index.get_indexer(alerts.index) < 0) & (gone.get_indexer(alerts.index) < 0)]
+        raised["detected_at"] = alerts["detected_at"].reindex(raised.index).fillna(now)
+        alerts = pd.concat([kept, raised]) if len(kept) else raised
+    else:
+        raised["detected_at"] = now
+        alerts = raised
+
+    _state[name] = {"frame": frame, "hashes": hashes, "thresholds": rule_thresholds, "version": version,
+                    "watermark": watermark, "evaluated_at": now, "alerts": alerts}
+    return alerts.assign(rule=name)
+
+
+# Evaluate every rule against the datasets in data ({dataset: DataFrame}). versions
+# ({dataset: fingerprint}, optional) lets rules over an unchanged dataset skip re-reading it.
+# Returns the active alerts (entity, rule, severity, message, detected_at), most severe and newest first.
+def evaluate_alerts(data, thresholds=None, now=None, versions=None):
+    thresholds = {**ALERT_THRESHOLDS, **(thresholds or {})}
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    versions = versions or {}
+    with _state_lock:
+        results = [_evaluate_rule(name, rule, data.get(rule["dataset"]), versions.get(rule["dataset"]),
+                                  thresholds, now)
+                   for name, rule in ALERT_RULES.items()]
+    return _combine(results)
+
+
+# Re-check only the time-based rules against now, on the rows of the last evaluation
+# (for when none of the datasets changed). Returns the active alerts like evaluate_alerts.
+def recheck_deadlines(now=None):
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    results = []
+    with _state_lock:
+        for name, rule in ALERT_RULES.items():
+            state = _state.get(name)
+            if state is None:
+                continue
+            if "deadlines" in rule and state["version"] is not None:
+                results.append(_evaluate_rule(name, rule, None, state["version"], state["thresholds"], now))
+            else:
+                results.append(state["alerts"].assign(rule=name))
+    return _combine(results)
+
+
+# One frame of the rules' alerts, most severe and newest first
+def _combine(results):
+    results = [result for result in results if result is not None and len(result)]
+    if not results:
+        return pd.DataFrame({
+            "entity": pd.Series(dtype=object),
+            "rule": pd.Series(dtype=object),
+            "severity": pd.Categorical([], categories=ALERT_SEVERITIES),
+            "message": pd.Series(dtype=object),
+            "detected_at": pd.Series(dtype="datetime64[ns]"),
+        })
+    alerts = pd.concat(results).rename_axis("entity").reset_index()
+    alerts["severity"] = pd.Categorical(alerts["severity"], categories=ALERT_SEVERITIES)
+    alerts = alerts[["entity", "rule", "severity", "message", "detected_at"]]
+    return alerts.sort_values(["severity", "detected_at"], ascending=[True, False], ignore_index=True)
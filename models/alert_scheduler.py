@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+import pandas as pd
+from config.settings import ALERT_EVAL_INTERVAL
+from data import alert_store
+from data.data_loader import dataset_fingerprint, read_dataset
+from models.alert_rules import ALERT_RULES, evaluate_alerts, recheck_deadlines
+
+# Background alert evaluation.
+# One daemon thread per server process evaluates the alert rules every
+# ALERT_EVAL_INTERVAL seconds against the same data the loader serves and writes the
+# results to the alert store, so detection runs whether or not anyone has the alerts
+# page open and costs one evaluation per interval instead of one per browser rerun.
+# Datasets are re-read only when their fingerprint changes; a run where neither the
+# datasets nor the thresholds changed only re-checks the shipment deadlines.
+
+logger = logging.getLogger(__name__)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_wake = threading.Event()
+# {dataset: (fingerprint, frame)} last read, and the thresholds of the last full evaluation
+_sources = {}
+_thresholds = None
+
+
+# Refresh the datasets the alert rules read (skipping missing files), re-reading only
+# those whose fingerprint changed. Returns whether any of them changed.
+def _refresh_sources():
+    changed = False
+    for key in {rule["dataset"] for rule in ALERT_RULES.values()}:
+        fingerprint = dataset_fingerprint(key)
+        if fingerprint is None:
+            changed |= _sources.pop(key, None) is not None
+        elif key not in _sources or _sources[key][0] != fingerprint:
+            _sources[key] = (fingerprint, read_dataset(key))
+            changed = True
+    return changed
+
+
+# Evaluate all rules once with the saved thresholds and store the result
+def run_alert_evaluation():
+    global _thresholds
+    started = time.perf_counter()
+    now = pd.Timestamp.now()
+    thresholds = alert_store.load_thresholds()
+    if _refresh_sources() or thresholds != _thresholds:
+        alerts = evaluate_alerts({key: frame for key, (_, frame) in _sources.items()}, thresholds, now,
+                                 {key: fingerprint for key, (fingerprint, _) in _sources.items()})
+        _thresholds = thresholds
+    else:
+        alerts = recheck_deadlines(now)
+    alert_store.save_run(alerts, now, time.perf_counter() - started)
+    return alerts
+
+
+def _run_forever(interval):
+    while True:
+        try:
+            run_alert_evaluation()
+        except Exception:
+            logger.exception("Alert evaluation failed")
+        _wake.wait(interval)
+        _wake.clear()
+
+
+# Start the scheduler thread unless it is already running in this process
+def start_alert_scheduler(interval=ALERT_EVAL_INTERVAL):
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            _scheduler = threading.Thread(target=_run_forever, args=(interval,), name="alert-scheduler", daemon=True)
+            _scheduler.start()
+        return _scheduler
+
+
+# Run the next evaluation now instead of at the end of the interval (e.g. after saving thresholds)
+def request_alert_evaluation():
+    _wake.set()
@@ -0,0 +1,84 @@
+import warnings
+import numpy as np
+import pandas as pd
+from config.settings import BACKTEST_CUTOFFS, BACKTEST_STEP_DAYS, BACKTEST_LOOKBACK_DAYS
+from models.forecast_models import FORECAST_MODELS
+
+# Rolling-origin backtesting.
+# For every cutoff (forecast origin) a model sees the `lookback` days before the cutoff
+# and forecasts `horizon` days after it. All (cutoff, series) windows are stacked as the
+# rows of one matrix, so any model from forecast_models is evaluated over every cutoff
+# and series in a single vectorized call.
+
+METRICS = ["mae", "mape", "smape", "bias"]
+
+
+# Cutoff day indices, spaced `step` days apart and ending `horizon` days before the last day
+def rolling_origins(n_days, horizon, n_cutoffs=BACKTEST_CUTOFFS, step=BACKTEST_STEP_DAYS, lookback=BACKTEST_LOOKBACK_DAYS):
+    last = n_days - horizon
+    cutoffs = last - step * np.arange(n_cutoffs)[::-1]
+    return cutoffs[cutoffs >= lookback]
+
+
+# Per (series, horizon step) error metrics averaged over cutoffs.
+# MAPE skips days with zero actual demand; sMAPE counts a zero forecast of zero demand as exact.
+def _error_metrics(forecast, targets):
+    error = forecast - targets
+    abs_error = np.abs(error)
+    denominator = np.abs(targets) + np.abs(forecast)
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)  # all-NaN slices -> NaN
+        ape = np.where(targets != 0, abs_error / np.abs(targets), np.nan)
+        sape = np.where(denominator > 0, 2 * abs_error / denominator, 0.0)
+        return {
+            "mae": np.nanmean(abs_error, axis=0),
+            "mape": np.nanmean(ape, axis=0) * 100,
+            "smape": np.nanmean(sape, axis=0) * 100,
+            "bias": np.nanmean(error, axis=0),
+        }
+
+
+# Backtest one model over a (series x day) matrix.
+# Returns ({metric: (series x horizon) array}, cutoff day indices), or None with too little history.
+def backtest(actual, model, horizon=7, n_cutoffs=BACKTEST_CUTOFFS, step=BACKTEST_STEP_DAYS,
+             lookback=BACKTEST_LOOKBACK_DAYS, params=None):
+    n_series, n_days = actual.shape
+    lookback = min(lookback, n_days - horizon)
+    cutoffs = rolling_origins(n_days, horizon, n_cutoffs, step, lookback)
+    if lookback < 1 or len(cutoffs) == 0 or n_series == 0:
+        return None
+
+    n_cutoffs = len(cutoffs)
+    history_index = cutoffs[:, None] + np.arange(-lookback, 0)
+    target_index = cutoffs[:, None] + np.arange(horizon)
+    histories = actual[:, history_index].transpose(1, 0, 2).reshape(n_cutoffs * n_series, lookback)
+    targets = actual[:, target_index].transpose(1, 0, 2)
+
+    _, forecast = FORECAST_MODELS[model](histories, horizon, **(params or {}))
+    return _error_metrics(forecast.reshape(n_cutoffs, n_series, horizon), targets), cutoffs
+
+
+# Backtest each series with its own model (e.g. the per-series choice of forecast_series)
+def backtest_by_model(actual, series_models, horizon=7, params=None, **kwargs):
+    params = params or {}
+    combined = {metric: np.full((actual.shape[0], horizon), np.nan) for metric in METRICS}
+    cutoffs = None
+    for name in np.unique(series_models):
+        rows = series_models == name
+        result = backtest(actual[rows], name, horizon, params=params.get(name), **kwargs)
+        if result is None:
+            continue
+        metrics, cutoffs = result
+        for metric in METRICS:
+            combined[metric][rows] = metrics[metric]
+    return combined, cutoffs
+
+
+# Summary tables: metrics per series (averaged over horizons) and per horizon (over series)
+def summarise(metrics, series):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        by_series = pd.DataFrame({metric: np.nanmean(metrics[metric], axis=1) for metric in METRICS}, index=series)
+        by_horizon = pd.DataFrame({metric: np.nanmean(metrics[metric], axis=0) for metric in METRICS},
+                                  index=pd.RangeIndex(1, metrics["mae"].shape[1] + 1, name="horizon"))
+    return by_series, by_horizon
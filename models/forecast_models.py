@@ -0,0 +1,90 @@
+import numpy as np
+
+# Forecasting models, each vectorized across the rows of a (series x day) matrix.
+#
+# Every model has the signature model(history, horizon, **params) -> (fitted, forecast):
+#   fitted   (series x days)    one-step-ahead prediction for each day, NaN where undefined
+#   forecast (series x horizon) prediction for the days after the history
+# Recursive models loop over days, never over series.
+
+SEASON_LENGTH = 7  # weekly seasonality of daily demand
+
+
+def sma(history, horizon, window=7):
+    n_series, n_days = history.shape
+    fitted = np.full((n_series, n_days), np.nan)
+    if n_days > window:
+        cumulative = np.concatenate([np.zeros((n_series, 1)), np.cumsum(history, axis=1)], axis=1)
+        fitted[:, window:] = (cumulative[:, window:n_days] - cumulative[:, :n_days - window]) / window
+    last_mean = history[:, -window:].mean(axis=1)
+    return fitted, np.repeat(last_mean[:, None], horizon, axis=1)
+
+
+# Simple exponential smoothing
+def exponential_smoothing(history, horizon, alpha=0.3):
+    n_series, n_days = history.shape
+    fitted = np.full((n_series, n_days), np.nan)
+    level = history[:, 0].astype(float)
+    for t in range(1, n_days):
+        fitted[:, t] = level
+        level = alpha * history[:, t] + (1 - alpha) * level
+    return fitted, np.repeat(level[:, None], horizon, axis=1)
+
+
+# Additive Holt-Winters with weekly seasonality
+def holt_winters(history, horizon, alpha=0.3, beta=0.05, gamma=0.2, season=SEASON_LENGTH):
+    n_series, n_days = history.shape
+    fitted = np.full((n_series, n_days), np.nan)
+    if n_days < 2 * season:
+        return fitted, np.full((n_series, horizon), np.nan)
+
+    level = history[:, :season].mean(axis=1)
+    trend = (history[:, season:2 * season].mean(axis=1) - level) / season
+    seasonal = history[:, :season] - level[:, None]
+    for t in range(season, n_days):
+        s = seasonal[:, t % season]
+        fitted[:, t] = level + trend + s
+        previous_level = level
+        level = alpha * (history[:, t] - s) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+        seasonal[:, t % season] = gamma * (history[:, t] - level) + (1 - gamma) * s
+
+    steps = np.arange(1, horizon + 1)
+    season_index = (n_days + steps - 1) % season
+    forecast = level[:, None] + steps[None, :] * trend[:, None] + seasonal[:, season_index]
+    return fitted, np.maximum(forecast, 0)
+
+
+# Same weekday last week
+def seasonal_naive(history, horizon, season=SEASON_LENGTH):
+    n_series, n_days = history.shape
+    fitted = np.full((n_series, n_days), np.nan)
+    if n_days < season:
+        return fitted, np.full((n_series, horizon), np.nan)
+    fitted[:, season:] = history[:, :-season]
+    season_index = n_days - season + (np.arange(horizon) % season)
+    return fitted, history[:, season_index].astype(float)
+
+
+FORECAST_MODELS = {
+    "SMA": sma,
+    "Exponential Smoothing": exponential_smoothing,
+    "Holt-Winters": holt_winters,
+    "Seasonal Naive": seasonal_naive,
+}
+
+
+# Pool task: score a model on a holdout of the last `horizon` days, then fit it on the full history.
+# Returns (holdout MAE per series, fitted, forecast).
+def evaluate_model(name, history, horizon, params=None):
+    model = FORECAST_MODELS[name]
+    params = params or {}
+
+    holdout_mae = np.full(history.shape[0], np.nan)
+    if history.shape[1] > horizon + 1:
+        _, holdout_forecast = model(history[:, :-horizon], horizon, **params)
+        with np.errstate(invalid="ignore"):
+            holdout_mae = np.abs(holdout_forecast - history[:, -horizon:]).mean(axis=1)
+
+    fitted, forecast = model(history, horizon, **params)
+    return holdout_mae, fitted, forecast
@@ -1,41 +1,177 @@
 import pandas as pd
 import numpy as np
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from config.settings import (FORECAST_MAX_WORKERS, FORECAST_PARALLEL_MIN_CELLS,
+                             BACKTEST_CUTOFFS, BACKTEST_STEP_DAYS, BACKTEST_LOOKBACK_DAYS)
+from data import disk_cache
+from models import backtest
+from models.forecast_models import FORECAST_MODELS, evaluate_model
 
 # ML Component for Demand Forecasting
+#
+# Demand is laid out as a dense 2-D matrix (series x day) so every series - one per
+# item, per customer, or the single aggregate - is forecast in one vectorized pass.
+# Each model in models/forecast_models.py is scored on a holdout of the last
+# `horizon` days; with model="auto" the best one is picked per series.
 
+AUTO_MODEL = "auto"
 
-def forecast_demand():
+_pool = None
+_pool_lock = threading.Lock()
 
-    # Simple time series forecasting for inventory demand
-    if "orders.csv" not in os.listdir():
+
+# Daily demand matrix from orders.
+# by: column identifying a series (None -> one aggregate series)
+# value: column to sum per day (None -> count orders)
+# Returns (series labels, dates, matrix of shape (len(series), len(dates)))
+def demand_matrix(orders, by=None, value=None, lookback_days=None):
+    orders = orders.dropna(subset=["order_date"])
+    if by is not None:
+        orders = orders.dropna(subset=[by])
+    if orders.empty:
+        return pd.Index([]), pd.DatetimeIndex([]), np.zeros((0, 0))
+
+    days = orders["order_date"].values.astype("datetime64[D]")
+    last_day = days.max()
+    first_day = days.min() if lookback_days is None else max(days.min(), last_day - np.timedelta64(lookback_days - 1, "D"))
+    in_window = days >= first_day
+    day_index = (days[in_window] - first_day).astype(np.int64)
+    n_days = int((last_day - first_day).astype(np.int64)) + 1
+
+    if by is None:
+        codes = np.zeros(len(day_index), dtype=np.int64)
+        series = pd.Index(["All orders"])
+    else:
+        codes, series = pd.factorize(orders[by].values[in_window], sort=True)
+        series = pd.Index(series)
+
+    weights = orders[value].values[in_window].astype(float) if value is not None else None
+    matrix = np.bincount(codes * n_days + day_index, weights=weights,
+                         minlength=len(series) * n_days).reshape(len(series), n_days)
+    return series, pd.date_range(pd.Timestamp(first_day), periods=n_days), matrix.astype(float)
+
+
+def _process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=FORECAST_MAX_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+
+# Evaluate models over the matrix, split into row chunks across a process pool when it is large.
+# Returns {model name: (holdout MAE, fitted, forecast)}
+def evaluate_models(names, actual, horizon, params=None):
+    params = params or {}
+    workers = FORECAST_MAX_WORKERS or os.cpu_count() or 1
+    if workers == 1 or actual.size * len(names) < FORECAST_PARALLEL_MIN_CELLS:
+        return {name: evaluate_model(name, actual, horizon, params.get(name)) for name in names}
+
+    bounds = np.linspace(0, actual.shape[0], min(workers, actual.shape[0]) + 1).astype(int)
+    pool = _process_pool()
+    futures = {
+        name: [pool.submit(evaluate_model, name, actual[start:stop], horizon, params.get(name))
+               for start, stop in zip(bounds[:-1], bounds[1:])]
+        for name in names
+    }
+    results = {}
+    for name, chunks in futures.items():
+        parts = [future.result() for future in chunks]
+        results[name] = tuple(np.concatenate([part[i] for part in parts]) for i in range(3))
+    return results
+
+
+# Forecast all series at once with one model, or with the best model per series (model="auto").
+# Returns a dict with the series labels, history dates, actual and fitted matrices, forecast
+# dates, the (series x horizon) forecast, the model used per series and every model's holdout
+# MAE - or None with too little history.
+def forecast_series(orders, by=None, window=7, horizon=7, model=AUTO_MODEL, value=None, lookback_days=None):
+    series, dates, actual = demand_matrix(orders, by=by, value=value, lookback_days=lookback_days)
+    if len(dates) < window:
+        return None
+
+    names = list(FORECAST_MODELS) if model == AUTO_MODEL else [model]
+    results = evaluate_models(names, actual, horizon, {"SMA": {"window": window}})
+
+    scores = np.column_stack([results[name][0] for name in names])
+    best = np.where(np.isnan(scores), np.inf, scores).argmin(axis=1)  # ties and all-NaN -> first model
+    fitted = np.empty_like(actual)
+    forecast = np.empty((len(series), horizon))
+    for i, name in enumerate(names):
+        rows = best == i
+        fitted[rows] = results[name][1][rows]
+        forecast[rows] = results[name][2][rows]
+
+    return {
+        "series": series,
+        "dates": dates,
+        "actual": actual,
+        "fitted": fitted,
+        "forecast_dates": pd.date_range(dates[-1] + pd.Timedelta(days=1), periods=horizon),
+        "forecast": forecast,
+        "model": np.array(names)[best],
+        "model_scores": pd.DataFrame(scores, index=series, columns=names),
+    }
+
+
+# Out-of-sample accuracy of each series' model from a rolling-origin backtest.
+# Adds "backtest" ({metric: series x horizon}), "metrics" (per series) and
+# "metrics_by_horizon" (over all series) to a forecast_series() result.
+def add_backtest_metrics(result, window=7, horizon=7):
+    backtest_metrics, cutoffs = backtest.backtest_by_model(
+        result["actual"], result["model"], horizon, params={"SMA": {"window": window}})
+    result["backtest"] = backtest_metrics
+    result["backtest_cutoffs"] = result["dates"][cutoffs] if cutoffs is not None else pd.DatetimeIndex([])
+    result["metrics"], result["metrics_by_horizon"] = backtest.summarise(backtest_metrics, result["series"])
+    return result
+
+
+# Forecast and backtested accuracy metrics, cached on disk by the orders data version and model parameters
+# (value: column summed per day, e.g. "quantity" for units; None counts orders)
+def cached_forecast(orders, data_version, by=None, window=7, horizon=7, model=AUTO_MODEL, value=None):
+    def compute():
+        result = forecast_series(orders, by=by, window=window, horizon=horizon, model=model, value=value)
+        if result is not None:
+            add_backtest_metrics(result, window, horizon)
+        return result
+
+    key = disk_cache.cache_key(model, data_version, by, value, window, horizon,
+                               BACKTEST_CUTOFFS, BACKTEST_STEP_DAYS, BACKTEST_LOOKBACK_DAYS)
+    return disk_cache.cached("forecasts", key, compute)
+
+
+# Historical and forecast frames for one series of a forecast_series() result
+def series_frames(result, series_id):
+    row = result["series"].get_loc(series_id)
+    historical = pd.DataFrame({
+        "date": result["dates"],
+        "order_count": result["actual"][row],
+        "forecast": result["fitted"][row],
+    }).dropna()
+    forecast_df = pd.DataFrame({
+        "date": result["forecast_dates"],
+        "forecast": result["forecast"][row],
+    })
+    return historical, forecast_df
+
+
+# Series labels ordered by total demand, largest first
+def series_by_volume(result):
+    totals = result["actual"].sum(axis=1)
+    return result["series"][np.argsort(-totals, kind="stable")]
+
+
+def forecast_demand(orders, window=7, horizon=7, model=AUTO_MODEL):
+
+    # Time series forecasting for inventory demand (aggregate order count)
+    if orders is None or orders.empty:
         return None
-    
-    orders = pd.read_csv("orders.csv")
-    orders["order_date"] = pd.to_datetime(orders["order_date"])
-    
-    # Group by date and count orders
-    daily_orders = orders.groupby(orders["order_date"].dt.date).size().reset_index()
-    daily_orders.columns = ["date", "order_count"]
-    daily_orders["date"] = pd.to_datetime(daily_orders["date"])
-    
-    
-    # Simple moving average forecast
-    if len(daily_orders) >= 7:
-        # Create features (last 7 days)
-        daily_orders["forecast"] = daily_orders["order_count"].rolling(window=7).mean().shift(1)
-        daily_orders = daily_orders.dropna()
-        
-        # Forecast next 7 days
-        last_date = daily_orders["date"].max()
-        forecast_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=7)
-        last_avg = daily_orders["order_count"].tail(7).mean()
-        
-        forecast_df = pd.DataFrame({
-            "date": forecast_dates,
-            "forecast": [last_avg] * 7
-        })
-        
-        return daily_orders, forecast_df
-    
-    return None
\ No newline at end of file
+
+    result = forecast_series(orders, window=window, horizon=horizon, model=model)
+    if result is None:
+        return None
+
+    return series_frames(result, "All orders")
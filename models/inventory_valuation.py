@@ -0,0 +1,209 @@
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+from config.settings import VALUATION_JOURNAL_MAX
+from data import disk_cache, inventory_store
+from data.data_loader import dataset_fingerprint, read_dataset
+from data.frame_diff import diff_rows
+
+# Inventory valuation from unit costs and stock movements.
+# Unit costs come from unit_costs.csv (one row per item and date the cost took effect),
+# joined to inventory by item_id. Stock receipts recorded in the inventory store
+# (positive stock movements) are costed at the unit cost in effect when they were made:
+# - FIFO: the stock on hand is the most recent receipts at their cost; stock older than
+#   the recorded receipts is valued at the current unit cost
+# - weighted average: the stock on hand at the quantity-weighted mean cost of the
+#   item's receipts (the current unit cost for items without receipts)
+# Item values and supplier totals are kept in memory and on disk. When stock changes, only
+# the items with new movements or a changed stock row are revalued and the supplier
+# totals are adjusted by the difference; new unit costs (or a new day, which can bring
+# a cost into effect) revalue everything.
+# On disk the state is a full copy plus a journal of the updates since (the changed stock
+# rows, new receipts and revalued items), so a stock edit writes only what it changed;
+# every VALUATION_JOURNAL_MAX updates the journal is folded into a new full copy.
+
+# Costing method -> label
+VALUATION_METHODS = {"fifo": "FIFO", "average": "Weighted average"}
+
+# Additive per-item columns, summed into the supplier totals
+TOTAL_COLUMNS = ["items", "stock_level", "fifo_value", "average_value"]
+
+_state = None
+_lock = threading.Lock()
+
+
+# Current unit cost per item: the latest cost in effect on day
+def _current_costs(unit_costs, day):
+    effective = unit_costs[unit_costs["effective_date"] <= day]
+    return effective.drop_duplicates("item_id", keep="last").set_index("item_id")["unit_cost"]
+
+
+# Receipts (positive movements) with the unit cost in effect when they were made;
+# receipts older than an item's first cost get that first cost
+def _cost_receipts(movements, unit_costs):
+    receipts = movements.loc[movements["quantity"] > 0, ["movement_id", "item_id", "quantity", "created_at"]]
+    receipts = receipts.astype({"movement_id": "int64", "item_id": "int64", "quantity": "int64"}).assign(
+        created_at=pd.to_datetime(receipts["created_at"], format="ISO8601").astype("datetime64[us]"),
+    ).sort_values("created_at", kind="stable")
+    costs = unit_costs[["item_id", "effective_date", "unit_cost"]].astype(
+        {"item_id": "int64", "effective_date": "datetime64[us]"})
+    receipts = pd.merge_asof(receipts, costs, left_on="created_at", right_on="effective_date", by="item_id")
+    first_cost = costs.drop_duplicates("item_id").set_index("item_id")["unit_cost"]
+    receipts["unit_cost"] = receipts["unit_cost"].fillna(receipts["item_id"].map(first_cost))
+    return receipts[["movement_id", "item_id", "quantity", "unit_cost"]].sort_values(
+        ["item_id", "movement_id"], ignore_index=True)
+
+
+# Per-item valuation (indexed by item_id) of stock rows (item_id, stock_level, supplier).
+# Items without any unit cost get no value (NaN).
+def _value_items(stock, receipts, current_costs):
+    on_hand = stock.set_index("item_id")["stock_level"].clip(lower=0).astype(float)
+    unit_cost = current_costs.reindex(on_hand.index)
+
+    receipts = receipts[receipts["item_id"].isin(on_hand.index)]
+    item = receipts["item_id"].to_numpy()
+    quantity = receipts["quantity"].to_numpy(dtype=float)
+    cost = receipts["unit_cost"].to_numpy(dtype=float)
+
+    # FIFO: take each receipt's quantity, newest first, until the stock on hand is covered
+    newer = receipts.iloc[::-1].groupby("item_id")["quantity"].cumsum().iloc[::-1].to_numpy() - quantity
+    taken = np.clip(on_hand.reindex(item).to_numpy() - newer, 0, quantity)
+    layered = pd.DataFrame({"covered": taken, "value": taken * cost}).groupby(item).sum(min_count=1)
+    layered = layered.reindex(on_hand.index, fill_value=0)
+    uncovered = on_hand - layered["covered"]
+    fifo_value = layered["value"] + (uncovered * unit_cost).where(uncovered > 0, 0)
+
+    # weighted average over the item's receipts
+    received = pd.DataFrame({"quantity": quantity, "value": quantity * cost}).groupby(item).sum(min_count=1)
+    average_cost = (received["value"] / received["quantity"]).reindex(on_hand.index).fillna(unit_cost)
+
+    return pd.DataFrame({
+        "supplier": stock.set_index("item_id")["supplier"].astype(str),
+        "items": 1,
+        "stock_level": on_hand,
+        "unit_cost": unit_cost,
+        "average_cost": average_cost,
+        "fifo_value": fifo_value,
+        "average_value": on_hand * average_cost,
+    })
+
+
+def _supplier_totals(items):
+    return items.groupby("supplier")[TOTAL_COLUMNS].sum()
+
+
+def _stock_rows(inventory):
+    return pd.DataFrame({
+        "item_id": inventory["item_id"].to_numpy(dtype="int64"),
+        "stock_level": inventory["stock_level"].to_numpy(),
+        "supplier": inventory["supplier"].astype(str).to_numpy(),
+    })
+
+
+def _build(stock, unit_costs, day):
+    movements = inventory_store.read_stock_movements()
+    receipts = _cost_receipts(movements, unit_costs)
+    items = _value_items(stock, receipts, _current_costs(unit_costs, day))
+    last_movement = int(movements["movement_id"].max()) if not movements.empty else 0
+    return {"last_movement": last_movement, "stock": stock, "receipts": receipts,
+            "items": items, "suppliers": _supplier_totals(items), "journal": 0}
+
+
+# Changes that revalue only the items with new movements or changed stock rows (see _apply);
+# None if that isn't possible
+def _update(state, stock, unit_costs, day):
+    if inventory_store.last_movement_id() < state["last_movement"]:  # the store was recreated
+        return None
+    diff = diff_rows(stock, state["stock"], "item_id")
+    if diff is None:
+        return None
+    added, removed = diff
+    movements = inventory_store.read_stock_movements(after_id=state["last_movement"])
+    new_receipts = _cost_receipts(movements, unit_costs)
+    receipts = state["receipts"]
+    if len(new_receipts):
+        receipts = pd.concat([receipts, new_receipts]).sort_values(["item_id", "movement_id"], ignore_index=True)
+
+    touched = pd.Index(np.concatenate([
+        movements["item_id"].to_numpy(dtype="int64"),
+        stock["item_id"].to_numpy()[added],
+        state["stock"]["item_id"].to_numpy()[removed],
+    ])).unique()
+    old_items = state["items"][state["items"].index.isin(touched)]
+    new_items = _value_items(stock[stock["item_id"].isin(touched)], receipts, _current_costs(unit_costs, day))
+
+    suppliers = (state["suppliers"]
+                 .sub(_supplier_totals(old_items), fill_value=0)
+                 .add(_supplier_totals(new_items), fill_value=0))
+    suppliers = suppliers[suppliers["items"] > 0]
+    last_movement = int(movements["movement_id"].max()) if not movements.empty else state["last_movement"]
+    return {"last_movement": last_movement, "stock": stock[added],
+            "stock_removed": state["stock"]["item_id"].to_numpy()[removed], "receipts": new_receipts,
+            "items": new_items, "items_removed": old_items.index, "suppliers": suppliers}
+
+
+# State after the changes of an update (also how journal entries are replayed)
+def _apply(state, changes):
+    stock = state["stock"]
+    stock = pd.concat([stock[~stock["item_id"].isin(changes["stock_removed"])], changes["stock"]])
+    receipts = state["receipts"]
+    if len(changes["receipts"]):
+        receipts = pd.concat([receipts, changes["receipts"]]).sort_values(["item_id", "movement_id"], ignore_index=True)
+    items = pd.concat([state["items"].drop(changes["items_removed"]), changes["items"]]).sort_index()
+    return {"last_movement": changes["last_movement"], "stock": stock.sort_values("item_id", ignore_index=True),
+            "receipts": receipts, "items": items, "suppliers": changes["suppliers"],
+            "fingerprints": changes["fingerprints"], "base": state["base"], "journal": state["journal"] + 1}
+
+
+def _journal_key(base, number):
+    return f"{base}-{number}"
+
+
+# Saved state: the full copy with its journal replayed
+def _load():
+    state = disk_cache.get("valuation", "base")
+    while state is not None:
+        changes = disk_cache.get("valuation", _journal_key(state["base"], state["journal"] + 1))
+        if changes is None:
+            break
+        state = _apply(state, changes)
+    return state
+
+
+# Valuation of the current inventory: {"items": per item, "suppliers": totals per supplier, ...}
+# or None without inventory. A cached read unless stock or unit costs changed since the last call.
+def inventory_valuation():
+    global _state
+    with _lock:
+        inventory_fingerprint = dataset_fingerprint("inventory")
+        if inventory_fingerprint is None:
+            return None
+        costs_fingerprint = dataset_fingerprint("unit_costs")
+        day = pd.Timestamp.now().normalize()
+        fingerprints = (inventory_fingerprint, costs_fingerprint, day)
+        if _state is None:
+            _state = _load()
+        if _state is not None and _state["fingerprints"] == fingerprints:
+            return _state
+
+        stock = _stock_rows(read_dataset("inventory"))
+        unit_costs = (read_dataset("unit_costs") if costs_fingerprint is not None
+                      else pd.DataFrame({"item_id": pd.Series(dtype="int32"), "unit_cost": pd.Series(dtype=float),
+                                         "effective_date": pd.Series(dtype="datetime64[ns]")}))
+        state = changes = None
+        if _state is not None and _state["fingerprints"][1:] == fingerprints[1:]:
+            changes = _update(_state, stock, unit_costs, day)
+        if changes is not None:
+            changes["fingerprints"] = fingerprints
+            state = _apply(_state, changes)
+        else:
+            state = _build(stock, unit_costs, day)
+            state["fingerprints"] = fingerprints
+        if 0 < state["journal"] <= VALUATION_JOURNAL_MAX:
+            disk_cache.put("valuation", _journal_key(state["base"], state["journal"]), changes)
+        else:
+            state.update(base=uuid.uuid4().hex, journal=0)
+            disk_cache.put("valuation", "base", state)
+        _state = state
+        return state
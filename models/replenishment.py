@@ -0,0 +1,116 @@
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from config.settings import (REPLENISHMENT_LOOKBACK_DAYS, REPLENISHMENT_SERVICE_LEVEL, REPLENISHMENT_ORDER_COST,
+                             REPLENISHMENT_HOLDING_RATE, REPLENISHMENT_COVER_DAYS)
+from data import disk_cache
+from data.data_loader import dataset_fingerprint, read_dataset
+from models.forecasting import demand_matrix
+from models.inventory_valuation import inventory_valuation
+from models.supplier_scorecard import supplier_scorecard
+
+# Replenishment planning: safety stock, reorder point and order quantity for every item.
+# Daily demand per item (mean d and standard deviation sd_d over the last
+# REPLENISHMENT_LOOKBACK_DAYS of orders, cancelled ones excluded) and lead time (the
+# item's lead_time_days L, with its supplier's lead-time spread sd_L) give
+#   safety stock  = z * sqrt(L * sd_d^2 + d^2 * sd_L^2)
+#   reorder point = d * L + safety stock
+# where z is the service level's normal quantile. Items below their reorder point
+# get an order of the economic order quantity (from their unit cost), or of what brings
+# them back to the reorder point if that is more. Items without recent demand keep the
+# manual reorder_threshold. The demand statistics are cached per orders version and the
+# supplier lead-time spread comes from the cached scorecard, which stock changes keep.
+
+Z_P90 = NormalDist().inv_cdf(0.9)
+
+
+# Daily demand mean and standard deviation per item_id over the lookback window
+def _demand_stats(orders):
+    if orders.empty or not {"item_id", "quantity", "order_date"} <= set(orders.columns):
+        return pd.DataFrame({"demand_mean": pd.Series(dtype=float), "demand_sd": pd.Series(dtype=float)})
+    demand = orders[["item_id", "quantity", "order_date"]]
+    if "status" in orders.columns:
+        demand = demand[(orders["status"] != "Cancelled").to_numpy()]
+    items, days, matrix = demand_matrix(demand, by="item_id", value="quantity",
+                                        lookback_days=REPLENISHMENT_LOOKBACK_DAYS)
+    return pd.DataFrame({
+        "demand_mean": matrix.mean(axis=1),
+        "demand_sd": matrix.std(axis=1, ddof=1) if len(days) > 1 else np.zeros(len(items)),
+    }, index=pd.Index(items, dtype="int64"))
+
+
+def demand_stats():
+    fingerprint = dataset_fingerprint("orders")
+    if fingerprint is None:
+        return _demand_stats(pd.DataFrame())
+    return disk_cache.cached("replenishment", disk_cache.cache_key(fingerprint, REPLENISHMENT_LOOKBACK_DAYS),
+                             lambda: _demand_stats(read_dataset("orders")))
+
+
+# Lead-time standard deviation per supplier, from the spread (p50 to p90) of the lead times in
+# its shipment history; None when the scorecard has no history
+def _supplier_lead_time_sd():
+    scorecard = supplier_scorecard()
+    card = scorecard["suppliers"]
+    if scorecard["source"] != "history" or card.empty:
+        return None
+    return ((card["lead_time_p90"] - card["lead_time_p50"]) / Z_P90).set_axis(card["supplier"].astype(str))
+
+
+# Replenishment plan for the inventory frame: one row per item with demand_per_day, lead_time_sd,
+# safety_stock, reorder_point, order_quantity, low_stock (stock below the reorder point) and basis
+# ("demand" or "manual" when the item has no recent demand)
+def plan_replenishment(inventory):
+    item_ids = inventory["item_id"].to_numpy(dtype="int64")
+    supplier = inventory["supplier"].astype(str)
+    stock = inventory["stock_level"].to_numpy(dtype=float)
+    lead_time = inventory["lead_time_days"].to_numpy(dtype=float)
+
+    stats = demand_stats().reindex(item_ids)
+    demand = stats["demand_mean"].fillna(0).to_numpy()
+    demand_sd = stats["demand_sd"].fillna(0).to_numpy()
+
+    supplier_sd = _supplier_lead_time_sd()
+    if supplier_sd is not None:
+        lead_time_sd = supplier.map(supplier_sd)
+    else:
+        # no shipment history: how far the item's lead time is from its supplier's stated average
+        suppliers = read_dataset("suppliers") if dataset_fingerprint("suppliers") is not None else pd.DataFrame()
+        if {"supplier_name", "avg_lead_time"} <= set(suppliers.columns):
+            stated = suppliers.drop_duplicates("supplier_name")
+            stated = stated["avg_lead_time"].astype(float).set_axis(stated["supplier_name"].astype(str))
+            lead_time_sd = (supplier.map(stated) - lead_time).abs()
+        else:
+            lead_time_sd = pd.Series(np.nan, index=supplier.index)
+    lead_time_sd = lead_time_sd.fillna(0).to_numpy(dtype=float)
+
+    z = NormalDist().inv_cdf(REPLENISHMENT_SERVICE_LEVEL)
+    safety_stock = z * np.sqrt(lead_time * demand_sd ** 2 + demand ** 2 * lead_time_sd ** 2)
+    planned = demand > 0
+    safety_stock = np.where(planned, np.ceil(safety_stock), 0)
+    reorder_point = np.where(planned, np.ceil(demand * lead_time + safety_stock),
+                             inventory["reorder_threshold"].to_numpy(dtype=float))
+
+    valuation = inventory_valuation()
+    unit_cost = (valuation["items"]["unit_cost"].reindex(item_ids).to_numpy(dtype=float)
+                 if valuation is not None else np.full(len(item_ids), np.nan))
+    holding_cost = unit_cost * REPLENISHMENT_HOLDING_RATE
+    with np.errstate(divide="ignore", invalid="ignore"):
+        economic = np.sqrt(2 * demand * 365 * REPLENISHMENT_ORDER_COST / holding_cost)
+    lot = np.where(holding_cost > 0, economic, demand * REPLENISHMENT_COVER_DAYS)
+    order_quantity = np.where(stock < reorder_point, np.ceil(np.maximum(lot, reorder_point - stock)), 0)
+
+    return pd.DataFrame({
+        "item_id": item_ids,
+        "item_name": inventory["item_name"].to_numpy(),
+        "supplier": supplier.to_numpy(),
+        "stock_level": inventory["stock_level"].to_numpy(),
+        "demand_per_day": demand,
+        "lead_time_days": inventory["lead_time_days"].to_numpy(),
+        "lead_time_sd": lead_time_sd,
+        "safety_stock": safety_stock.astype(int),
+        "reorder_point": reorder_point.astype(int),
+        "order_quantity": order_quantity.astype(int),
+        "low_stock": stock < reorder_point,
+        "basis": np.where(planned, "demand", "manual"),
+    })
@@ -0,0 +1,319 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from config.settings import DATA_SORT_KEYS, INVENTORY_DB, SUPPLIER_METRICS_REOPEN_DAYS
+from data import disk_cache, inventory_store, supplier_metrics_store
+from data.data_loader import dataset_fingerprint, read_dataset
+from data.frame_diff import diff_rows
+
+# Supplier scorecards from shipment and order history.
+# Every shipment is attributed to the supplier of the ordered item (shipments.order_id ->
+# orders.item_id -> inventory.supplier) and measured as on time (not Delayed), late
+# (estimated arrival after the order's requested delivery) and by its lead time (order
+# placed to estimated arrival). Metrics are grouped per supplier and per supplier and
+# period. The per-supplier scorecard is cached on disk per version of the datasets it
+# reads; the history per week, month and quarter lives in data.supplier_metrics_store and
+# is updated with the shipments and orders that are new, changed or gone in the days since
+# its watermark. Without the history needed for the join, the static figures in
+# suppliers.csv are used instead.
+
+SCORECARD_DATASETS = ["orders", "shipments", "inventory", "costs", "suppliers"]
+
+# Radar/ranking axes (0-5, higher is better) -> scorecard column
+SCORE_COLUMNS = {
+    "Reliability": "reliability_score",
+    "Lead Time": "lead_time_score",
+    "On-Time Delivery": "on_time_score",
+    "Quality": "quality_score",
+    "Cost": "cost_score",
+}
+
+MAX_LEAD_TIME_DAYS = 20  # lead time scoring 0
+
+_rollup_lock = threading.Lock()
+_synced_versions = {}
+_quality_observed = None
+_mapping_versions = {}
+
+
+def _item_suppliers(inventory):
+    return inventory.drop_duplicates("item_id").set_index("item_id")["supplier"].astype(str).astype("category")
+
+
+# One row per shipment with its supplier, ship day and delivery measures (None without the join columns)
+def _supplier_shipments(orders, shipments, inventory):
+    if (orders.empty or shipments.empty or inventory.empty or "item_id" not in orders.columns
+            or "supplier" not in inventory.columns):
+        return None
+    orders = orders.drop_duplicates("order_id", keep="last")  # a repeated order counts as its latest row
+    order_rows = pd.Index(orders["order_id"]).get_indexer(shipments["order_id"])
+    matched = order_rows >= 0
+    order_rows = order_rows[matched]
+    shipments = shipments[matched]
+
+    supplier = _item_suppliers(inventory).reindex(orders["item_id"].to_numpy()[order_rows]).array
+    arrival = shipments["estimated_arrival"].to_numpy()
+    requested = orders["requested_delivery"].to_numpy()[order_rows]
+    late_by = (arrival - requested) / np.timedelta64(1, "D")
+    frame = pd.DataFrame({
+        "shipment_id": shipments["shipment_id"].array,
+        "supplier": supplier,
+        "day": shipments["ship_date"].dt.normalize().to_numpy(),
+        "on_time": (shipments["status"] != "Delayed").to_numpy(),
+        "late": late_by > 0,
+        "delay_days": np.where(late_by > 0, late_by, np.nan),
+        "lead_time_days": (arrival - orders["order_date"].to_numpy()[order_rows]) / np.timedelta64(1, "D"),
+    })
+    return frame[frame["supplier"].notna()].reset_index(drop=True)
+
+
+# Delivery metrics per group of shipments
+def _aggregate(frame, keys):
+    grouped = frame.groupby(keys, observed=True, sort=True)
+    metrics = grouped.agg(
+        shipments=("on_time", "size"),
+        on_time_pct=("on_time", "mean"),
+        late_pct=("late", "mean"),
+        avg_delay_days=("delay_days", "mean"),
+        lead_time_mean=("lead_time_days", "mean"),
+        lead_time_p50=("lead_time_days", "median"),
+    )
+    metrics["lead_time_p90"] = grouped["lead_time_days"].quantile(0.9)
+    metrics[["on_time_pct", "late_pct"]] *= 100
+    return metrics.reset_index()
+
+
+# Spend against budget per supplier, when costs are booked per supplier
+def _supplier_costs(costs):
+    if costs.empty or "supplier" not in costs.columns:
+        return None
+    totals = costs.groupby("supplier", observed=True)[["amount", "budget"]].sum()
+    totals = totals[totals["budget"] > 0]
+    return pd.DataFrame({
+        "spend_vs_budget_pct": (totals["amount"] / totals["budget"] - 1) * 100,
+        # 5 at or under budget, scaled down by budget / spend above it
+        "cost_score": 5 * np.clip(totals["budget"] / totals["amount"], 0, 1),
+    }, index=totals.index.astype(str))
+
+
+def _add_scores(card):
+    card["on_time_score"] = card["on_time_pct"] / 100 * 5
+    card["lead_time_score"] = np.clip(5 - card["lead_time_mean"] / MAX_LEAD_TIME_DAYS * 5, 0, 5)
+    score_columns = [column for column in SCORE_COLUMNS.values() if column in card.columns]
+    card["overall_score"] = card[score_columns].mean(axis=1)
+    return card.sort_values("overall_score", ascending=False, ignore_index=True)
+
+
+# Scorecard from the static figures in suppliers.csv
+def _static_scorecard(suppliers):
+    card = pd.DataFrame({
+        "supplier": suppliers["supplier_name"].astype(str),
+        "on_time_pct": suppliers["on_time_delivery"] * 100,
+        "lead_time_mean": suppliers["avg_lead_time"].astype(float),
+        "reliability_score": suppliers["reliability_score"],
+        "quality_score": suppliers["quality_score"],
+    })
+    return _add_scores(card)
+
+
+# {"suppliers": scorecard per supplier, "source": "history" or "suppliers.csv"}
+def compute_scorecard(orders, shipments, inventory, costs, suppliers):
+    frame = _supplier_shipments(orders, shipments, inventory)
+    if frame is None or frame.empty:
+        card = _static_scorecard(suppliers) if not suppliers.empty else pd.DataFrame()
+        return {"suppliers": card, "source": "suppliers.csv"}
+
+    card = _aggregate(frame, "supplier")
+    card["supplier"] = card["supplier"].astype(str)
+    card["reliability_score"] = (1 - card["late_pct"] / 100) * 5
+    if not suppliers.empty:
+        suppliers = suppliers.drop_duplicates("supplier_name")
+        quality = suppliers["quality_score"].set_axis(suppliers["supplier_name"].astype(str))
+        card["quality_score"] = card["supplier"].map(quality).astype(float)
+    costs = _supplier_costs(costs)
+    if costs is not None:
+        card = card.join(costs, on="supplier")
+    return {"suppliers": _add_scores(card), "source": "history"}
+
+
+def _read(key):
+    return read_dataset(key) if dataset_fingerprint(key) is not None else pd.DataFrame()
+
+
+# Version of the item -> supplier mapping, memoised per catalogue version of the inventory store
+# (suppliers only change when items are added or inventory.csv is imported, never on stock updates)
+def _supplier_mapping_version():
+    global _mapping_versions
+    if dataset_fingerprint("inventory") is None:
+        return None
+    catalogue = (os.path.abspath(INVENTORY_DB), inventory_store.catalogue_version())
+    version = _mapping_versions.get(catalogue)
+    if version is None:
+        inventory = read_dataset("inventory")
+        mapping = inventory[["item_id"]].assign(supplier=inventory["supplier"].astype(str))
+        version = int(pd.util.hash_pandas_object(mapping, index=False).sum())
+        _mapping_versions = {catalogue: version}
+    return version
+
+
+# Scorecard for the current data, cached on disk per version of every dataset it reads. Of the
+# inventory only the item -> supplier mapping is used, so stock updates keep the cached scorecard.
+def supplier_scorecard():
+    version = tuple(_supplier_mapping_version() if key == "inventory" else dataset_fingerprint(key)
+                    for key in SCORECARD_DATASETS)
+    return disk_cache.cached("scorecards", disk_cache.cache_key(*version),
+                             lambda: compute_scorecard(*(_read(key) for key in SCORECARD_DATASETS)))
+
+
+
+# Supplier history store
+
+def _seconds(timestamps):
+    return ((timestamps - pd.Timestamp(0)) / pd.Timedelta(seconds=1)).to_numpy(dtype=float)
+
+
+# Stored rows per order: order count, units ordered and the timestamps the shipment rows need
+def _order_rows(orders, item_suppliers):
+    if orders.empty:
+        return pd.DataFrame({column: pd.Series(dtype=object if column in ("order_id", "supplier") else float)
+                             for column in supplier_metrics_store.row_columns("orders")}).astype({"day": "datetime64[us]"})
+    if "item_id" in orders.columns and item_suppliers is not None:
+        supplier = item_suppliers.reindex(orders["item_id"].to_numpy()).astype(object).to_numpy()
+    else:
+        supplier = np.full(len(orders), None, dtype=object)
+    quantity = orders["quantity"] if "quantity" in orders.columns else pd.Series(0, index=orders.index)
+    return pd.DataFrame({
+        "order_id": orders["order_id"].astype(str).to_numpy(dtype=object),
+        "supplier": pd.Series(supplier, dtype=object).where(pd.notna(supplier), None).to_numpy(),
+        "day": orders["order_date"].dt.normalize().to_numpy(),
+        "orders": 1,
+        "quantity": quantity.fillna(0).to_numpy(dtype="int64"),
+        "ordered_at": _seconds(orders["order_date"]),
+        "requested_delivery": _seconds(orders["requested_delivery"]),
+    })
+
+
+# Stored rows per shipment: delivery measures against its order's stored row (no supplier without one)
+def _shipment_rows(shipments, order_rows):
+    if shipments.empty:
+        return pd.DataFrame({column: pd.Series(dtype=object if column in ("shipment_id", "supplier") else float)
+                             for column in supplier_metrics_store.row_columns("shipments")}).astype({"day": "datetime64[us]"})
+    order_rows = order_rows.drop_duplicates("order_id", keep="last")
+    # position of each shipment's order row; -1 (no order row) picks the missing value appended last
+    order_pos = pd.Index(order_rows["order_id"]).get_indexer(shipments["order_id"].astype(str))
+
+    def order_value(column, missing):
+        return np.append(order_rows[column].to_numpy(dtype=object), missing)[order_pos]
+
+    arrival = _seconds(shipments["estimated_arrival"])
+    late_by = (arrival - order_value("requested_delivery", np.nan).astype(float)) / 86400
+    lead_time = (arrival - order_value("ordered_at", np.nan).astype(float)) / 86400
+    return pd.DataFrame({
+        "shipment_id": shipments["shipment_id"].astype(str).to_numpy(dtype=object),
+        "supplier": order_value("supplier", None),
+        "day": shipments["ship_date"].dt.normalize().to_numpy(),
+        "shipments": 1,
+        "on_time": (shipments["status"] != "Delayed").to_numpy(dtype="int64"),
+        "late": (late_by > 0).astype("int64"),
+        "delay_days": np.where(late_by > 0, late_by, 0),
+        "lead_time_days": np.nan_to_num(lead_time),
+        "lead_time_n": (~np.isnan(lead_time)).astype("int64"),
+    })
+
+
+def _rollup_deltas(source, rows, old_rows):
+    columns = supplier_metrics_store.ROLLUP_TABLES[source]
+    removed = supplier_metrics_store.rollup(old_rows, source)
+    removed[columns] = -removed[columns]
+    deltas = pd.concat([supplier_metrics_store.rollup(rows, source), removed], ignore_index=True)
+    return deltas.groupby(["grain", "supplier", "period_start"], as_index=False)[columns].sum()
+
+
+# Bring one source's stored rows and totals up to date. Only the dataset rows dated from
+# SUPPLIER_METRICS_REOPEN_DAYS before the watermark on are turned into rows and diffed against
+# the stored ones; older rows are taken as final. Everything is rebuilt when the item -> supplier
+# mapping changed or the number of rows before that window no longer matches the store.
+# A repeated order or shipment id counts as its latest row. Returns whether the source was rebuilt.
+def _sync_source(source, mapping, item_suppliers, rebuild=False):
+    key = supplier_metrics_store.ROW_TABLES[source]["key"]
+    data = _read(source)
+    if not data.empty:
+        data = data.drop_duplicates(key, keep="last")
+    dates = data[DATA_SORT_KEYS[source]] if not data.empty else pd.Series(dtype="datetime64[us]")
+    state = supplier_metrics_store.source_state(source)
+    since = None
+    if not rebuild and state is not None and state["mapping"] == str(mapping) and state["watermark"] is not None:
+        since = state["watermark"] - pd.Timedelta(days=SUPPLIER_METRICS_REOPEN_DAYS)
+        if supplier_metrics_store.count_rows_before(source, since) != int((dates < since).sum()):
+            since = None
+    window = data if since is None else data[~(dates < since).to_numpy()]
+
+    if source == "orders":
+        rows = _order_rows(window, item_suppliers)
+    else:
+        keys = None if since is None else window["order_id"].astype(str).unique().tolist()
+        rows = _shipment_rows(window, supplier_metrics_store.read_rows("orders", keys=keys))
+
+    watermark = rows["day"].max() if not rows.empty else None
+    if since is None:
+        supplier_metrics_store.apply_update(source, rows, [], supplier_metrics_store.rollup(rows, source),
+                                            None if pd.isna(watermark) else watermark, mapping, reset=True)
+        return True
+
+    old_rows = supplier_metrics_store.read_rows(source, since=since)
+    diff = diff_rows(rows, old_rows, key)
+    if diff is None:
+        return _sync_source(source, mapping, item_suppliers, rebuild=True)
+    added, removed = diff
+    if not added.any() and not removed.any():
+        return False
+    removed_keys = set(old_rows[key][removed]) - set(rows[key][added])
+    watermark = state["watermark"] if pd.isna(watermark) else max(watermark, state["watermark"])
+    supplier_metrics_store.apply_update(source, rows[added], removed_keys,
+                                        _rollup_deltas(source, rows[added], old_rows[removed]), watermark, mapping)
+    return False
+
+
+# Bring the supplier history store up to date with the current orders and shipments (orders
+# first: shipment rows take their supplier and timestamps from the stored order rows, so
+# rebuilt orders rebuild the shipments too)
+def update_supplier_metrics():
+    with _rollup_lock:
+        mapping = _supplier_mapping_version()
+        item_suppliers = None
+        rebuilt = False
+        for source in ["orders", "shipments"]:
+            version = (dataset_fingerprint("orders"), dataset_fingerprint(source), mapping)
+            if _synced_versions.get(source) == version and not rebuilt:
+                continue
+            if item_suppliers is None and mapping is not None:
+                inventory = read_dataset("inventory")
+                if "supplier" in inventory.columns:
+                    item_suppliers = _item_suppliers(inventory)
+            rebuilt = _sync_source(source, mapping, item_suppliers, rebuild=rebuilt)
+            _synced_versions[source] = version
+
+        _observe_quality()
+
+
+# Quality scores from suppliers.csv, recorded once a day and whenever the file changes
+def _observe_quality():
+    global _quality_observed
+    fingerprint = dataset_fingerprint("suppliers")
+    today = pd.Timestamp.now().normalize()
+    if _quality_observed is None:
+        _quality_observed = disk_cache.get("supplier_metrics", "quality")
+    if fingerprint is None or _quality_observed == {"fingerprint": fingerprint, "day": today}:
+        return
+    suppliers = read_dataset("suppliers")
+    if {"supplier_name", "quality_score"} <= set(suppliers.columns):
+        supplier_metrics_store.observe_quality(suppliers.set_index("supplier_name")["quality_score"], today)
+    _quality_observed = {"fingerprint": fingerprint, "day": today}
+    disk_cache.put("supplier_metrics", "quality", _quality_observed)
+
+
+# One supplier's performance history at a grain (week, month or quarter), from the precomputed rollups
+def supplier_history(supplier, grain="month"):
+    update_supplier_metrics()
+    return supplier_metrics_store.read_history(supplier, grain)
@@ -4,20 +4,56 @@ from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+from data import alert_store
+from models.alert_scheduler import request_alert_evaluation
 
+# Datasets this page reads (loaded on demand by main) - alerts are evaluated in the
+# background by models/alert_scheduler.py and read from the alert store
+REQUIRED_DATA = []
 
+# Alert threshold -> settings widget key
+THRESHOLD_WIDGETS = {
+    "low_stock_pct": "alert_low_stock_pct",
+    "delay_days": "alert_delay_days",
+    "overspend_pct": "alert_overspend_pct",
+    "supplier_on_time_pct": "alert_supplier_on_time_pct",
+}
 
-def render_alerts_notifications():
+ALERT_DISPLAY_LIMIT = 50
+
+# Time Range options -> how far back alerts were raised
+TIME_RANGES = {
+    "All Time": None,
+    "Last 24 Hours": pd.Timedelta(days=1),
+    "Last 7 Days": pd.Timedelta(days=7),
+    "Last 30 Days": pd.Timedelta(days=30),
+}
+
+
+def time_ago(timestamp, now):
+    seconds = (now - timestamp).total_seconds()
+    if seconds < 60:
+        return "Just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} minutes ago"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} hours ago"
+    if seconds < 2 * 86400:
+        return "Yesterday"
+    return f"{int(seconds // 86400)} days ago"
+
+
+def render_alerts_notifications(data):
     st.title("🚨 Alerts & Notifications")
     
-    # Generate sample alerts
-    alerts = [
-        {"severity": "Critical", "message": "Item 'Raw Material A' has reached critical stock level (5 units)", "time": "2 hours ago"},
-        {"severity": "High", "message": "Shipment SHP-0015 is delayed by carrier", "time": "5 hours ago"},
-        {"severity": "Medium", "message": "New order received from Customer B worth $8,500", "time": "Yesterday"},
-        {"severity": "Low", "message": "Supplier D performance dropped below threshold", "time": "2 days ago"},
-        {"severity": "Critical", "message": "Component G stock level is zero - production impact likely", "time": "2 days ago"}
-    ]
+    # Latest background evaluation
+    run = alert_store.latest_run()
+    now = pd.Timestamp.now()
+    if run is None:
+        st.info("Alerts are being evaluated in the background - the first results will appear shortly.")
+    else:
+        st.caption(f"Last evaluated {time_ago(run['evaluated_at'], now).lower()} "
+                   f"({run['alert_count']:,} active alerts in {run['seconds']:.1f}s)")
     
     # Alert filters
     st.subheader("Alert Filters")
@@ -28,27 +64,41 @@ def render_alerts_notifications():
                                        default=["Critical", "High"])
     with col2:
         date_filter = st.selectbox("Time Range", 
-                                 options=["All Time", "Last 24 Hours", "Last 7 Days", "Last 30 Days"],
+                                 options=list(TIME_RANGES),
                                  index=0)
+    include_resolved = st.checkbox("Include resolved alerts", value=False)
     
-    # Filter alerts (in a real app, this would filter from database)
-    filtered_alerts = [alert for alert in alerts if alert["severity"] in severity_filter]
+    # Filter alerts - severity and time range queries run against the alert store's index
+    since = now - TIME_RANGES[date_filter] if TIME_RANGES[date_filter] is not None else None
+    filtered_alerts = alert_store.read_alerts(severity_filter, since=since, limit=ALERT_DISPLAY_LIMIT,
+                                              include_resolved=include_resolved)
     
     # Display alerts
-    st.subheader("Current Alerts")
+    st.subheader("Alert History" if include_resolved else "Current Alerts")
+    counts = alert_store.alert_counts(since=since, include_resolved=include_resolved)
+    for col, severity in zip(st.columns(4), ["Critical", "High", "Medium", "Low"]):
+        col.metric(severity, counts[severity])
     
-    if not filtered_alerts:
+    if filtered_alerts.empty:
         st.success("No alerts matching the selected criteria.")
     else:
-        for alert in filtered_alerts:
-            if alert["severity"] == "Critical":
-                st.error(f"**{alert['severity']}**: {alert['message']} - {alert['time']}")
-            elif alert["severity"] == "High":
-                st.warning(f"**{alert['severity']}**: {alert['message']} - {alert['time']}")
-            elif alert["severity"] == "Medium":
-                st.info(f"**{alert['severity']}**: {alert['message']} - {alert['time']}")
+        matching = sum(counts[severity] for severity in severity_filter)
+        if matching > ALERT_DISPLAY_LIMIT:
+            st.caption(f"Showing the {ALERT_DISPLAY_LIMIT} most urgent of {matching:,} alerts")
+        for alert in filtered_alerts.itertuples():
+            text = f"**{alert.severity}**: {alert.message} - {time_ago(alert.raised_at, now)}"
+            if alert.occurrences > 1:
+                text += f" (raised {alert.occurrences} times)"
+            if pd.notna(alert.resolved_at):
+                text += f" - resolved {time_ago(alert.resolved_at, now).lower()}"
+            if alert.severity == "Critical":
+                st.error(text)
+            elif alert.severity == "High":
+                st.warning(text)
+            elif alert.severity == "Medium":
+                st.info(text)
             else:
-                st.success(f"**{alert['severity']}**: {alert['message']} - {alert['time']}")
+                st.success(text)
     
     # Alert settings
     with st.expander("Alert Settings"):
@@ -59,10 +109,19 @@ def render_alerts_notifications():
         st.checkbox("In-app notifications", value=True)
         
         st.subheader("Alert Thresholds")
-        st.slider("Low stock threshold (%)", 0, 100, 20, 
+        saved = alert_store.load_thresholds()
+        st.slider("Low stock threshold (%)", 0, 100, saved["low_stock_pct"], key="alert_low_stock_pct",
                 help="Alert when stock falls below this percentage of reorder level")
-        st.slider("Delivery delay threshold (days)", 0, 10, 1, 
+        st.slider("Delivery delay threshold (days)", 0, 10, saved["delay_days"], key="alert_delay_days",
                 help="Alert when delivery is delayed by this many days")
+        st.slider("Budget overspend threshold (%)", 0, 50, saved["overspend_pct"], key="alert_overspend_pct",
+                help="Alert when a cost category exceeds its budget by more than this percentage")
+        st.slider("Supplier on-time threshold (%)", 0, 100, saved["supplier_on_time_pct"],
+                key="alert_supplier_on_time_pct",
+                help="Alert when a supplier's on-time delivery falls below this percentage")
         
         if st.button("Save Settings"):
+            # The scheduler reads the saved thresholds; re-evaluate now rather than at the next interval
+            alert_store.save_thresholds({key: st.session_state[widget] for key, widget in THRESHOLD_WIDGETS.items()})
+            request_alert_evaluation()
             st.success("✅ Alert settings saved successfully!")
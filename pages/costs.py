@@ -2,73 +2,113 @@ import streamlit as st
 import plotly.express as px
 from datetime import datetime, timedelta
 import pandas as pd
-import numpy as np
+from components.time_series import time_series_chart
+from config.settings import COST_BREAKDOWN_MAX
+from data import cost_cube
 
+# Datasets this page reads (loaded on demand by main) - cost totals come from the
+# cost cube in data/cost_cube.py
+REQUIRED_DATA = []
+
+# Breakdown dimension -> plural label
+DIMENSION_LABELS = {"category": "Categories", "supplier": "Suppliers", "site": "Sites"}
 
 
 def render_cost_analysis(data):
-    costs = data["costs"]
+    cube = cost_cube.load_cost_cube()
     
     st.title("💰 Supply Chain Cost Analysis")
     
-    if not costs.empty:
+    if cube is not None:
+        # Period selector - a run of periods, compared with the same number of periods before it
+        labels = cost_cube.period_labels(cube)
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            if len(labels) > 1:
+                first, last = st.select_slider("Periods", options=labels, value=(labels[-1], labels[-1]))
+            else:
+                first = last = labels[0]
+                st.caption(f"Period: {first}")
+        with col2:
+            by = st.selectbox("Break down by", cube["dimensions"], format_func=str.title)
+        periods = labels[labels.index(first):labels.index(last) + 1]
+        previous = cost_cube.previous_periods(cube, periods)
+        
         # Main cost metrics
-        total_cost = costs["amount"].sum()
-        total_budget = costs["budget"].sum()
-        variance = total_budget - total_cost
-        variance_pct = (variance / total_budget) * 100
+        totals = cost_cube.slice_costs(cube, periods, by=None).iloc[0]
+        previous_totals = cost_cube.slice_costs(cube, previous, by=None).iloc[0] if previous else None
+        cost_delta = None
+        if previous_totals is not None and previous_totals["amount"]:
+            cost_delta = f"{(totals['amount'] / previous_totals['amount'] - 1) * 100:+.1f}% vs previous {len(previous)} period(s)"
         
         col1, col2, col3 = st.columns(3)
-        col1.metric("Total Cost", f"${total_cost:,.2f}")
-        col2.metric("Total Budget", f"${total_budget:,.2f}")
-        col3.metric("Variance", f"${variance:,.2f}", delta=f"{variance_pct:.1f}%")
+        col1.metric("Total Cost", f"${totals['amount']:,.2f}", delta=cost_delta, delta_color="inverse")
+        col2.metric("Total Budget", f"${totals['budget']:,.2f}")
+        col3.metric("Variance", f"${totals['variance']:,.2f}", delta=f"{totals['variance_pct']:.1f}%")
         
         # Cost breakdown
         st.subheader("Cost Breakdown")
+        costs_analysis = cost_cube.slice_costs(cube, periods, by=by)
+        if previous:
+            previous_amount = cost_cube.slice_costs(cube, previous, by=by).set_index(by)["amount"]
+            costs_analysis["change_pct"] = (costs_analysis["amount"] / costs_analysis[by].map(previous_amount) - 1) * 100
+        else:
+            costs_analysis["change_pct"] = float("nan")
         
-        fig = px.bar(costs, x="category", y=["amount", "budget"],
+        top = costs_analysis.nlargest(COST_BREAKDOWN_MAX, "amount")
+        fig = px.bar(top, x=by, y=["amount", "budget"],
                    barmode="group",
-                   labels={"value": "Amount ($)", "variable": "Type"},
-                   title="Cost vs Budget by Category")
+                   labels={"value": "Amount ($)", "variable": "Type", by: by.title()},
+                   title=f"Cost vs Budget by {by.title()}")
         st.plotly_chart(fig)
-        
-        # Add variance calculation
-        costs_analysis = costs.copy()
-        costs_analysis["variance"] = costs_analysis["budget"] - costs_analysis["amount"]
-        costs_analysis["variance_pct"] = (costs_analysis["variance"] / costs_analysis["budget"]) * 100
+        if len(top) < len(costs_analysis):
+            st.caption(f"Largest {len(top)} of {len(costs_analysis):,} by cost")
         
         # Variance analysis
         st.subheader("Variance Analysis")
         
-        fig = px.bar(costs_analysis.sort_values("variance"), x="category", y="variance",
-                   labels={"variance": "Budget Variance ($)", "category": "Category"},
+        fig = px.bar(costs_analysis.nsmallest(COST_BREAKDOWN_MAX, "variance"), x=by, y="variance",
+                   labels={"variance": "Budget Variance ($)", by: by.title()},
                    color="variance",
                    color_continuous_scale=px.colors.diverging.RdYlGn,
-                   title="Budget Variance by Category")
+                   title=f"Budget Variance by {by.title()}")
         st.plotly_chart(fig)
         
+        # Cost trend - every period, from the cube's precomputed per-category totals
+        trend = cube["trend"]
+        if trend is not None and trend["period"].nunique() > 1:
+            st.subheader("Cost Trend")
+            time_series_chart("cost_trend", trend.dropna(subset=["period_start"]), x="period_start", y="amount",
+                              color="category", markers=True,
+                              labels={"period_start": "Period", "amount": "Cost ($)", "category": "Category"})
+        
         # Cost table with variance
         st.subheader("Detailed Cost Analysis")
-        display_cols = ["category", "amount", "budget", "variance", "variance_pct"]
+        display_cols = [by, "amount", "budget", "variance", "variance_pct", "change_pct"]
         st.dataframe(costs_analysis[display_cols].style.format({
             "amount": "${:,.2f}",
             "budget": "${:,.2f}",
             "variance": "${:,.2f}",
-            "variance_pct": "{:.1f}%"
-        }))
+            "variance_pct": "{:.1f}%",
+            "change_pct": "{:+.1f}%",
+        }, na_rep="-"), hide_index=True)
         
         # Cost optimization opportunities
         st.subheader("Cost Optimization Opportunities")
         
-        # Identify categories with significant overspending
+        # Identify significant overspending
         overspend = costs_analysis[costs_analysis["variance"] < 0].sort_values("variance")
         
         if not overspend.empty:
-            st.warning("Categories exceeding budget:")
-            for _, row in overspend.iterrows():
-                st.write(f"⚠️ **{row['category']}**: ${-row['variance']:,.2f} over budget ({-row['variance_pct']:.1f}% variance)")
+            st.warning(f"{DIMENSION_LABELS[by]} exceeding budget:")
+            shown = overspend.head(COST_BREAKDOWN_MAX)
+            st.markdown("\n".join(
+                "- ⚠️ **" + shown[by].astype(str) + "**: \\$" + (-shown["variance"]).map("{:,.2f}".format)
+                + " over budget (" + (-shown["variance_pct"]).map("{:.1f}".format) + "% variance)"))
+            if len(shown) < len(overspend):
+                st.caption(f"... and {len(overspend) - len(shown):,} more")
         else:
-            st.success("All categories are within budget!")
+            st.success(f"All {DIMENSION_LABELS[by].lower()} are within budget!")
         
         # Cost-saving recommendations
         st.subheader("Cost Optimization Recommendations")
@@ -3,45 +3,72 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import pandas as pd
 
+from data import kpi_cube
+from models import replenishment
+
+# Datasets this page reads (loaded on demand by main) - order, shipment and cost KPIs
+# come from the daily KPI cube in data/kpi_cube.py
+REQUIRED_DATA = ["inventory"]
+
+
+# "+12 vs previous period" style delta, or None without a previous value
+def period_delta(current, previous, fmt="{:+,.0f}", suffix=" vs previous period"):
+    if previous is None or pd.isna(previous):
+        return None
+    return fmt.format(current - previous) + suffix
+
+
 # Dashboard pages
 
 def render_dashboard_overview(data):
     inventory = data["inventory"]
-    orders = data["orders"]
-    shipments = data["shipments"]
-    costs = data["costs"]
+    cube = kpi_cube.load_kpi_cube()
+    plan = replenishment.plan_replenishment(inventory) if not inventory.empty else pd.DataFrame()
     
     # KPI section
     st.title("📊 Centralized Supply Chain Monitoring Dashboard")
     
-    # Date Filters
+    # Date Filters - default to the last 30 days with data
+    activity = kpi_cube.activity_range(cube)
+    last_day = activity[1] if activity is not None else pd.Timestamp(datetime.now().date())
     col1, col2 = st.columns(2)
     with col1:
-        start_date = st.date_input("From Date", datetime.now() - pd.Timedelta(days=30))
+        start_date = st.date_input("From Date", last_day - pd.Timedelta(days=29))
     with col2:
-        end_date = st.date_input("To Date", datetime.now())
+        end_date = st.date_input("To Date", last_day)
+    
+    # Window totals and the same-length window before it, summed from the cube's daily rows
+    current = kpi_cube.window_totals(cube, start_date, end_date)
+    previous_start, previous_end = kpi_cube.previous_window(start_date, end_date)
+    previous = kpi_cube.window_totals(cube, previous_start, previous_end)
     
     # KPI Summary Cards with deltas (showing change from previous period)
     kpi1, kpi2, kpi3, kpi4 = st.columns(4)
     
-    low_stock_count = len(inventory[inventory["stock_level"] < inventory["reorder_threshold"]])
-    kpi1.metric("🔻 Low Stock Items", low_stock_count, delta="-2 from last week")
+    low_stock_count = kpi_cube.level_at(cube, "low_stock", end_date)
+    if low_stock_count is None and not plan.empty:
+        low_stock_count = int(plan["low_stock"].sum())
+    if low_stock_count is not None:
+        kpi1.metric("🔻 Low Stock Items", int(low_stock_count), delta_color="inverse",
+                    delta=period_delta(low_stock_count, kpi_cube.level_at(cube, "low_stock", previous_end)))
     
-    if not orders.empty:
-        total_orders = len(orders)
-        new_orders = len(orders[orders["status"] == "New"])
-        kpi2.metric("🛒 Total Orders", total_orders, delta=f"+{new_orders} new")
+    if "orders" in current:
+        kpi2.metric("🛒 Total Orders", f"{current['orders']:,.0f}",
+                    delta=period_delta(current["orders"], previous["orders"] if previous["orders"] else None))
     
-    if not shipments.empty:
-        on_time = len(shipments[shipments["status"] != "Delayed"])
-        on_time_pct = round((on_time / len(shipments)) * 100)
-        kpi3.metric("📦 On-Time Delivery", f"{on_time_pct}%", delta=f"{on_time_pct - 95}% from target")
+    if "shipments" in current and current["shipments"] > 0:
+        on_time_pct = (1 - current["shipments:Delayed"] / current["shipments"]) * 100
+        previous_pct = (1 - previous["shipments:Delayed"] / previous["shipments"]) * 100 if previous["shipments"] else None
+        kpi3.metric("📦 On-Time Delivery", f"{on_time_pct:.1f}%",
+                    delta=period_delta(on_time_pct, previous_pct, fmt="{:+.1f}", suffix=" pts vs previous period"))
     
-    if not costs.empty:
-        total_cost = costs["amount"].sum()
-        total_budget = costs["budget"].sum()
-        cost_variance = round(((total_budget - total_cost) / total_budget) * 100, 1)
-        kpi4.metric("💰 Budget Variance", f"${total_cost:,.2f}", delta=f"{cost_variance}% under budget")
+    if "cost" in current and current["budget"] > 0:
+        cost_variance = (current["budget"] - current["cost"]) / current["budget"] * 100
+        kpi4.metric("💰 Budget Variance", f"${current['cost']:,.2f}",
+                    delta=f"{abs(cost_variance):.1f}% {'under' if cost_variance >= 0 else 'over'} budget",
+                    delta_color="normal" if cost_variance >= 0 else "inverse",
+                    help=period_delta(current["cost"], previous["cost"] if previous["cost"] else None,
+                                      fmt="${:+,.2f}", suffix=" spend vs previous period"))
     
 
     # Main overview charts
@@ -49,33 +76,41 @@ def render_dashboard_overview(data):
     
     with col1:
         st.subheader("Order Status Distribution")
-        if not orders.empty:
-            order_status = orders["status"].value_counts().reset_index()
-            order_status.columns = ["Status", "Count"]
+        order_status = current.filter(like="orders:")
+        order_status = order_status[order_status > 0]
+        if not order_status.empty:
+            order_status = pd.DataFrame({"Status": order_status.index.str.removeprefix("orders:"), "Count": order_status.values})
             fig = px.pie(order_status, values="Count", names="Status", hole=0.4,
                        color_discrete_sequence=px.colors.qualitative.Pastel)
             st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No orders in the selected period.")
     
     with col2:
         st.subheader("Supply Chain Cost Breakdown")
-        if not costs.empty:
+        cost_breakdown = current.filter(like="cost:")
+        cost_breakdown = cost_breakdown[cost_breakdown > 0]
+        if not cost_breakdown.empty:
+            costs = pd.DataFrame({"category": cost_breakdown.index.str.removeprefix("cost:"), "amount": cost_breakdown.values})
             fig = px.bar(costs, x="category", y="amount", text_auto='.2s',
                        color="amount", labels={"amount": "Cost ($)"})
             fig.update_layout(xaxis_title="Category", yaxis_title="Amount ($)")
             st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No costs booked in the selected period.")
     
 
-    # Inventory status
+    # Inventory status - against the planned reorder points (models/replenishment.py)
     st.subheader("Inventory Health")
-    if not inventory.empty:
+    if not plan.empty:
         # calculate health metrics
-        inventory["status"] = pd.cut(
-            inventory["stock_level"] / inventory["reorder_threshold"],
-            bins=[0, 0.8, 1.5, float('inf')],
+        status = pd.cut(
+            plan["stock_level"] / plan["reorder_point"],
+            bins=[0, 0.8, 1.5, float('inf')], include_lowest=True,
             labels=["Critical", "Warning", "Healthy"]
         )
         
-        status_counts = inventory["status"].value_counts().reset_index()
+        status_counts = status.value_counts().reset_index()
         status_counts.columns = ["Status", "Count"]
         
         fig = px.bar(status_counts, x="Status", y="Count", color="Status",
@@ -83,7 +118,8 @@ def render_dashboard_overview(data):
         st.plotly_chart(fig, use_container_width=True)
         
         # Show critical items
-        critical_items = inventory[inventory["status"] == "Critical"]
+        critical_items = plan[status == "Critical"]
         if not critical_items.empty:
             st.error("🚨 Critical Stock Levels - Immediate Action Required")
-            st.dataframe(critical_items[["item_name", "stock_level", "reorder_threshold"]])
\ No newline at end of file
+            st.dataframe(critical_items[["item_name", "stock_level", "safety_stock", "reorder_point", "order_quantity"]],
+                         hide_index=True)
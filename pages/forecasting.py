@@ -4,21 +4,66 @@ from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from models.forecasting import forecast_demand  # importing the model function
+from models.forecasting import AUTO_MODEL, cached_forecast, series_frames, series_by_volume  # importing the model functions
+from models.forecast_models import FORECAST_MODELS
+from data.data_loader import dataset_fingerprint
+from components.time_series import time_series_chart
 
+# Datasets this page reads (loaded on demand by main)
+REQUIRED_DATA = ["orders"]
 
 
-def render_demand_forecasting():
+# Forecast levels offered on the page -> order column identifying a series
+FORECAST_LEVELS = {
+    "All orders": None,
+    "Item": "item_id",
+    "Customer": "customer",
+}
+
+# Forecast levels whose demand is measured in units: level -> order column summed per day
+# (levels not listed, or orders without the column, count orders)
+FORECAST_UNITS = {
+    "Item": "quantity",
+}
+
+
+def render_demand_forecasting(data):
+    orders = data["orders"]
 
     st.title("📈 Demand Forecasting")
     
-    # Get forecast data
-    forecast_result = forecast_demand()
+    # Forecast level and series selection
+    levels = [level for level, column in FORECAST_LEVELS.items() if column is None or column in orders.columns]
+    col1, col2 = st.columns(2)
+    with col1:
+        level = st.selectbox("Forecast by", options=levels)
+    with col2:
+        model = st.selectbox("Model", options=[AUTO_MODEL] + list(FORECAST_MODELS),
+                             format_func=lambda name: "Auto (best per series)" if name == AUTO_MODEL else name)
+    
+    value = FORECAST_UNITS.get(level)
+    if value not in orders.columns:
+        value = None
+    unit = "Units" if value else "Orders"
+
+    # Get forecast data - every series at this level is forecast in one pass and
+    # cached on disk until the orders data or the parameters change
+    forecast_result = None
+    if not orders.empty:
+        with st.spinner("Fitting forecast models..."):
+            forecast_result = cached_forecast(orders, dataset_fingerprint("orders"), by=FORECAST_LEVELS[level],
+                                              model=model, value=value)
     
     if forecast_result:
-        historical_data, forecast_df = forecast_result
+        series_options = series_by_volume(forecast_result)
+        series_id = series_options[0] if len(series_options) == 1 else st.selectbox(f"Select {level.lower()}", options=series_options)
+        historical_data, forecast_df = series_frames(forecast_result, series_id)
+        series_model = forecast_result["model"][forecast_result["series"].get_loc(series_id)]
+        if model == AUTO_MODEL:
+            st.caption(f"Best model for this series (holdout MAE): {series_model}")
         
-        st.subheader("Order Volume Forecast")
+        title = "Demand Forecast (Units)" if value else "Order Volume Forecast"
+        st.subheader(title if len(series_options) == 1 else f"{title} - {level} {series_id}")
         
         # Combine historical and forecast data for visualization
         historical_data["type"] = "Historical"
@@ -27,30 +72,43 @@ def render_demand_forecasting():
         
         combined_data = pd.concat([historical_data, forecast_df])
         
-        fig = px.line(combined_data, x="date", y="order_count", color="type",
-                    title="Order Volume - Historical & Forecast",
-                    labels={"order_count": "Number of Orders", "date": "Date"})
-        st.plotly_chart(fig)
+        time_series_chart("forecast_chart", combined_data, x="date", y="order_count", color="type",
+                          title=f"{'Units Ordered' if value else 'Order Volume'} - Historical & Forecast",
+                          labels={"order_count": "Units Ordered" if value else "Number of Orders", "date": "Date"})
         
         # Forecast details
         st.subheader("Forecast Details")
-        st.dataframe(forecast_df[["date", "forecast"]].rename(columns={"forecast": "Forecasted Orders"}))
+        st.dataframe(forecast_df[["date", "forecast"]].rename(columns={"forecast": f"Forecasted {unit}"}))
         
-        # Forecast accuracy (dummy metrics for now)
+        # Forecast accuracy - rolling-origin backtest of this series' model
         st.subheader("Forecast Accuracy Metrics")
-        col1, col2, col3 = st.columns(3)
-        # col1.metric("MAPE", "15.3%")
-        # col2.metric("MAE", "2.4 orders")
-        # col3.metric("Forecast Bias", "+0.8")
+        cutoffs = forecast_result["backtest_cutoffs"]
+        if len(cutoffs) == 0:
+            st.info("Not enough history to backtest this forecast yet.")
+        else:
+            st.caption(f"Backtested over {len(cutoffs)} forecast origins from "
+                       f"{cutoffs[0].strftime('%Y-%m-%d')} to {cutoffs[-1].strftime('%Y-%m-%d')}")
+            col1, col2, col3, col4 = st.columns(4)
+
+            metrics = forecast_result["metrics"].loc[series_id]
+            format_metric = lambda value, fmt: "n/a" if pd.isna(value) else fmt.format(value)
 
-        from sklearn.metrics import mean_absolute_error
-        mae = mean_absolute_error(historical_data["order_count"], historical_data["forecast"])
-        mape = (np.abs((historical_data["order_count"] - historical_data["forecast"]) / historical_data["order_count"])).mean() * 100
-        bias = (historical_data["forecast"] - historical_data["order_count"]).mean()
+            col1.metric("MAPE", format_metric(metrics["mape"], "{:.1f}%"))
+            col2.metric("sMAPE", format_metric(metrics["smape"], "{:.1f}%"))
+            col3.metric("MAE", format_metric(metrics["mae"], "{:.2f} " + unit.lower()))
+            col4.metric("Forecast Bias", format_metric(metrics["bias"], "{:+.2f}"))
 
-        col1.metric("MAPE", mape)
-        col2.metric("MAE", mae)
-        col3.metric("Forecast Bias", bias)
+            # Error by days ahead for this series
+            row = forecast_result["series"].get_loc(series_id)
+            by_horizon = pd.DataFrame({
+                "Days Ahead": np.arange(1, forecast_result["backtest"]["mae"].shape[1] + 1),
+                "MAE": forecast_result["backtest"]["mae"][row],
+                "MAPE (%)": forecast_result["backtest"]["mape"][row],
+                "sMAPE (%)": forecast_result["backtest"]["smape"][row],
+                "Bias": forecast_result["backtest"]["bias"][row],
+            }).round(2)
+            with st.expander("Accuracy by forecast horizon"):
+                st.dataframe(by_horizon, hide_index=True)
 
         # Inventory recommendations based on forecast
         st.subheader("Inventory Recommendations")
@@ -2,11 +2,18 @@ import streamlit as st
 import plotly.express as px
 from datetime import datetime, timedelta
 import pandas as pd
-import numpy as np
+from data import inventory_store, search_index
+from components.paginated_table import paginated_table
+from models import inventory_valuation, replenishment
+from config.settings import VALUATION_METHOD, VALUATION_CHART_MAX
+
+# Datasets this page reads (loaded on demand by main)
+REQUIRED_DATA = ["inventory"]
 
 
 def render_inventory_management(data):
     inventory = data["inventory"]
+    plan = replenishment.plan_replenishment(inventory) if not inventory.empty else None
     
     st.title("📦 Inventory Management")
     
@@ -15,8 +22,14 @@ def render_inventory_management(data):
     search_item = st.text_input("Search by item name:")
 
     if search_item:
-        filtered_inventory = inventory[inventory["item_name"].str.contains(search_item, case=False)]
-        st.dataframe(filtered_inventory)
+        # matches come from the prebuilt item index (data/search_index.py), not a scan
+        item_ids, fuzzy = search_index.search_items(search_item)
+        if fuzzy and len(item_ids):
+            st.info(f"No item name contains '{search_item}' - showing the closest matches.")
+        paginated_table("inventory_search",
+                        lambda offset, limit: search_index.rows_for(inventory, item_ids[offset:offset + limit]),
+                        len(item_ids))
+        filtered_inventory = search_index.rows_for(inventory, item_ids)
 
         csv = filtered_inventory.to_csv(index=False).encode('utf-8')
         st.download_button("⬇️ Download Filtered Inventory", data=csv, file_name="filtered_inventory.csv")
@@ -32,10 +45,13 @@ def render_inventory_management(data):
                                 title="Stock Levels", labels={"stock_level": "Stock Level"})
             st.plotly_chart(fig_inventory)
 
-            low_stock = inventory[inventory["stock_level"] < inventory["reorder_threshold"]]
+            # below the reorder point planned from demand and lead times (models/replenishment.py)
+            low_stock = plan[plan["low_stock"]].sort_values("order_quantity", ascending=False)
             if not low_stock.empty:
-                st.warning("⚠️ Low stock items detected:")
-                st.dataframe(low_stock)
+                st.warning(f"⚠️ {len(low_stock):,} low stock items detected - suggested orders:")
+                low_stock = low_stock[["item_name", "supplier", "stock_level", "demand_per_day", "safety_stock",
+                                       "reorder_point", "order_quantity", "basis"]]
+                paginated_table("low_stock", lambda offset, limit: low_stock.iloc[offset:offset + limit], len(low_stock))
 
     
     # Manual Inventory Update
@@ -47,25 +63,12 @@ def render_inventory_management(data):
             submitted = st.form_submit_button("Update Inventory")
 
             if submitted:
-                existing = inventory[inventory["item_name"].str.lower() == item_name].index
-                if not existing.empty:
-                    inventory.loc[existing, "stock_level"] = stock_level
-                    inventory.loc[existing, "reorder_threshold"] = reorder_threshold
-                    st.success(f"✅ '{item_name}' updated!")
+                if item_name:
+                    result = inventory_store.upsert_item(item_name, stock_level, reorder_threshold)
+                    st.success(f"✅ '{item_name}' {result}!")
+                    st.rerun()
                 else:
-                    new_row = pd.DataFrame([{
-                        "item_name": item_name,
-                        "stock_level": stock_level,
-                        "reorder_threshold": reorder_threshold,
-                        "supplier": "New Supplier",
-                        "lead_time_days": 7,
-                        "last_updated": datetime.now()
-                    }])
-                    inventory = pd.concat([inventory, new_row], ignore_index=True)
-                    st.success(f"✅ '{item_name}' added!")
-
-                inventory.to_csv("inventory.csv", index=False)
-                st.rerun()
+                    st.warning("Please enter an item name.")
 
     
     # Reduce Stock Level
@@ -73,15 +76,15 @@ def render_inventory_management(data):
         if not inventory.empty:
             with st.form("reduce_stock_form"):
                 item_to_reduce = st.selectbox("Select Item", options=inventory["item_name"].unique())
-                max_qty = int(inventory[inventory["item_name"] == item_to_reduce]["stock_level"].values[0])
+                selected = search_index.rows_for(inventory, search_index.find_exact(item_to_reduce)[:1])
+                max_qty = int(selected["stock_level"].iloc[0]) if not selected.empty else 0
                 reduce_qty = st.number_input("Quantity to reduce", min_value=1, max_value=max_qty if max_qty > 0 else 1, step=1)
                 reduce_submitted = st.form_submit_button("Reduce")
 
-                if reduce_submitted:
-                    inventory.loc[inventory["item_name"] == item_to_reduce, "stock_level"] -= reduce_qty
-                    inventory["stock_level"] = inventory["stock_level"].clip(lower=0)
-                    inventory.to_csv("inventory.csv", index=False)
-                    st.success(f"✅ Reduced {reduce_qty} units from '{item_to_reduce}'")
+                if reduce_submitted and not selected.empty:
+                    item_id = selected["item_id"].iloc[0]
+                    removed = inventory_store.reduce_stock(item_id, reduce_qty)
+                    st.success(f"✅ Reduced {removed} units from '{item_to_reduce}'")
                     st.rerun()
         else:
             st.info("Inventory is empty.")
@@ -98,27 +101,38 @@ def render_inventory_management(data):
         col1, col2, col3 = st.columns(3)
         col1.metric("Total Items in Stock", total_inventory)
         col2.metric("Average Lead Time", f"{avg_lead_time:.1f} days")
-        col3.metric("Stock Health", f"{len(inventory[inventory['stock_level'] > inventory['reorder_threshold']]) / len(inventory) * 100:.1f}%")
+        col3.metric("Stock Health", f"{(plan['stock_level'] > plan['reorder_point']).mean() * 100:.1f}%")
         
         # Inventory by Supplier
         st.subheader("Inventory by Supplier")
-        supplier_inventory = inventory.groupby("supplier")["stock_level"].sum().reset_index()
+        supplier_inventory = inventory.groupby("supplier", observed=True)["stock_level"].sum().reset_index()
         fig = px.pie(supplier_inventory, values="stock_level", names="supplier", 
                    title="Stock Distribution by Supplier")
         st.plotly_chart(fig)
         
-        # Inventory Value Estimation
-        st.subheader("Estimated Inventory Value")
-        # Add dummy unit costs for demonstration
-        inventory_value = inventory.copy()
-        inventory_value["unit_cost"] = np.random.uniform(10, 100, len(inventory)).round(2)
-        inventory_value["total_value"] = inventory_value["stock_level"] * inventory_value["unit_cost"]
-        
-        fig = px.bar(inventory_value.sort_values("total_value", ascending=False), 
-                   x="item_name", y="total_value", 
-                   color="supplier",
-                   title="Estimated Value by Item")
+        # Inventory Value - unit costs from unit_costs.csv, valued per item by models/inventory_valuation.py
+        st.subheader("Inventory Value")
+        valuation = inventory_valuation.inventory_valuation()
+        methods = list(inventory_valuation.VALUATION_METHODS)
+        method = st.radio("Costing method", methods, index=methods.index(VALUATION_METHOD),
+                          format_func=inventory_valuation.VALUATION_METHODS.get, horizontal=True)
+        value_column = f"{method}_value"
+        items = valuation["items"]
+
+        top_items = items.nlargest(VALUATION_CHART_MAX, value_column).join(inventory.set_index("item_id")["item_name"])
+        fig = px.bar(top_items, x="item_name", y=value_column, color="supplier",
+                   labels={value_column: "Value ($)", "item_name": "Item"},
+                   title=f"Value by Item (top {len(top_items)})")
         st.plotly_chart(fig)
-        
-        total_value = inventory_value["total_value"].sum()
-        st.info(f"Total estimated inventory value: ${total_value:,.2f}")
\ No newline at end of file
+
+        top_suppliers = valuation["suppliers"].nlargest(VALUATION_CHART_MAX, value_column).reset_index()
+        fig = px.bar(top_suppliers, x="supplier", y=value_column,
+                   labels={value_column: "Value ($)", "supplier": "Supplier"},
+                   title=f"Value by Supplier (top {len(top_suppliers)})")
+        st.plotly_chart(fig)
+
+        total_value = valuation["suppliers"][value_column].sum()
+        st.info(f"Total inventory value ({inventory_valuation.VALUATION_METHODS[method]}): ${total_value:,.2f}")
+        unvalued = int(items[value_column].isna().sum())
+        if unvalued:
+            st.caption(f"{unvalued:,} items have no unit cost in unit_costs.csv and are not valued.")
@@ -3,13 +3,31 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
+from config.settings import TIMELINE_MAX_BARS
+from data import query_engine
+from components.paginated_table import paginated_table
+from components.time_series import time_series_chart
 
+# Datasets this page reads (loaded on demand by main).
+# Orders and shipments are queried through data.query_engine, so nothing needs to be
+# materialised up front when filters can be pushed down.
+REQUIRED_DATA = [] if query_engine.pushdown_available() else ["orders", "shipments"]
+
+
+# Timeline bars (Task/Start/Finish/Status) for shipments with both dates known
+def timeline_bars(shipments):
+    if shipments.empty:
+        return pd.DataFrame(columns=["Task", "Start", "Finish", "Status"])
+    shipments = shipments.dropna(subset=["ship_date", "estimated_arrival"])
+    return pd.DataFrame({
+        "Task": "SHP-" + shipments["shipment_id"].astype(str).str[-4:],
+        "Start": shipments["ship_date"],
+        "Finish": shipments["estimated_arrival"],
+        "Status": shipments["status"],
+    })
 
 
 def render_order_shipment_tracking(data):
-    orders = data["orders"]
-    shipments = data["shipments"]
-    
     st.title("🚚 Order & Shipment Tracking")
     
     tab1, tab2 = st.tabs(["📝 Orders", "🚚 Shipments"])
@@ -17,65 +35,61 @@ def render_order_shipment_tracking(data):
     with tab1:
         st.subheader("Order Management")
         
+        date_bounds = query_engine.order_date_bounds()
+        has_orders = date_bounds is not None
+        order_statuses = query_engine.order_statuses() if has_orders else []
+        
         # Order filters
         st.write("Filter Orders")
         col1, col2 = st.columns(2)
         with col1:
             status_filter = st.multiselect("Order Status", 
-                                         options=orders["status"].unique() if not orders.empty else [],
-                                         default=orders["status"].unique() if not orders.empty else [])
+                                         options=order_statuses,
+                                         default=order_statuses)
         with col2:
             date_range = st.date_input(
                 "Order Date Range",
                 value=(
-                    orders["order_date"].min().date() if not orders.empty and "order_date" in orders.columns else datetime.now() - timedelta(days=30),
-                    orders["order_date"].max().date() if not orders.empty and "order_date" in orders.columns else datetime.now()
+                    date_bounds[0].date() if has_orders else datetime.now() - timedelta(days=30),
+                    date_bounds[1].date() if has_orders else datetime.now()
                 )
             )
         
-        # Filter orders
-        filtered_orders = orders
-        if not orders.empty:
-            if status_filter:
-                filtered_orders = filtered_orders[filtered_orders["status"].isin(status_filter)]
-                
-            filtered_orders = filtered_orders[
-                (filtered_orders["order_date"].dt.date >= date_range[0]) & 
-                (filtered_orders["order_date"].dt.date <= date_range[1])
-            ]
-        
-        # Display orders
-        st.dataframe(filtered_orders)
+        # Filter orders (pushed down to the query engine) and show one page at a time
+        if has_orders:
+            if len(date_range) == 2:
+                order_filter = (status_filter, date_range[0], date_range[1])
+            else:
+                order_filter = (status_filter, None, None)
+            paginated_table("orders_table",
+                            lambda offset, limit: query_engine.query_orders(*order_filter, offset=offset, limit=limit),
+                            query_engine.count_orders(*order_filter))
+        else:
+            st.dataframe(pd.DataFrame())
         
         # Order analytics
-        if not orders.empty:
+        if has_orders:
             st.subheader("Order Analytics")
             
             col1, col2 = st.columns(2)
             
             with col1:
                 # Orders by status
-                status_counts = orders["status"].value_counts().reset_index()
-                status_counts.columns = ["Status", "Count"]
+                status_counts = query_engine.orders_by_status()
                 fig = px.pie(status_counts, values="Count", names="Status", 
                            title="Orders by Status")
                 st.plotly_chart(fig)
             
             with col2:
                 # Order timeline
-                orders_by_date = orders.groupby(orders["order_date"].dt.date).size().reset_index()
-                orders_by_date.columns = ["Date", "Count"]
-                fig = px.line(orders_by_date, x="Date", y="Count", 
-                            title="Orders over Time",
-                            labels={"Count": "# of Orders", "Date": "Date"})
-                st.plotly_chart(fig)
+                orders_by_date = query_engine.orders_per_day()
+                time_series_chart("orders_over_time", orders_by_date, x="Date", y="Count",
+                                  title="Orders over Time",
+                                  labels={"Count": "# of Orders", "Date": "Date"})
             
             # Top customers
             st.subheader("Top Customers")
-            customer_orders = orders.groupby("customer").agg(
-                order_count=("order_id", "count"),
-                total_value=("total_value", "sum")
-            ).reset_index().sort_values("total_value", ascending=False).head(5)
+            customer_orders = query_engine.top_customers(5)
             
             fig = px.bar(customer_orders, x="customer", y="total_value", 
                        text_auto='.2s',
@@ -87,51 +101,59 @@ def render_order_shipment_tracking(data):
     with tab2:
         st.subheader("Shipment Tracking")
         
+        shipment_statuses, carriers = query_engine.shipment_filter_options()
+        ship_bounds = query_engine.shipment_date_bounds()
+        has_shipments = bool(shipment_statuses)
+        
         # Shipment filters
         st.write("Filter Shipments")
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         with col1:
             shipment_status = st.multiselect("Shipment Status", 
-                                         options=shipments["status"].unique() if not shipments.empty else [],
-                                         default=shipments["status"].unique() if not shipments.empty else [])
+                                         options=shipment_statuses,
+                                         default=shipment_statuses)
         with col2:
             carrier_filter = st.multiselect("Carrier", 
-                                         options=shipments["carrier"].unique() if not shipments.empty else [],
-                                         default=shipments["carrier"].unique() if not shipments.empty else [])
-        
-        # Filter shipments
-        filtered_shipments = shipments
-        if not shipments.empty:
-            if shipment_status:
-                filtered_shipments = filtered_shipments[filtered_shipments["status"].isin(shipment_status)]
-            if carrier_filter:
-                filtered_shipments = filtered_shipments[filtered_shipments["carrier"].isin(carrier_filter)]
+                                         options=carriers,
+                                         default=carriers)
+        with col3:
+            ship_range = st.date_input(
+                "Ship Date Range",
+                value=(
+                    ship_bounds[0].date() if ship_bounds else datetime.now() - timedelta(days=30),
+                    ship_bounds[1].date() if ship_bounds else datetime.now()
+                )
+            )
         
-        # Display shipments
-        st.dataframe(filtered_shipments)
+        # Filter shipments (pushed down to the query engine) and show one page at a time
+        if len(ship_range) == 2:
+            shipment_filter = (shipment_status, carrier_filter, ship_range[0], ship_range[1])
+        else:
+            shipment_filter = (shipment_status, carrier_filter, None, None)
+        if has_shipments:
+            shipment_count = query_engine.count_shipments(*shipment_filter)
+            paginated_table("shipments_table",
+                            lambda offset, limit: query_engine.query_shipments(*shipment_filter, offset=offset, limit=limit),
+                            shipment_count)
+        else:
+            st.dataframe(pd.DataFrame())
         
         # Shipment analytics
-        if not shipments.empty:
+        if has_shipments:
             st.subheader("Shipment Analytics")
             
             col1, col2 = st.columns(2)
             
             with col1:
                 # Shipments by status
-                status_counts = shipments["status"].value_counts().reset_index()
-                status_counts.columns = ["Status", "Count"]
+                status_counts = query_engine.shipments_by_status()
                 fig = px.pie(status_counts, values="Count", names="Status", 
                            title="Shipments by Status")
                 st.plotly_chart(fig)
             
             with col2:
                 # Carrier performance
-                carrier_perf = shipments.groupby("carrier").agg(
-                    total_shipments=("shipment_id", "count"),
-                    delayed=("status", lambda x: sum(x == "Delayed")),
-                ).reset_index()
-                
-                carrier_perf["on_time_pct"] = (1 - carrier_perf["delayed"] / carrier_perf["total_shipments"]) * 100
+                carrier_perf = query_engine.carrier_performance()
                 
                 fig = px.bar(carrier_perf, x="carrier", y="on_time_pct",
                            labels={"carrier": "Carrier", "on_time_pct": "On-Time %"},
@@ -144,19 +166,18 @@ def render_order_shipment_tracking(data):
             # Delivery timeline
             st.subheader("Estimated Delivery Timeline")
             
-            # Create dummy timeline data for visualization
-            timeline_data = []
-            for _, shipment in filtered_shipments.iterrows():
-                if pd.notna(shipment["ship_date"]) and pd.notna(shipment["estimated_arrival"]):
-                    timeline_data.append({
-                        "Task": f"SHP-{shipment['shipment_id'][-4:]}",
-                        "Start": shipment["ship_date"],
-                        "Finish": shipment["estimated_arrival"],
-                        "Status": shipment["status"]
-                    })
-            
-            if timeline_data:
-                timeline_df = pd.DataFrame(timeline_data)
-                fig = px.timeline(timeline_df, x_start="Start", x_end="Finish", y="Task", color="Status")
-                fig.update_layout(title="Shipment Timeline")
-                st.plotly_chart(fig)
\ No newline at end of file
+            # One bar per shipment while that stays readable, otherwise shipments in flight per day
+            if shipment_count <= TIMELINE_MAX_BARS:
+                timeline_df = timeline_bars(query_engine.query_shipments(*shipment_filter))
+                if not timeline_df.empty:
+                    fig = px.timeline(timeline_df, x_start="Start", x_end="Finish", y="Task", color="Status")
+                    fig.update_layout(title="Shipment Timeline")
+                    st.plotly_chart(fig)
+            else:
+                in_flight = query_engine.shipments_in_flight(*shipment_filter)
+                if not in_flight.empty:
+                    st.caption(f"{shipment_count:,} shipments - showing shipments in flight per day "
+                               f"(one bar per shipment up to {TIMELINE_MAX_BARS:,})")
+                    fig = px.area(in_flight, x="Date", y="Shipments", color="Status",
+                                  title="Shipments in Flight per Day")
+                    st.plotly_chart(fig)
@@ -4,37 +4,77 @@ from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+from components.time_series import time_series_chart
+from components.paginated_table import paginated_table
+from config.settings import SUPPLIER_RADAR_MAX, SUPPLIER_RANKING_MAX
+from models.supplier_scorecard import SCORE_COLUMNS, supplier_history, supplier_scorecard
+
+# Datasets this page reads (loaded on demand by main) - supplier metrics come from
+# models.supplier_scorecard, which reads the order and shipment history itself
+REQUIRED_DATA = ["inventory"]
+
+# History grains offered on the detail view -> rollup grain
+HISTORY_GRAINS = {"Weekly": "week", "Monthly": "month", "Quarterly": "quarter"}
+
+# Scorecard columns shown in the supplier table -> display name
+SCORECARD_TABLE = {
+    "supplier": "Supplier",
+    "overall_score": "Overall Score",
+    "shipments": "Shipments",
+    "on_time_pct": "On-Time %",
+    "late_pct": "Late vs Requested %",
+    "avg_delay_days": "Avg Delay (days)",
+    "lead_time_mean": "Lead Time (days)",
+    "lead_time_p50": "Lead Time p50",
+    "lead_time_p90": "Lead Time p90",
+    "spend_vs_budget_pct": "Spend vs Budget %",
+    "quality_score": "Quality",
+}
+
+
+def format_score(value, fmt):
+    return "n/a" if pd.isna(value) else fmt.format(value)
 
 
 def render_supplier_performance(data):
-    suppliers = data["suppliers"]
     inventory = data["inventory"]
+    scorecard = supplier_scorecard()
+    suppliers = scorecard["suppliers"]
     
     st.title("📊 Supplier Performance Analysis")
     
     if not suppliers.empty:
-        # Supplier selection
+        if scorecard["source"] == "history":
+            st.caption(f"Scored from {int(suppliers['shipments'].sum()):,} shipments, attributed to suppliers "
+                       f"through the ordered item")
+        else:
+            st.caption("No shipment history could be linked to suppliers (orders need an item_id) - "
+                       "showing the figures from suppliers.csv")
+        
+        # Supplier selection (best overall score first)
         selected_supplier = st.selectbox("Select Supplier for Detailed Analysis", 
-                                        options=["All Suppliers"] + suppliers["supplier_name"].tolist())
+                                        options=["All Suppliers"] + suppliers["supplier"].tolist())
+        
+        # Radar axes with data behind them (e.g. Cost only when costs are booked per supplier)
+        axes = {axis: column for axis, column in SCORE_COLUMNS.items()
+                if column in suppliers.columns and suppliers[column].notna().any()}
         
         if selected_supplier == "All Suppliers":
-            # Radar chart for all suppliers
+            # Radar chart for the top suppliers
             st.subheader("Comparative Performance Analysis")
+            if len(suppliers) > SUPPLIER_RADAR_MAX:
+                st.caption(f"Top {SUPPLIER_RADAR_MAX} of {len(suppliers):,} suppliers by overall score")
             
             fig = go.Figure()
             
-            categories = ["Reliability", "Lead Time", "On-Time Delivery", "Quality", "Cost"]
-            
-            for _, supplier in suppliers.iterrows():
-                # Normalize metrics for radar chart (higher is better)
-                lead_time_score = 5 - (supplier["avg_lead_time"] / 20 * 5)  # Invert so lower is better
-                
+            top = suppliers.head(SUPPLIER_RADAR_MAX)
+            scores = top[list(axes.values())].to_numpy()
+            for name, supplier_scores in zip(top["supplier"], scores):
                 fig.add_trace(go.Scatterpolar(
-                    r=[supplier["reliability_score"], lead_time_score, 
-                       supplier["on_time_delivery"] * 5, supplier["quality_score"], 4],
-                    theta=categories,
+                    r=supplier_scores,
+                    theta=list(axes),
                     fill='toself',
-                    name=supplier["supplier_name"]
+                    name=name
                 ))
             
             fig.update_layout(
@@ -50,42 +90,37 @@ def render_supplier_performance(data):
             
             # Show supplier table
             st.subheader("Supplier Performance Metrics")
-            suppliers_display = suppliers.copy()
-            suppliers_display["on_time_delivery"] = suppliers_display["on_time_delivery"].apply(lambda x: f"{x*100:.1f}%")
-            st.dataframe(suppliers_display)
+            columns = [column for column in SCORECARD_TABLE if column in suppliers.columns]
+            suppliers_display = suppliers[columns].rename(columns=SCORECARD_TABLE).round(2)
+            paginated_table("supplier_table",
+                            lambda offset, limit: suppliers_display.iloc[offset:offset + limit],
+                            len(suppliers_display))
             
-            # Supplier ranking
+            # Supplier ranking (overall score is the mean of the radar scores)
             st.subheader("Supplier Ranking")
             
-            # Calculate overall score (weighted average)
-            supplier_rank = suppliers.copy()
-            supplier_rank["lead_time_score"] = 5 - (supplier_rank["avg_lead_time"] / 20 * 5)
-            supplier_rank["overall_score"] = (
-                supplier_rank["reliability_score"] * 0.25 +
-                supplier_rank["lead_time_score"] * 0.25 +
-                supplier_rank["on_time_delivery"] * 5 * 0.25 +
-                supplier_rank["quality_score"] * 0.25
-            )
-            
-            supplier_rank = supplier_rank.sort_values("overall_score", ascending=False)
+            supplier_rank = suppliers.head(SUPPLIER_RANKING_MAX)
             
-            fig = px.bar(supplier_rank, x="supplier_name", y="overall_score",
-                       labels={"supplier_name": "Supplier", "overall_score": "Overall Score"},
+            fig = px.bar(supplier_rank, x="supplier", y="overall_score",
+                       labels={"supplier": "Supplier", "overall_score": "Overall Score"},
                        color="overall_score",
-                       title="Supplier Performance Ranking")
+                       title="Supplier Performance Ranking" if len(suppliers) <= SUPPLIER_RANKING_MAX
+                       else f"Supplier Performance Ranking - Top {SUPPLIER_RANKING_MAX}")
             st.plotly_chart(fig)
             
         else:
             # Single supplier detailed analysis
-            supplier_data = suppliers[suppliers["supplier_name"] == selected_supplier].iloc[0]
+            supplier_data = suppliers[suppliers["supplier"] == selected_supplier].iloc[0]
             
             st.subheader(f"Detailed Analysis: {selected_supplier}")
             
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Reliability Score", f"{supplier_data['reliability_score']:.1f}/5")
-            col2.metric("Lead Time", f"{supplier_data['avg_lead_time']} days")
-            col3.metric("On-Time Delivery", f"{supplier_data['on_time_delivery']*100:.1f}%")
-            col4.metric("Quality Score", f"{supplier_data['quality_score']:.1f}/5")
+            col1.metric("Reliability Score", format_score(supplier_data["reliability_score"], "{:.1f}/5"))
+            col2.metric("Lead Time", format_score(supplier_data["lead_time_mean"], "{:.1f} days"),
+                        help=(f"Median {supplier_data['lead_time_p50']:.1f} days, 90th percentile "
+                              f"{supplier_data['lead_time_p90']:.1f} days" if "lead_time_p90" in supplier_data else None))
+            col3.metric("On-Time Delivery", format_score(supplier_data["on_time_pct"], "{:.1f}%"))
+            col4.metric("Quality Score", format_score(supplier_data.get("quality_score"), "{:.1f}/5"))
             
             # Get items supplied by this supplier
             if not inventory.empty:
@@ -110,42 +145,37 @@ def render_supplier_performance(data):
                 else:
                     st.info(f"No items currently sourced from {selected_supplier}")
             
-            # Performance history (simulated)
+            # Performance history from the precomputed weekly/monthly/quarterly rollups
             st.subheader("Performance History")
             
-            # Generate dummy historical data
-            dates = pd.date_range(end=datetime.now(), periods=12, freq='M')
-            history = pd.DataFrame({
-                "date": dates,
-                "on_time_delivery": np.clip(
-                    np.random.normal(supplier_data["on_time_delivery"], 0.05, size=12),
-                    0, 1
-                ),
-                "quality_score": np.clip(
-                    np.random.normal(supplier_data["quality_score"], 0.2, size=12),
-                    1, 5
-                ),
-                "lead_time": np.clip(
-                    np.random.normal(supplier_data["avg_lead_time"], 2, size=12),
-                    1, 30
-                ).astype(int)
-            })
-            
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=history["date"], 
-                y=history["on_time_delivery"],
-                mode='lines+markers',
-                name='On-Time Delivery %'
-            ))
-            fig.add_trace(go.Scatter(
-                x=history["date"], 
-                y=history["quality_score"] / 5,  # Normalize to 0-1 scale
-                mode='lines+markers',
-                name='Quality Score (normalized)'
-            ))
-            fig.update_layout(title="Historical Performance Metrics")
-            st.plotly_chart(fig)
+            grain = st.radio("Period", options=list(HISTORY_GRAINS), index=1, horizontal=True)
+            history = supplier_history(selected_supplier, HISTORY_GRAINS[grain])
+            if history["shipments"].notna().any() or history["orders"].notna().any():
+                performance = pd.concat([
+                    pd.DataFrame({"date": history["period_start"], "metric": "On-Time Delivery %",
+                                  "value": history["on_time_pct"]}),
+                    pd.DataFrame({"date": history["period_start"], "metric": "Delivered by Requested Date %",
+                                  "value": 100 - history["late_pct"]}),
+                    pd.DataFrame({"date": history["period_start"], "metric": "Quality Score % (of 5)",
+                                  "value": history["quality_score"] / 5 * 100}),
+                ]).dropna(subset=["value"])
+                time_series_chart("supplier_history", performance, x="date", y="value", color="metric", markers=True,
+                                  title=f"{grain} Delivery Performance",
+                                  labels={"value": "%", "date": "Period", "metric": ""})
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    time_series_chart("supplier_lead_time", history.dropna(subset=["lead_time_mean"]),
+                                      x="period_start", y="lead_time_mean", markers=True,
+                                      title=f"{grain} Average Lead Time",
+                                      labels={"lead_time_mean": "Lead Time (days)", "period_start": "Period"})
+                with col2:
+                    fig = px.bar(history.dropna(subset=["quantity"]), x="period_start", y="quantity",
+                                 labels={"quantity": "Units Ordered", "period_start": "Period"},
+                                 title=f"{grain} Order Volume")
+                    st.plotly_chart(fig)
+            else:
+                st.info(f"No shipment or order history for {selected_supplier}.")
             
             # Notes and action items
             st.subheader("Notes & Action Items")
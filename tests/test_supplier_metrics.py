@@ -0,0 +1,93 @@
+import os
+import pandas as pd
+import pytest
+from data import supplier_metrics_store
+from models import supplier_scorecard
+
+# Supplier history store: repeated ids in the source CSVs count once (as their latest row),
+# both when the store is built and when it is updated past its watermark.
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(supplier_scorecard, "_synced_versions", {})
+    monkeypatch.setattr(supplier_scorecard, "_mapping_versions", {})
+    monkeypatch.setattr(supplier_scorecard, "_quality_observed", None)
+    pd.DataFrame({
+        "item_id": [1, 2],
+        "item_name": ["Steel Rods", "Copper Wire"],
+        "stock_level": [100, 40],
+        "reorder_threshold": [20, 10],
+        "supplier": ["Acme", "Birla"],
+        "lead_time_days": [7, 14],
+        "last_updated": ["2026-01-01 00:00:00", "2026-01-01 00:00:00"],
+    }).to_csv("inventory.csv", index=False)
+    return tmp_path
+
+
+def _write(orders, shipments):
+    pd.DataFrame(orders, columns=["order_id", "item_id", "quantity", "customer", "order_date",
+                                  "requested_delivery", "status", "total_value"]).to_csv("orders.csv", index=False)
+    pd.DataFrame(shipments, columns=["shipment_id", "order_id", "ship_date", "carrier", "status",
+                                     "tracking_number", "estimated_arrival"]).to_csv("shipments.csv", index=False)
+    # the loaders fingerprint files by mtime and size; make every rewrite a new version
+    for name in ["orders.csv", "shipments.csv"]:
+        stat = os.stat(name)
+        os.utime(name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+ORDERS = [
+    ["ORD-1", 1, 5, "Customer A", "2026-01-05 10:00:00", "2026-01-10 10:00:00", "Delivered", 500.0],
+    ["ORD-2", 2, 3, "Customer B", "2026-01-06 10:00:00", "2026-01-09 10:00:00", "Delivered", 300.0],
+    # ORD-1 again, re-exported with a corrected quantity
+    ["ORD-1", 1, 8, "Customer A", "2026-01-07 10:00:00", "2026-01-12 10:00:00", "Delivered", 800.0],
+]
+SHIPMENTS = [
+    ["SHP-1", "ORD-1", "2026-01-08 10:00:00", "DHL", "Delivered", "TRK1", "2026-01-11 10:00:00"],
+    ["SHP-2", "ORD-2", "2026-01-08 12:00:00", "DHL", "Delayed", "TRK2", "2026-01-11 12:00:00"],
+]
+
+
+def _totals(source):
+    rows = supplier_metrics_store.read_rows(source)
+    return rows.groupby("supplier")[supplier_metrics_store.ROLLUP_TABLES[source][0]].sum().to_dict()
+
+
+def test_repeated_order_id_counts_once(data_dir):
+    _write(ORDERS, SHIPMENTS)
+    supplier_scorecard.update_supplier_metrics()
+
+    orders = supplier_metrics_store.read_rows("orders").set_index("order_id")
+    assert sorted(orders.index) == ["ORD-1", "ORD-2"]
+    assert orders.loc["ORD-1", "quantity"] == 8
+    assert _totals("orders") == {"Acme": 1, "Birla": 1}
+    assert _totals("shipments") == {"Acme": 1, "Birla": 1}
+    history = supplier_metrics_store.read_history("Acme", "month")
+    assert history["orders"].sum() == 1 and history["quantity"].sum() == 8
+    # on time against the corrected requested delivery (Jan 12), late against the first one (Jan 10)
+    assert history["late"].sum() == 0
+
+
+def test_repeated_order_id_in_incremental_update(data_dir):
+    _write(ORDERS[:2], SHIPMENTS)
+    supplier_scorecard.update_supplier_metrics()
+
+    _write(ORDERS + [["ORD-3", 2, 4, "Customer C", "2026-01-09 10:00:00", "2026-01-15 10:00:00", "Pending", 400.0],
+                     ["ORD-3", 2, 6, "Customer C", "2026-01-09 11:00:00", "2026-01-15 10:00:00", "Pending", 600.0]],
+           SHIPMENTS + [["SHP-3", "ORD-3", "2026-01-10 10:00:00", "UPS", "In Transit", "TRK3", "2026-01-13 10:00:00"]])
+    supplier_scorecard.update_supplier_metrics()
+
+    assert _totals("orders") == {"Acme": 1, "Birla": 2}
+    assert _totals("shipments") == {"Acme": 1, "Birla": 2}
+    history = supplier_metrics_store.read_history("Birla", "quarter")
+    assert history["orders"].sum() == 2 and history["quantity"].sum() == 9
+    assert history["shipments"].sum() == 2
+
+
+def test_scorecard_with_repeated_order_id(data_dir):
+    _write(ORDERS, SHIPMENTS)
+    shipments = supplier_scorecard._supplier_shipments(
+        supplier_scorecard.read_dataset("orders"), supplier_scorecard.read_dataset("shipments"),
+        supplier_scorecard.read_dataset("inventory"))
+    assert shipments.set_index("shipment_id")["supplier"].astype(str).to_dict() == {"SHP-1": "Acme", "SHP-2": "Birla"}